@@ -1,3 +1,2 @@
 
-python src/sotn_patcher.py "build"
 python src/sotn_ppf.py "build" --data="data" --changes="build/changes.json" --ppf="build/changes.ppf"
@@ -1,4 +1,5 @@
 
 python src/sotn_extractor.py "build/Castlevania - Symphony of the Night (Track 1).bin" "build"
-python src/sotn_patcher.py "build"
+python src/sotn_aliases.py "data" "build"
+python src/sotn_patch_library.py "build"
 python src/sotn_ppf.py "build" --data="data"
@@ -1,65 +1,100 @@
 # External libraries
 import argparse
+import mmap
 import os
+import struct
 
 # Local libraries
 import sotn_address
-import sotn_extractor
+import sotn_disc
 
 class ParsedPPF:
-    def __init__(self, bin: sotn_extractor.BIN):
-        self.bin = bin
-        self.header = self.read_string(5)
-        self.encoding_method = self.read_byte()
-        self.description = self.read_string(50)
-        self.image_type = self.read_byte()
-        self.block_check = self.read_byte()
-        self.undo_data = self.read_byte()
-        self.dummy = self.read_byte()
-        self.writes = []
-        while True:
-            address = self.read_u64()
-            length = self.read_byte()
-            chars = []
-            for _ in range(length):
-                char = self.read_byte()
-                chars.append(char)
-            write = (address, length, chars)
+    '''
+    Decodes a PPF3 file held in memory
+
+    Records are parsed lazily with struct straight out of a memoryview, so even large patches are never copied byte by byte
+    '''
+    HEADER = struct.Struct('<5sB50sBBBB')
+    RECORD_HEADER = struct.Struct('<QB')
+    BLOCK_CHECK_SIZE = 1024
+    FILE_ID_MARKER = b'@BEGIN_FILE_ID.DIZ'
+    def __init__(self, data):
+        self.data = memoryview(data)
+        (
+            header,
+            self.encoding_method,
+            description,
+            self.image_type,
+            self.block_check,
+            self.undo_data,
+            self.dummy,
+        ) = self.HEADER.unpack_from(self.data, 0)
+        self.header = header.decode('latin-1')
+        self.description = description.decode('latin-1')
+        if self.header != 'PPF30' or self.encoding_method != 2:
+            raise ValueError('Only PPF3.0 files are supported, found ' + repr(self.header))
+        self.records_start = self.HEADER.size
+        if self.block_check:
+            # NOTE(sestren): The block check is a copy of 1024 bytes from the original image, used to validate it
+            self.records_start += self.BLOCK_CHECK_SIZE
+
+    def get_records(self):
+        # Yields (disc address, data) pairs, stopping at the end of the file, an empty record, or the optional FILE_ID.DIZ trailer
+        data = self.data
+        offset = self.records_start
+        end = len(data)
+        undo_size_factor = 1 if self.undo_data else 0
+        while offset + self.RECORD_HEADER.size <= end:
+            if data[offset:offset + len(self.FILE_ID_MARKER)] == self.FILE_ID_MARKER:
+                break
+            (disc_address, length) = self.RECORD_HEADER.unpack_from(data, offset)
             if length < 1:
                 break
-            self.writes.append(write)
-    
-    def read(self, byte_count, endianness, sign):
-        result = self.bin.read(self.bin.cursor.address, byte_count, endianness, sign)
-        self.bin.cursor.address += byte_count
-        return result
-    
-    def read_byte(self):
-        result = self.read(1, 'little', False)
-        return result
-    
-    def read_u64(self):
-        result = self.read(8, 'little', False)
-        return result
-    
-    def read_string(self, size: int):
-        result = ''
-        for _ in range(size):
-            char_code = self.read(1, 'little', False)
-            result += chr(char_code)
+            offset += self.RECORD_HEADER.size
+            if offset + length > end:
+                raise ValueError('Truncated PPF record at disc address ' + sotn_address._hex(disc_address, 8))
+            yield (disc_address, data[offset:offset + length])
+            offset += length * (1 + undo_size_factor)
+
+    @property
+    def writes(self) -> list:
+        result = list(
+            (disc_address, len(chars), list(chars)) for
+            (disc_address, chars) in self.get_records()
+        )
         return result
 
+def apply_to_bin(ppf: ParsedPPF, binary_filepath: str, regenerate: bool=False):
+    '''
+    Apply every record of a parsed PPF to a BIN file in place through a memory map
+
+    Records are copied verbatim unless regenerate is set, in which case the EDC and ECC of each touched sector are rebuilt
+    '''
+    with open(binary_filepath, 'r+b') as binary_file:
+        with mmap.mmap(binary_file.fileno(), 0) as binary_map:
+            if regenerate:
+                sotn_disc.write_disc(binary_map, ppf.get_records())
+            else:
+                for (disc_address, data) in ppf.get_records():
+                    binary_map[disc_address:disc_address + len(data)] = data
+            binary_map.flush()
+
 if __name__ == '__main__':
     '''
     Usage
-    python dissect_ppf.py ppf
+    python dissect_ppf.py PPF
+    python dissect_ppf.py PPF --apply=BIN [--regenerate]
     '''
     parser = argparse.ArgumentParser()
     parser.add_argument('ppf', help='Input a filepath to the PPF binary file to be dissected', type=str)
+    parser.add_argument('--apply', help='Input an optional filepath to a BIN file to apply the PPF to in place', type=str)
+    parser.add_argument('--regenerate', help='Input an optional flag to recompute the EDC and ECC of every sector the PPF touches', action='store_true')
     args = parser.parse_args()
     with open(os.path.join(os.path.normpath(args.ppf)), 'br') as ppf_file:
-        bin = sotn_extractor.BIN(ppf_file, 0, False)
-        ppf = PPF(bin)
+        ppf = ParsedPPF(ppf_file.read())
+    if args.apply is not None:
+        apply_to_bin(ppf, args.apply, args.regenerate)
+    else:
         print('header:', ppf.header)
         print('encoding_method:', ppf.encoding_method)
         print('description:', ppf.description)
@@ -68,5 +103,5 @@ if __name__ == '__main__':
         print('undo_data:', ppf.undo_data)
         print('dummy:', ppf.dummy)
         print('writes:')
-        for (address, length, chars) in ppf.writes:
-            print(' -', (sotn_address._hex(address, 8), sotn_address._hex(length, 2), list(sotn_address._hex(char, 2) for char in chars)))
+        for (address, chars) in ppf.get_records():
+            print(' -', (sotn_address._hex(address, 8), sotn_address._hex(len(chars), 2), list(sotn_address._hex(char, 2) for char in chars)))
@@ -48,6 +48,40 @@ def _hex(val: int, size: int):
     result = ('{:0' + str(size) + 'X}').format(val)
     return result
 
+DATA_TYPE_SIZES = {
+    'u8': 1,
+    's8': 1,
+    'u16': 2,
+    's16': 2,
+    'u32': 4,
+    's32': 4,
+}
+
+def pack_value(value: int, data_type: str) -> bytes:
+    # Encode an integer as the little-endian bytes of the given data type
+    if data_type not in DATA_TYPE_SIZES:
+        raise ValueError('Unknown data type: ' + str(data_type))
+    size = DATA_TYPE_SIZES[data_type]
+    sign_bit = 1 << (8 * size - 1)
+    write_value = value
+    if data_type.startswith('s'):
+        write_value = (value & (sign_bit - 1)) + (sign_bit if value < 0 else 0)
+    result = (write_value & (2 * sign_bit - 1)).to_bytes(size, 'little')
+    return result
+
+# Intended for hex-strings or integers
+def get_value(value: (str | int)) -> int:
+    result = None
+    if type(value) == int:
+        result = value
+    elif type(value) == str:
+        # All dots indicates an intentional NULL value
+        if value == '.' * len(value):
+            return None
+        result = int(value, 16)
+    assert result is not None
+    return result
+
 if __name__ == '__main__':
     '''
     Usage
@@ -0,0 +1,83 @@
+# External libraries
+import argparse
+import os
+import pickle
+import struct
+import yaml
+
+# Local libraries
+import sotn_extraction
+
+ALIASES_CACHE_MAGIC = b'SOTNAC02'
+ALIASES_CACHE_HEADER = struct.Struct('<8s20s')
+
+def get_room_names(aliases: dict) -> dict:
+    # Map each (stage name, room index) to the alias name of that room; the first alias found for a room wins
+    result = {}
+    for (room_name, room) in aliases['Rooms'].items():
+        stage_name = room_name.split(', ')[0]
+        key = (stage_name, room['Room Index'])
+        if key not in result:
+            result[key] = room_name
+    return result
+
+def compile_aliases(aliases: dict) -> dict:
+    result = {
+        'Aliases': aliases,
+        'Room Names': get_room_names(aliases),
+    }
+    return result
+
+def write_cache(cache_file, compiled_aliases: dict, source_sha1: str):
+    cache_file.write(ALIASES_CACHE_HEADER.pack(ALIASES_CACHE_MAGIC, bytes.fromhex(source_sha1)))
+    pickle.dump(compiled_aliases, cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+
+def read_cache(cache_file, source_sha1: str) -> dict:
+    # Returns None if the cache is in an unrecognized format or was compiled from a different aliases file
+    header = cache_file.read(ALIASES_CACHE_HEADER.size)
+    if len(header) < ALIASES_CACHE_HEADER.size:
+        return None
+    (magic, cached_sha1) = ALIASES_CACHE_HEADER.unpack(header)
+    if magic != ALIASES_CACHE_MAGIC or cached_sha1 != bytes.fromhex(source_sha1):
+        return None
+    result = pickle.load(cache_file)
+    return result
+
+def load_compiled_aliases(data_dir: str, build_dir: str=None) -> dict:
+    '''
+    Load the compiled aliases, preferring the cache in the build folder when it is up to date
+
+    The cache is considered stale if it was compiled from an aliases.yaml with a different SHA-1;
+    a stale or missing cache is rewritten when a build folder is given
+    '''
+    yaml_filepath = os.path.join(os.path.normpath(data_dir), 'aliases.yaml')
+    source_sha1 = sotn_extraction.get_sha1(yaml_filepath)
+    cache_filepath = None
+    if build_dir is not None:
+        cache_filepath = os.path.join(os.path.normpath(build_dir), 'aliases.cache')
+        if os.path.exists(cache_filepath):
+            with open(cache_filepath, 'br') as cache_file:
+                result = read_cache(cache_file, source_sha1)
+            if result is not None:
+                return result
+    with open(yaml_filepath) as aliases_file:
+        result = compile_aliases(yaml.safe_load(aliases_file))
+    if cache_filepath is not None:
+        with open(cache_filepath, 'wb') as cache_file:
+            write_cache(cache_file, result, source_sha1)
+    return result
+
+def load_aliases(data_dir: str, build_dir: str=None) -> dict:
+    result = load_compiled_aliases(data_dir, build_dir)['Aliases']
+    return result
+
+if __name__ == '__main__':
+    '''
+    Usage
+    python sotn_aliases.py DATA_DIR BUILD_DIR
+    '''
+    parser = argparse.ArgumentParser()
+    parser.add_argument('data_dir', help='Input a filepath to the folder containing aliases.yaml', type=str)
+    parser.add_argument('build_dir', help='Input a filepath to the folder that will contain the compiled aliases cache', type=str)
+    args = parser.parse_args()
+    load_compiled_aliases(args.data_dir, args.build_dir)
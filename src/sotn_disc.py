@@ -0,0 +1,115 @@
+# External libraries
+import shutil
+
+# Local libraries
+import sotn_address
+
+# Offsets within a Mode 2 Form 1 sector
+HEADER_START = 0x00C
+SUBHEADER_START = 0x010
+SUBMODE_OFFSET = 0x012
+EDC_START = 0x818
+ECC_P_START = 0x81C
+ECC_Q_START = 0x8C8
+FORM_2_SUBMODE_MASK = 0x20
+
+def get_edc_table() -> list:
+    # CRC lookup table for the EDC polynomial (x^32 + x^31 + x^16 + x^15 + x^4 + x^3 + x + 1), bit-reversed
+    result = []
+    for index in range(256):
+        edc = index
+        for _ in range(8):
+            edc = (edc >> 1) ^ (0xD8018001 if edc & 1 else 0)
+        result.append(edc)
+    return result
+
+def get_ecc_tables() -> tuple:
+    # Forward (multiply by alpha) and backward lookup tables over GF(2^8) with polynomial 0x11D
+    ecc_f = [0] * 256
+    ecc_b = [0] * 256
+    for index in range(256):
+        value = (index << 1) ^ (0x11D if index & 0x80 else 0)
+        ecc_f[index] = value
+        ecc_b[index ^ value] = index
+    result = (ecc_f, ecc_b)
+    return result
+
+EDC_TABLE = get_edc_table()
+(ECC_F_TABLE, ECC_B_TABLE) = get_ecc_tables()
+
+def get_edc(data) -> int:
+    result = 0
+    for byte in data:
+        result = (result >> 8) ^ EDC_TABLE[(result ^ byte) & 0xFF]
+    return result
+
+def compute_ecc_block(sector: bytearray, major_count: int, minor_count: int, major_mult: int, minor_inc: int, dest: int):
+    # Reed-Solomon product code parity over the sector, starting at the header, as laid out in ECMA-130
+    size = major_count * minor_count
+    for major in range(major_count):
+        index = (major >> 1) * major_mult + (major & 1)
+        ecc_a = 0
+        ecc_b = 0
+        for _ in range(minor_count):
+            value = sector[HEADER_START + index]
+            index += minor_inc
+            if index >= size:
+                index -= size
+            ecc_a ^= value
+            ecc_b ^= value
+            ecc_a = ECC_F_TABLE[ecc_a]
+        ecc_a = ECC_B_TABLE[ECC_F_TABLE[ecc_a] ^ ecc_b]
+        sector[dest + major] = ecc_a
+        sector[dest + major + major_count] = ecc_a ^ ecc_b
+
+def regenerate_sector(sector: bytearray):
+    '''
+    Recompute the EDC and ECC of a raw Mode 2 Form 1 sector in place
+
+    Sectors in any other mode or form are left untouched
+    '''
+    if sector[0x0F] != 2 or (sector[SUBMODE_OFFSET] & FORM_2_SUBMODE_MASK) != 0:
+        return
+    edc = get_edc(memoryview(sector)[SUBHEADER_START:EDC_START])
+    sector[EDC_START:EDC_START + 4] = edc.to_bytes(4, 'little')
+    # NOTE(sestren): The header is treated as all zeroes while computing ECC for Mode 2 sectors
+    header = sector[HEADER_START:SUBHEADER_START]
+    sector[HEADER_START:SUBHEADER_START] = bytes(4)
+    compute_ecc_block(sector, 86, 24, 2, 86, ECC_P_START)
+    compute_ecc_block(sector, 52, 43, 86, 88, ECC_Q_START)
+    sector[HEADER_START:SUBHEADER_START] = header
+
+def write_disc(binary_file, disc_writes):
+    '''
+    Write (disc address, data) pairs into a BIN opened for reading and writing
+
+    Each touched sector is read once, patched, has its EDC and ECC recomputed, and is written back
+    '''
+    SEC = sotn_address.Address.SECTOR_SIZE
+    sector_writes = {}
+    for (disc_address, data) in disc_writes:
+        offset = 0
+        while offset < len(data):
+            (sector_id, sector_offset) = divmod(disc_address + offset, SEC)
+            size = min(len(data) - offset, SEC - sector_offset)
+            if sector_id not in sector_writes:
+                sector_writes[sector_id] = []
+            sector_writes[sector_id].append((sector_offset, data[offset:offset + size]))
+            offset += size
+    for sector_id in sorted(sector_writes.keys()):
+        binary_file.seek(sector_id * SEC)
+        sector = bytearray(binary_file.read(SEC))
+        for (sector_offset, data) in sector_writes[sector_id]:
+            sector[sector_offset:sector_offset + len(data)] = data
+        regenerate_sector(sector)
+        binary_file.seek(sector_id * SEC)
+        binary_file.write(sector)
+
+def apply_to_bin(source_filepath: str, target_filepath: str, disc_writes):
+    # Patch a copy of the source BIN, or the source BIN itself when both paths are the same file
+    try:
+        shutil.copyfile(source_filepath, target_filepath)
+    except shutil.SameFileError:
+        pass
+    with open(target_filepath, 'r+b') as binary_file:
+        write_disc(binary_file, disc_writes)
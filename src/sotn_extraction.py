@@ -0,0 +1,186 @@
+# External libraries
+import array
+import collections.abc
+import hashlib
+import json
+import os
+import pickle
+import struct
+
+CACHE_MAGIC = b'SOTNXC01'
+CACHE_HEADER = struct.Struct('<8sQ')
+# Sections that are split into one record per stage, so they can be loaded individually
+PARTITIONED_SECTIONS = (
+    'Entity Layouts',
+    'Stages',
+)
+
+class ExtractionCache(collections.abc.Mapping):
+    '''
+    Read-only view of the extraction stored in a cache file
+
+    Each top-level section (and each stage within a partitioned section) is stored as its
+    own pickled record; records are only read and unpickled the first time they are accessed
+    '''
+    def __init__(self, cache_file):
+        self.cache_file = cache_file
+        (magic, index_offset) = CACHE_HEADER.unpack(self.cache_file.read(CACHE_HEADER.size))
+        if magic != CACHE_MAGIC:
+            raise ValueError('Unrecognized extraction cache format')
+        self.cache_file.seek(index_offset)
+        self.index = pickle.load(self.cache_file)
+        self.sections = {}
+
+    def __getitem__(self, section_name):
+        if section_name not in self.sections:
+            record = self.index['Sections'][section_name]
+            if type(record) == dict:
+                self.sections[section_name] = LazySection(self, record)
+            else:
+                self.sections[section_name] = self.load_record(record)
+        result = self.sections[section_name]
+        return result
+
+    def __iter__(self):
+        return iter(self.index['Sections'])
+
+    def __len__(self):
+        return len(self.index['Sections'])
+
+    def close(self):
+        self.cache_file.close()
+
+    def load_record(self, record: tuple):
+        (offset, size) = record
+        self.cache_file.seek(offset)
+        result = pickle.loads(self.cache_file.read(size))
+        return result
+
+class LazySection(collections.abc.Mapping):
+    def __init__(self, cache: ExtractionCache, records: dict):
+        self.cache = cache
+        self.records = records
+        self.values = {}
+
+    def __getitem__(self, key):
+        if key not in self.values:
+            self.values[key] = self.cache.load_record(self.records[key])
+        result = self.values[key]
+        return result
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def __len__(self):
+        return len(self.records)
+
+def normalized(value):
+    # Mirror what a round trip through json.dump(..., sort_keys=True) and json.load would produce
+    result = value
+    if isinstance(value, collections.abc.Mapping):
+        result = {}
+        for key in sorted(value.keys()):
+            result[str(key)] = normalized(value[key])
+    elif type(value) in (list, tuple):
+        result = list(normalized(element) for element in value)
+    return result
+
+def get_tilemap_array(tilemap: dict) -> array.array:
+    '''
+    Get the tiles of a tilemap as a flat, row-major array of u16 values
+
+    Tilemaps loaded from extraction.json are stored as rows of hex strings; they are converted
+    once and the converted array replaces the hex rows so later lookups can use it directly
+    '''
+    result = tilemap['Data']
+    if not isinstance(result, array.array):
+        result = array.array('H', (int(tile, 16) for row_data in tilemap['Data'] for tile in row_data.split(' ')))
+        tilemap['Data'] = result
+    return result
+
+TILE_FORMAT = '{:04X}'
+
+def get_tilemap_rows(tilemap: dict) -> list[str]:
+    tiles = get_tilemap_array(tilemap)
+    cols = tilemap['Metadata']['Columns']
+    result = []
+    for start in range(0, len(tiles), cols):
+        result.append(' '.join(map(TILE_FORMAT.format, tiles[start:start + cols])))
+    return result
+
+def exported(value):
+    # Replace native data with the form it takes in extraction.json (e.g., tilemaps as rows of hex strings)
+    result = value
+    if isinstance(value, collections.abc.Mapping):
+        metadata = value.get('Metadata', None)
+        if isinstance(metadata, dict) and metadata.get('Type', None) == 'tile-array':
+            result = dict(value)
+            result['Data'] = get_tilemap_rows(value)
+        else:
+            result = {}
+            for (key, element) in value.items():
+                result[key] = exported(element)
+    elif type(value) in (list, tuple):
+        result = list(exported(element) for element in value)
+    return result
+
+def get_sha1(filepath: str) -> str:
+    with open(filepath, 'br') as binary_file:
+        result = hashlib.file_digest(binary_file, 'sha1').hexdigest()
+    return result
+
+def get_source_stamp(filepath: str) -> dict:
+    stat = os.stat(filepath)
+    result = {
+        'Size': stat.st_size,
+        'Modified': stat.st_mtime_ns,
+    }
+    return result
+
+def write_cache(cache_file, extraction: dict, bin_sha1: str, source_stamp: dict=None, steps: dict=None):
+    index = {
+        'BIN SHA-1': bin_sha1,
+        'Source': source_stamp,
+        'Steps': steps,
+        'Sections': {},
+    }
+    cache_file.write(CACHE_HEADER.pack(CACHE_MAGIC, 0))
+    def write_record(value) -> tuple:
+        data = pickle.dumps(normalized(value), protocol=pickle.HIGHEST_PROTOCOL)
+        result = (cache_file.tell(), len(data))
+        cache_file.write(data)
+        return result
+    for section_name in sorted(extraction.keys()):
+        section = extraction[section_name]
+        if section_name in PARTITIONED_SECTIONS:
+            index['Sections'][section_name] = {}
+            for key in sorted(section.keys()):
+                index['Sections'][section_name][str(key)] = write_record(section[key])
+        else:
+            index['Sections'][section_name] = write_record(section)
+    index_offset = cache_file.tell()
+    pickle.dump(index, cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+    cache_file.seek(0)
+    cache_file.write(CACHE_HEADER.pack(CACHE_MAGIC, index_offset))
+
+def load_extraction(build_dir: str):
+    '''
+    Load the extraction from the build folder, preferring the cache when it is up to date
+
+    The cache is only used if it carries the stamp of an extraction.json that is unchanged since the cache
+    was written alongside it; otherwise the extraction is loaded from extraction.json
+    '''
+    json_filepath = os.path.join(os.path.normpath(build_dir), 'extraction.json')
+    cache_filepath = os.path.join(os.path.normpath(build_dir), 'extraction.cache')
+    result = None
+    if os.path.exists(cache_filepath) and os.path.exists(json_filepath):
+        cache = ExtractionCache(open(cache_filepath, 'br'))
+        source_stamp = cache.index.get('Source', None)
+        if source_stamp is not None and source_stamp == get_source_stamp(json_filepath):
+            result = cache
+        else:
+            cache.close()
+    if result is None:
+        with open(json_filepath) as extract_file:
+            result = json.load(extract_file)
+    return result
@@ -1,19 +1,121 @@
 # External libraries
 import argparse
+import array
+import collections
+import collections.abc
+import concurrent.futures
+import copy
+import itertools
 import json
+import mmap
 import os
+import struct
+import sys
 
 # Local libraries
 import sotn_address
+import sotn_extraction
+
+STRUCT_FORMATS = {
+    'u8': 'B',
+    's8': 'b',
+    'u16': 'H',
+    's16': 'h',
+    'u32': 'I',
+    's32': 'i',
+}
+
+def get_table_struct(fields: dict, size: int) -> tuple:
+    '''
+    Compile the fields of a table into a little-endian struct covering one element of the table
+
+    Fields that share the same offset and type (e.g., a flags field and an index packed into it)
+    share one slot of the struct; returns the struct along with the slot of each field
+    '''
+    slots = sorted(set((field['Offset'], field['Type']) for field in fields.values()))
+    format = '<'
+    position = 0
+    for (offset, data_type) in slots:
+        assert offset >= position
+        format += (offset - position) * 'x' + STRUCT_FORMATS[data_type]
+        position = offset + struct.calcsize('<' + STRUCT_FORMATS[data_type])
+    assert position <= size
+    format += (size - position) * 'x'
+    field_slots = {}
+    for (field_name, field) in fields.items():
+        field_slots[field_name] = slots.index((field['Offset'], field['Type']))
+    result = (struct.Struct(format), field_slots)
+    return result
+
+class DiscImage:
+    '''
+    A read-only, memory-mapped view of the gamedata address space of a BIN
+    
+    The data portion of each sector is sliced out of the mapping the first time it is 
+    requested, so reads only copy the bytes they return; reads are returned as bytes rather
+    than views into the mapping, so that nothing a caller keeps can stop the mapping from closing
+    '''
+    def __init__(self, binary_file):
+        self.mmap = mmap.mmap(binary_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.mmap)
+        self.sectors = {}
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def close(self):
+        # NOTE(sestren): Every view into the mapping has to be released before the mapping itself can be closed
+        for sector_view in self.sectors.values():
+            sector_view.release()
+        self.sectors = {}
+        self.view.release()
+        self.mmap.close()
+    
+    def sector(self, sector_id: int) -> memoryview:
+        if sector_id not in self.sectors:
+            start = sector_id * sotn_address.Address.SECTOR_SIZE + sotn_address.Address.SECTOR_HEADER_SIZE
+            self.sectors[sector_id] = self.view[start:start + sotn_address.Address.SECTOR_DATA_SIZE]
+        result = self.sectors[sector_id]
+        return result
+    
+    def read(self, gamedata_address: int, byte_count: int):
+        DAT = sotn_address.Address.SECTOR_DATA_SIZE
+        (sector_id, offset) = divmod(gamedata_address, DAT)
+        if offset + byte_count <= DAT:
+            result = bytes(self.sector(sector_id)[offset:offset + byte_count])
+            return result
+        chunks = []
+        while byte_count > 0:
+            chunk = self.sector(sector_id)[offset:offset + byte_count]
+            if len(chunk) < 1:
+                break
+            chunks.append(chunk)
+            byte_count -= len(chunk)
+            sector_id += 1
+            offset = 0
+        result = b''.join(chunks)
+        return result
+    
+    def read_disc(self, disc_address: int, byte_count: int):
+        result = bytes(self.view[disc_address:disc_address + byte_count])
+        return result
 
 class BIN:
-    def __init__(self, binary_file, stage_offset: int=0, sector_ind: bool=True):
+    def __init__(self, binary_file, stage_offset: int=0, sector_ind: bool=True, sector_buffer: dict=None):
         self.binary_file = binary_file
         self.cursor = sotn_address.Address(stage_offset, 'GAMEDATA')
         self.sector_ind = sector_ind
+        # NOTE(sestren): Clones share the most recently read sector, so that small sequential reads are served from memory
+        self.sector_buffer = sector_buffer if sector_buffer is not None else {
+            'Sector': None,
+            'Data': b'',
+        }
     
     def clone(self, offset: int=0):
-        result = BIN(self.binary_file, self.cursor.address + offset)
+        result = BIN(self.binary_file, self.cursor.address + offset, self.sector_ind, self.sector_buffer)
         return result
     
     def set(self, offset: int):
@@ -22,18 +124,46 @@ class BIN:
     def seek(self, offset: int):
         self.cursor.address += offset
     
-    def read(self, offset, byte_count, endianness, sign):
-        bytes = []
-        for i in range(byte_count):
-            seek_target = 0
+    def read_sectors(self, first_sector: int, sector_count: int) -> bytes:
+        # Read a contiguous run of sectors in one call, keeping only the data portion of each sector
+        HDR = sotn_address.Address.SECTOR_HEADER_SIZE
+        DAT = sotn_address.Address.SECTOR_DATA_SIZE
+        SEC = sotn_address.Address.SECTOR_SIZE
+        self.binary_file.seek(first_sector * SEC)
+        raw_data = self.binary_file.read(sector_count * SEC)
+        if sector_count == 1:
+            result = raw_data[HDR:HDR + DAT]
+        else:
+            view = memoryview(raw_data)
+            result = b''.join(view[sector * SEC + HDR:sector * SEC + HDR + DAT] for sector in range(sector_count))
+        return result
+    
+    def read_bytes(self, offset: int, byte_count: int) -> bytes:
+        if isinstance(self.binary_file, DiscImage):
             if self.sector_ind:
-                seek_target = self.cursor.to_disc_address(offset + i)
+                result = self.binary_file.read(self.cursor.address + offset, byte_count)
             else:
-                seek_target = offset + i
-            self.binary_file.seek(seek_target)
-            byte = self.binary_file.read(1)
-            bytes.append(int.from_bytes(byte))
-        # self.cursor.address += byte_count
+                result = self.binary_file.read_disc(offset, byte_count)
+            return result
+        if not self.sector_ind:
+            self.binary_file.seek(offset)
+            result = self.binary_file.read(byte_count)
+            return result
+        DAT = sotn_address.Address.SECTOR_DATA_SIZE
+        (first_sector, first_offset) = divmod(self.cursor.address + offset, DAT)
+        last_sector = (self.cursor.address + offset + max(1, byte_count) - 1) // DAT
+        if first_sector == last_sector:
+            if self.sector_buffer['Sector'] != first_sector:
+                self.sector_buffer['Data'] = self.read_sectors(first_sector, 1)
+                self.sector_buffer['Sector'] = first_sector
+            data = self.sector_buffer['Data']
+        else:
+            data = self.read_sectors(first_sector, 1 + last_sector - first_sector)
+        result = data[first_offset:first_offset + byte_count]
+        return result
+    
+    def read(self, offset, byte_count, endianness, sign):
+        bytes = self.read_bytes(offset, byte_count)
         result = int.from_bytes(bytes, byteorder=endianness, signed=sign)
         return result
     
@@ -52,6 +182,18 @@ class BIN:
         result = dispatch[data_type](offset, include_meta)
         return result
     
+    def table(self, metadata: dict, offset: int=0) -> list:
+        # Read a whole array of structs described by Fields, Size and Count in a single read
+        (table_struct, field_slots) = get_table_struct(metadata['Fields'], metadata['Size'])
+        data = self.read_bytes(offset, metadata['Size'] * metadata['Count'])
+        result = []
+        for values in table_struct.iter_unpack(data):
+            row = {}
+            for (field_name, slot) in field_slots.items():
+                row[field_name] = values[slot]
+            result.append(row)
+        return result
+    
     def u8(self, offset: int=0, include_meta: bool=False):
         result = None
         size = 1
@@ -220,524 +362,279 @@ class BIN:
             result = value
         return result
 
-if __name__ == '__main__':
+VERTICAL_SORT_KEY_FIELDS = (
+    'X',
+    'Y',
+    'Entity Type ID',
+    'Entity Room Index',
+    'Params',
+)
+
+def update_vertical_sorts(stage_entity_layout: dict):
+    # Each entity takes the sort of the first unclaimed entry in the vertical data with matching fields
+    search_indexes = {}
+    for vertical_entity in stage_entity_layout['Flattened Vertical Data']:
+        key = tuple(vertical_entity[field] for field in VERTICAL_SORT_KEY_FIELDS)
+        if key not in search_indexes:
+            search_indexes[key] = collections.deque()
+        search_indexes[key].append(vertical_entity['Sort'])
+    for row_data in stage_entity_layout['Data']:
+        for entity_data in row_data:
+            key = tuple(entity_data[field] for field in VERTICAL_SORT_KEY_FIELDS)
+            if len(search_indexes.get(key, ())) > 0:
+                entity_data['Vertical Sort'] = search_indexes[key].popleft()
+
+OFFSET = 0x80180000
+
+def extract_stage(binary_file, stage: dict) -> dict:
     '''
-    Extract game data from a binary file and output it to a JSON file
+    Extract the entity layouts, base drop rates and rooms of a single stage
 
-    Usage
-    python src/sotn_extractor.py INPUT_BIN OUTPUT_JSON
+    Stages are independent of one another, so they can be extracted in any order or in parallel
     '''
-    OFFSET = 0x80180000
-    parser = argparse.ArgumentParser()
-    parser.add_argument('binary_filepath', help='Input a filepath to the input BIN file', type=str)
-    parser.add_argument('build_dir', help='Input a filepath to the folder that will contain all the build files', type=str)
-    args = parser.parse_args()
-    with (
-        open(args.binary_filepath, 'br') as binary_file,
+    result = {
+        'Entity Layout': None,
+        'Entity Layout Constants': None,
+        'Base Drop Rate': None,
+        'Rooms': None,
+    }
+    cursors = {}
+    stage_offset = stage['Stage']['Start']
+    cursors['Stage'] = BIN(binary_file, stage_offset)
+    for (address, cursor_name) in (
+        # (0x00, 'Function Updates??'), # 801C37B8 for Marble Gallery
+        # (0x04, 'Function Hit Detection??'), # 801C3BBC for Marble Gallery
+        # (0x08, 'Function Update Room Pos??'), # 801C5D4C for Marble Gallery
+        (0x0C, 'Entities'), # 801C5BD4 for Marble Gallery
+        (0x10, 'Rooms'), # 801827E0 for Marble Gallery
+        # (0x14, 'Sprites??'), # 8018002C for Marble Gallery
+        # (0x18, 'CLUTs??'), # 8018014C for Marble Gallery
+        # (0x1C, 'Layouts??'), # 80180778 for Marble Gallery
+        (0x20, 'Layouts'), # or maybe Layers??? 801804B0 for Marble Gallery
+        # (0x24, 'Graphics??'), # 8018074C for Marble Gallery
+        # (0x28, 'Functions 4??'), # 801C3AB4 for Marble Gallery
     ):
-        entity_layouts = {}
-        constants = {
-            'Entity Layout': {},
-        }
-        base_drop_rates = {}
-        # Stages
-        stages = {
-            'Abandoned Mine': {
-                'Stage': {
-                    'Start': 0x03CDF800,
-                    'Size': 193576,
-                },
-                'Offsets': {
-                    'Base Drop Rate': 0x0D6C,
-                },
-            },
-            'Alchemy Laboratory': {
-                'Stage': {
-                    'Start': 0x049BE800,
-                    'Size': 309120,
-                },
-                'Offsets': {
-                    'Base Drop Rate': 0x18C0,
-                },
-            },
-            'Anti-Chapel': {
-                'Stage': {
-                    'Start': 0x04416000,
-                    'Size': 295736,
-                },
-                'Offsets': {
-                    'Base Drop Rate': 0x10E4,
-                },
-            },
-            'Black Marble Gallery': {
-                'Stage': {
-                    'Start': 0x0453D800,
-                    'Size': 347020,
-                },
-                'Offsets': {
-                    'Base Drop Rate': 0x13B4,
+        stage_offset = cursors['Stage'].u32(address) - OFFSET
+        cursors[cursor_name] = cursors['Stage'].clone(stage_offset)
+    # Entity Layout data
+    size = 10
+    cursors['Horizontal Entity Layout'] = cursors['Stage'].clone(cursors['Entities'].u16(0x1C))
+    cursors['Vertical Entity Layout'] = cursors['Stage'].clone(cursors['Entities'].u16(0x28))
+    stage_entity_layout = {
+        'Data': [],
+        'Flattened Horizontal Data': [],
+        'Flattened Vertical Data': [],
+        'Metadata': {
+            'Type': '2d-entity-array',
+            'Start': cursors['Horizontal Entity Layout'].cursor.address,
+            'End': 0,
+            'Row Params': [],
+            'Size': size,
+            'Sentinel Entity Count': 0,
+            'Non-Sentinel Entity Count': 0,
+            'Fields': {
+                'X': {
+                    'Offset': 0x00,
+                    'Type': 's16',
+                },
+                'Y': {
+                    'Offset': 0x02,
+                    'Type': 's16',
+                },
+                'Entity Type ID': {
+                    'Offset': 0x04,
+                    'Type': 'u16',
+                },
+                'Entity Room Index': {
+                    'Offset': 0x06,
+                    'Type': 'u16',
+                },
+                'Params': {
+                    'Offset': 0x08,
+                    'Type': 'u16',
                 },
             },
-            'Boss - Olrox': {
-                'Stage': {
-                    'Start': 0x0534C800,
-                    'Size': 320948,
-                },
-                'Offsets': {
-                    'Base Drop Rate': 0x17C4,
-                },
-            },
-            'Boss - Granfaloon': {
-                'Stage': {
-                    'Start': 0x053F7000,
-                    'Size': 205756,
-                },
-                'Offsets': {
-                    'Base Drop Rate': 0x138C,
-                },
-            },
-            'Boss - Minotaur and Werewolf': {
-                'Stage': {
-                    'Start': 0x05473800,
-                    'Size': 223540,
-                },
-                'Offsets': {
-                    'Base Drop Rate': 0x1010,
-                },
-            },
-            'Boss - Scylla': {
-                'Stage': {
-                    'Start': 0x05507000,
-                    'Size': 210224,
-                },
-                'Offsets': {
-                    'Base Drop Rate': 0x1444,
-                },
-            },
-            'Boss - Doppelganger 10': {
-                'Stage': {
-                    'Start': 0x05593000,
-                    'Size': 347704,
-                },
-                'Offsets': {
-                    'Base Drop Rate': 0x09FC,
-                },
-            },
-            'Boss - Hippogryph': {
-                'Stage': {
-                    'Start': 0x05638800,
-                    'Size': 218672,
-                },
-                'Offsets': {
-                    'Base Drop Rate': 0x10AC,
-                },
-            },
-            'Boss - Richter': {
-                'Stage': {
-                    'Start': 0x056C8800,
-                    'Size': 333544,
-                },
-                'Offsets': {
-                    'Base Drop Rate': 0x0A34,
-                },
-            },
-            'Boss - Cerberus': {
-                'Stage': {
-                    'Start': 0x0596D000,
-                    'Size': 144480,
-                },
-                'Offsets': {
-                    'Base Drop Rate': 0x0C34,
-                },
-            },
-            'Boss - Trio': {
-                'Stage': {
-                    'Start': 0x05775000,
-                    'Size': 160988,
-                },
-                'Offsets': {
-                    'Base Drop Rate': 0x117C,
-                },
-            },
-            'Boss - Beelzebub': {
-                'Stage': {
-                    'Start': 0x05870000,
-                    'Size': 139104,
-                },
-                'Offsets': {
-                    'Base Drop Rate': 0x0D3C,
-                },
-            },
-            'Boss - Death': {
-                'Stage': {
-                    'Start': 0x058ED800,
-                    'Size': 190792,
-                },
-                'Offsets': {
-                    'Base Drop Rate': 0x0F7C,
-                },
-            },
-            'Boss - Medusa': {
-                'Stage': {
-                    'Start': 0x059E9800,
-                    'Size': 132656,
-                },
-                'Offsets': {
-                    'Base Drop Rate': 0x0A9C,
-                },
-            },
-            'Boss - Creature': {
-                'Stage': {
-                    'Start': 0x05A65000,
-                    'Size': 154660,
-                },
-                'Offsets': {
-                    'Base Drop Rate': 0x0BA8,
-                },
-            },
-            'Boss - Doppelganger 40': {
-                'Stage': {
-                    'Start': 0x05AE3800,
-                    'Size': 345096,
-                },
-                'Offsets': {
-                    'Base Drop Rate': 0x0A88,
-                },
-            },
-            'Boss - Shaft and Dracula': {
-                'Stage': {
-                    'Start': 0x05B93800,
-                    'Size': 213060,
-                },
-                'Offsets': {
-                    'Base Drop Rate': 0x0C90,
-                },
-            },
-            'Boss - Succubus': {
-                'Stage': {
-                    'Start': 0x04F31000,
-                    'Size': 147456,
-                },
-                'Offsets': {
-                    'Base Drop Rate': 0x0CC8,
-                },
-            },
-            'Boss - Akmodan II': {
-                'Stage': {
-                    'Start': 0x05C24000,
-                    'Size': 142572,
-                },
-                'Offsets': {
-                    'Base Drop Rate': 0x0AF4,
-                },
-            },
-            'Boss - Galamoth': {
-                'Stage': {
-                    'Start': 0x05C9F800,
-                    'Size': 161212,
-                },
-                'Offsets': {
-                    'Base Drop Rate': 0x1B28,
-                },
-            },
-            'Castle Center': {
-                'Stage': {
-                    'Start': 0x03C65000,
-                    'Size': 119916,
-                },
-                'Offsets': {
-                    'Base Drop Rate': 0x0B04,
-                },
-            },
-            'Castle Entrance': {
-                'Stage': {
-                    'Start': 0x041A7800,
-                    'Size': 0,
-                },
-                'Offsets': {
-                    'Base Drop Rate': 0x200C,
-                },
-            },
-            'Castle Entrance Revisited': {
-                'Stage': {
-                    'Start': 0x0491A800,
-                    'Size': 0,
-                },
-                'Offsets': {
-                    'Base Drop Rate': 0x1998,
-                },
-            },
-            'Castle Keep': {
-                'Stage': {
-                    'Start': 0x04AEF000,
-                    'Size': 247132,
-                },
-                'Offsets': {
-                    'Base Drop Rate': 0x1194,
-                },
-            },
-            'Catacombs': {
-                'Stage': {
-                    'Start': 0x03BB3000,
-                    'Size': 361920,
-                },
-                'Offsets': {
-                    'Base Drop Rate': 0x1AE4,
-                },
-            },
-            'Cave': {
-                'Stage': {
-                    'Start': 0x0439B800,
-                    'Size': 174880,
-                },
-                'Offsets': {
-                    'Base Drop Rate': 0x0C68,
-                },
-            },
-            'Clock Tower': {
-                'Stage': {
-                    'Start': 0x04A67000,
-                    'Size': 271168,
-                },
-                'Offsets': {
-                    'Base Drop Rate': 0x1664,
-                },
-            },
-            'Colosseum': {
-                'Stage': {
-                    'Start': 0x03B00000,
-                    'Size': 352636,
-                },
-                'Offsets': {
-                    'Base Drop Rate': 0x1364,
-                },
-            },
-            'Cutscene - Meeting Maria in Clock Room': {
-                'Stage': {
-                    'Start': 0x057F9800,
-                    'Size': 0,
-                },
-                'Offsets': {
-                    'Base Drop Rate': 0x0AB0,
-                },
-            },
-            'Death Wing\'s Lair': {
-                'Stage': {
-                    'Start': 0x04680800,
-                    'Size': 313816,
-                },
-                'Offsets': {
-                    'Base Drop Rate': 0x1294,
-                },
-            },
-            'Floating Catacombs': {
-                'Stage': {
-                    'Start': 0x04307000,
-                    'Size': 278188,
-                },
-                'Offsets': {
-                    'Base Drop Rate': 0x18B0,
-                },
-            },
-            'Forbidden Library': {
-                'Stage': {
-                    'Start': 0x044B0000,
-                    'Size': 201776,
-                },
-                'Offsets': {
-                    'Base Drop Rate': 0x0F80,
-                },
-            },
-            'Long Library': {
-                'Stage': {
-                    'Start': 0x03E5F800,
-                    'Size': 348876,
-                },
-                'Offsets': {
-                    'Base Drop Rate': 0x1FC8,
-                },
-            },
-            'Marble Gallery': {
-                'Stage': {
-                    'Start': 0x03F8B000,
-                    'Size': 390540,
-                },
-                'Offsets': {
-                    'Base Drop Rate': 0x1488,
-                },
-            },
-            'Necromancy Laboratory': {
-                'Stage': {
-                    'Start': 0x04D81000,
-                    'Size': 281512,
-                },
-                'Offsets': {
-                    'Base Drop Rate': 0x110C,
-                },
-            },
-            'Olrox\'s Quarters': {
-                'Stage': {
-                    'Start': 0x040FB000,
-                    'Size': 327100,
-                },
-                'Offsets': {
-                    'Base Drop Rate': 0x1374,
-                },
-            },
-            'Outer Wall': {
-                'Stage': {
-                    'Start': 0x04047000,
-                    'Size': 356452,
-                },
-                'Offsets': {
-                    'Base Drop Rate': 0x1DA8,
-                },
-            },
-            'Prologue': {
-                'Stage': {
-                    'Start': 0x0487C800,
-                    'Size': 271812,
-                },
-                'Offsets': {
-                    'Base Drop Rate': 0x1934,
-                },
-            },
-            'Reverse Caverns': {
-                'Stage': {
-                    'Start': 0x047C3800,
-                    'Size': 384020,
-                },
-                'Offsets': {
-                    'Base Drop Rate': 0x1AF4,
-                },
-            },
-            'Reverse Castle Center': {
-                'Stage': {
-                    'Start': 0x04B87800,
-                    'Size': 186368,
-                },
-                'Offsets': {
-                    'Base Drop Rate': 0x0DD8,
-                },
-            },
-            'Reverse Clock Tower': {
-                'Stage': {
-                    'Start': 0x04E22000,
-                    'Size': 260960,
-                },
-                'Offsets': {
-                    'Base Drop Rate': 0x1698,
-                },
-            },
-            'Reverse Colosseum': {
-                'Stage': {
-                    'Start': 0x04C07800,
-                    'Size': 234384,
-                },
-                'Offsets': {
-                    'Base Drop Rate': 0x0E2C,
-                },
-            },
-            'Reverse Entrance': {
-                'Stage': {
-                    'Start': 0x0471E000,
-                    'Size': 304428,
-                },
-                'Offsets': {
-                    'Base Drop Rate': 0x1498,
-                },
-            },
-            'Reverse Keep': {
-                'Stage': {
-                    'Start': 0x04C84000,
-                    'Size': 200988,
-                },
-                'Offsets': {
-                    'Base Drop Rate': 0x0C7C,
-                },
-            },
-            'Reverse Outer Wall': {
-                'Stage': {
-                    'Start': 0x045EE000,
-                    'Size': 357020,
-                },
-                'Offsets': {
-                    'Base Drop Rate': 0x1158,
-                },
-            },
-            'Reverse Warp Rooms': {
-                'Stage': {
-                    'Start': 0x04EBE000,
-                    'Size': 92160,
-                },
-                'Offsets': {
-                    'Base Drop Rate': 0x09DC,
-                },
-            },
-            'Royal Chapel': {
-                'Stage': {
-                    'Start': 0x03D5A800,
-                    'Size': 373764,
-                },
-                'Offsets': {
-                    'Base Drop Rate': 0x13BC,
-                },
-            },
-            'Underground Caverns': {
-                'Stage': {
-                    'Start': 0x04257800,
-                    'Size': 391260,
-                },
-                'Offsets': {
-                    'Base Drop Rate': 0x1D40,
-                },
-            },
-            'Warp Rooms': {
-                'Stage': {
-                    'Start': 0x04D12800,
-                    'Size': 83968,
-                },
-                'Offsets': {
-                    'Base Drop Rate': 0x09DC,
-                },
+        },
+    }
+    size = stage_entity_layout['Metadata']['Size']
+    # Entity layouts for the current room
+    # NOTE(sestren): Marble Gallery is laid out weird; the 2D data is not contiguous
+    entity_layout_constants = {
+        'Horizontal Layout': cursors['Horizontal Entity Layout'].u32(0, True),
+        'Vertical Layout': cursors['Vertical Entity Layout'].u32(0, True),
+        'Layout Indexes': [],
+        'Row Indexes': [],
+    }
+    layout_cursor = cursors['Horizontal Entity Layout'].clone(0)
+    while layout_cursor.cursor.address < cursors['Vertical Entity Layout'].cursor.address:
+        layout_index = (layout_cursor.u32() - cursors['Horizontal Entity Layout'].u32()) // size
+        entity_layout_constants['Layout Indexes'].append(layout_index)
+        layout_cursor.seek(4)
+    layout_cursor = cursors['Horizontal Entity Layout'].clone(0)
+    current_object_layout_offset = cursors['Horizontal Entity Layout'].u32(0) - OFFSET
+    target_object_layout_offset = cursors['Vertical Entity Layout'].u32(0) - OFFSET
+    entity_cursor = cursors['Stage'].clone(current_object_layout_offset)
+    entity_layout_constants['Horizontal Table Start'] = entity_cursor.cursor.address
+    target_cursor = cursors['Stage'].clone(target_object_layout_offset)
+    entity_layout_constants['Vertical Table Start'] = target_cursor.cursor.address
+    offset = 0
+    contiguous_ind = True
+    while entity_cursor.cursor.address <= (target_cursor.cursor.address - 4):
+        x = entity_cursor.s16(0x0)
+        y = entity_cursor.s16(0x2)
+        entity_type_id = entity_cursor.u16(0x4)
+        entity_room_index = entity_cursor.u16(0x6)
+        params = entity_cursor.u16(0x8)
+        stage_entity_layout['Flattened Horizontal Data'].append({
+            'X': x,
+            'Y': y,
+            'Entity Type ID': entity_type_id,
+            'Entity Room Index': entity_room_index,
+            'Params': params,
+            'Sort': offset,
+        })
+        vertical_offset = target_object_layout_offset - current_object_layout_offset
+        stage_entity_layout['Flattened Vertical Data'].append({
+            'X': entity_cursor.s16(vertical_offset + 0x0),
+            'Y': entity_cursor.s16(vertical_offset + 0x2),
+            'Entity Type ID': entity_cursor.u16(vertical_offset + 0x4),
+            'Entity Room Index': entity_cursor.u16(vertical_offset + 0x6),
+            'Params': entity_cursor.u16(vertical_offset + 0x8),
+            'Sort': offset,
+        })
+        if x in (-2, -1):
+            stage_entity_layout['Metadata']['Sentinel Entity Count'] += 1
+        if x == -2:
+            stage_entity_layout['Data'].append([])
+            stage_entity_layout['Metadata']['Row Params'].append(params)
+            row_index = offset // size
+            entity_layout_constants['Row Indexes'].append(row_index)
+            layout_cursor.seek(4)
+        entity_cursor.seek(size)
+        offset += size
+        if x == -2:
+            continue
+        elif x == -1:
+            padding = 0
+            next_xy = (entity_cursor.s16(0x0), entity_cursor.s16(0x2))
+            while next_xy != (-2, -2) and entity_cursor.cursor.address < (target_cursor.cursor.address - 4):
+                # NOTE(sestren): Suppress requiring contiguous data for now
+                # contiguous_ind = False
+                entity_cursor.seek(4)
+                offset += 4
+                padding += 4
+                next_xy = (entity_cursor.s16(0x0), entity_cursor.s16(0x2))
+            if padding > 0:
+                stage_entity_layout['Data'][-1][-1]['Padding'] = padding
+            continue
+        data = {
+            'X': x,
+            'Y': y,
+            'Entity Type ID': entity_type_id,
+            'Entity Room Index': entity_room_index,
+            'Params': params,
+            'Horizontal Sort': offset,
+            'Vertical Sort': -1,
+        }
+        stage_entity_layout['Data'][-1].append(data)
+        stage_entity_layout['Metadata']['Non-Sentinel Entity Count'] += 1
+    # The next 2D-array must start at the next 4-byte alignment
+    entity_cursor.seek(offset % 4)
+    # Verify that the vertical entity layout starts immediately after
+    stage_entity_layout['Metadata']['End'] = entity_cursor.cursor.address
+    x = entity_cursor.s16(0x0)
+    y = entity_cursor.s16(0x2)
+    entity_type_id = entity_cursor.u16(0x4)
+    entity_room_index = entity_cursor.u16(0x6)
+    params = entity_cursor.u16(0x8)
+    assert (x,  y, entity_type_id, entity_room_index, params) in ((-2, -2, 0, 0, 0), (-2, -2, 0, 0, 1))
+    if contiguous_ind:
+        result['Entity Layout'] = stage_entity_layout
+    update_vertical_sorts(stage_entity_layout)
+    # Base Drop Rates
+    if stage.get('Offsets', {}).get('Base Drop Rate', None) is not None:
+        base_drop_rate_cursor = cursors['Stage'].clone(stage['Offsets']['Base Drop Rate'])
+        result['Base Drop Rate'] = {
+            'Metadata': {
+                'Start': base_drop_rate_cursor.cursor.address,
+                'Count': 4,
+                'Size': 0x01,
+                'Type': 'u8',
             },
+            'Data': [],
         }
-        for stage_name in stages.keys():
-            # print('', stage_name)
-            cursors = {}
-            stage_offset = stages[stage_name]['Stage']['Start']
-            cursors['Stage'] = BIN(binary_file, stage_offset)
-            for (address, cursor_name) in (
-                # (0x00, 'Function Updates??'), # 801C37B8 for Marble Gallery
-                # (0x04, 'Function Hit Detection??'), # 801C3BBC for Marble Gallery
-                # (0x08, 'Function Update Room Pos??'), # 801C5D4C for Marble Gallery
-                (0x0C, 'Entities'), # 801C5BD4 for Marble Gallery
-                (0x10, 'Rooms'), # 801827E0 for Marble Gallery
-                # (0x14, 'Sprites??'), # 8018002C for Marble Gallery
-                # (0x18, 'CLUTs??'), # 8018014C for Marble Gallery
-                # (0x1C, 'Layouts??'), # 80180778 for Marble Gallery
-                (0x20, 'Layouts'), # or maybe Layers??? 801804B0 for Marble Gallery
-                # (0x24, 'Graphics??'), # 8018074C for Marble Gallery
-                # (0x28, 'Functions 4??'), # 801C3AB4 for Marble Gallery
-            ):
-                stage_offset = cursors['Stage'].u32(address) - OFFSET
-                cursors[cursor_name] = cursors['Stage'].clone(stage_offset)
-            # Entity Layout data
-            size = 10
-            cursors['Horizontal Entity Layout'] = cursors['Stage'].clone(cursors['Entities'].u16(0x1C))
-            cursors['Vertical Entity Layout'] = cursors['Stage'].clone(cursors['Entities'].u16(0x28))
-            stage_entity_layout = {
-                'Data': [],
-                'Flattened Horizontal Data': [],
-                'Flattened Vertical Data': [],
+        for index in range(result['Base Drop Rate']['Metadata']['Count']):
+            value = base_drop_rate_cursor.u8(index)
+            result['Base Drop Rate']['Data'].append(value)
+    # Room data
+    result['Rooms'] = {}
+    for room_id in range(256):
+        cursors['Current Room'] = cursors['Rooms'].clone(0x08 * room_id)
+        if cursors['Current Room'].u8() == 0x40:
+            break
+        room_data = {
+            'Left': cursors['Current Room'].u8(0x00, True),
+            'Top': cursors['Current Room'].u8(0x01, True),
+            'Right': cursors['Current Room'].u8(0x02, True),
+            'Bottom': cursors['Current Room'].u8(0x03, True),
+            'Tile Layout ID': cursors['Current Room'].u8(0x04, True),
+            'Tileset ID': cursors['Current Room'].s8(0x05, True),
+            'Object Graphics ID': cursors['Current Room'].u8(0x06, True),
+            'Object Layout ID': cursors['Current Room'].u8(0x07, True),
+        }
+        result['Rooms'][room_id] = room_data
+        # Tile layout for the current room
+        if result['Rooms'][room_id]['Tileset ID']['Value'] == -1:
+            continue
+        tile_layout_id = result['Rooms'][room_id]['Tile Layout ID']['Value']
+        tile_layout_offset = cursors['Layouts'].u32(0x08 * tile_layout_id) - OFFSET
+        cursors['Current Tile Layout'] = cursors['Stage'].clone(tile_layout_offset)
+        tile_layout = {
+            'Tiles': cursors['Current Tile Layout'].u32(0x0, True),
+            'Defs': cursors['Current Tile Layout'].u32(0x4, True),
+            'Layout Rect': cursors['Current Tile Layout'].u32(0x8, True),
+            'Z Priority': cursors['Current Tile Layout'].u16(0xC, True),
+            'Flags': cursors['Current Tile Layout'].u16(0xE, True),
+        }
+        result['Rooms'][room_id]['Tile Layout'] = tile_layout
+        # Tile map for the current room
+        stage_offset = tile_layout['Tiles']['Value'] - OFFSET
+        cursors['Tilemap'] = cursors['Stage'].clone(stage_offset)
+        rows = 16 * (1 + room_data['Bottom']['Value'] - room_data['Top']['Value'])
+        cols = 16 * (1 + room_data['Right']['Value'] - room_data['Left']['Value'])
+        for (plane_id, plane) in enumerate((
+            'Foreground',
+            'Background',
+        )):
+            plane_cursor = cursors['Tilemap'].clone(2 * (plane_id * rows * cols))
+            # Each plane is a contiguous, row-major block of little-endian u16 tiles
+            tilemap_data = array.array('H')
+            tilemap_data.frombytes(plane_cursor.read_bytes(0, 2 * rows * cols))
+            if sys.byteorder != 'little':
+                tilemap_data.byteswap()
+            result['Rooms'][room_id]['Tilemap ' + plane] = {
                 'Metadata': {
-                    'Type': '2d-entity-array',
-                    'Start': cursors['Horizontal Entity Layout'].cursor.address,
-                    'End': 0,
-                    'Row Params': [],
-                    'Size': size,
-                    'Sentinel Entity Count': 0,
-                    'Non-Sentinel Entity Count': 0,
+                    'Start': plane_cursor.cursor.address,
+                    'Rows': rows,
+                    'Columns': cols,
+                    'Type': 'tile-array',
+                },
+                'Data': tilemap_data,
+            }
+        # Object layouts for the current room
+        object_layout_id = result['Rooms'][room_id]['Object Layout ID']['Value']
+        for direction in (
+            'Horizontal',
+            'Vertical',
+        ):
+            # Object list
+            object_layout_offset = cursors[direction + ' Entity Layout'].u32(4 * object_layout_id) - OFFSET
+            cursors[direction] = cursors['Stage'].clone(object_layout_offset)
+            objects = {
+                'Metadata': {
+                    'Start': cursors[direction].cursor.address,
+                    'Size': 0x0A,
+                    'Count': 0,
                     'Fields': {
                         'X': {
                             'Offset': 0x00,
@@ -761,806 +658,1312 @@ if __name__ == '__main__':
                         },
                     },
                 },
+                'Data': [],
             }
-            size = stage_entity_layout['Metadata']['Size']
-            # Entity layouts for the current room
-            # NOTE(sestren): Marble Gallery is laid out weird; the 2D data is not contiguous
-            constants['Entity Layout'][stage_name] = {
-                'Horizontal Layout': cursors['Horizontal Entity Layout'].u32(0, True),
-                'Vertical Layout': cursors['Vertical Entity Layout'].u32(0, True),
-                'Layout Indexes': [],
-                'Row Indexes': [],
-            }
-            layout_cursor = cursors['Horizontal Entity Layout'].clone(0)
-            while layout_cursor.cursor.address < cursors['Vertical Entity Layout'].cursor.address:
-                layout_index = (layout_cursor.u32() - cursors['Horizontal Entity Layout'].u32()) // size
-                constants['Entity Layout'][stage_name]['Layout Indexes'].append(layout_index)
-                layout_cursor.seek(4)
-            layout_cursor = cursors['Horizontal Entity Layout'].clone(0)
-            current_object_layout_offset = cursors['Horizontal Entity Layout'].u32(0) - OFFSET
-            target_object_layout_offset = cursors['Vertical Entity Layout'].u32(0) - OFFSET
-            entity_cursor = cursors['Stage'].clone(current_object_layout_offset)
-            constants['Entity Layout'][stage_name]['Horizontal Table Start'] = entity_cursor.cursor.address
-            target_cursor = cursors['Stage'].clone(target_object_layout_offset)
-            constants['Entity Layout'][stage_name]['Vertical Table Start'] = target_cursor.cursor.address
             offset = 0
-            contiguous_ind = True
-            while entity_cursor.cursor.address <= (target_cursor.cursor.address - 4):
-                x = entity_cursor.s16(0x0)
-                y = entity_cursor.s16(0x2)
-                entity_type_id = entity_cursor.u16(0x4)
-                entity_room_index = entity_cursor.u16(0x6)
-                params = entity_cursor.u16(0x8)
-                stage_entity_layout['Flattened Horizontal Data'].append({
-                    'X': x,
-                    'Y': y,
-                    'Entity Type ID': entity_type_id,
-                    'Entity Room Index': entity_room_index,
-                    'Params': params,
-                    'Sort': offset,
-                })
-                vertical_offset = target_object_layout_offset - current_object_layout_offset
-                stage_entity_layout['Flattened Vertical Data'].append({
-                    'X': entity_cursor.s16(vertical_offset + 0x0),
-                    'Y': entity_cursor.s16(vertical_offset + 0x2),
-                    'Entity Type ID': entity_cursor.u16(vertical_offset + 0x4),
-                    'Entity Room Index': entity_cursor.u16(vertical_offset + 0x6),
-                    'Params': entity_cursor.u16(vertical_offset + 0x8),
-                    'Sort': offset,
-                })
-                if x in (-2, -1):
-                    stage_entity_layout['Metadata']['Sentinel Entity Count'] += 1
-                if x == -2:
-                    stage_entity_layout['Data'].append([])
-                    stage_entity_layout['Metadata']['Row Params'].append(params)
-                    row_index = offset // size
-                    constants['Entity Layout'][stage_name]['Row Indexes'].append(row_index)
-                    layout_cursor.seek(4)
-                entity_cursor.seek(size)
-                offset += size
-                if x == -2:
-                    continue
-                elif x == -1:
-                    padding = 0
-                    next_xy = (entity_cursor.s16(0x0), entity_cursor.s16(0x2))
-                    while next_xy != (-2, -2) and entity_cursor.cursor.address < (target_cursor.cursor.address - 4):
-                        # NOTE(sestren): Suppress requiring contiguous data for now
-                        # contiguous_ind = False
-                        entity_cursor.seek(4)
-                        offset += 4
-                        padding += 4
-                        next_xy = (entity_cursor.s16(0x0), entity_cursor.s16(0x2))
-                    if padding > 0:
-                        stage_entity_layout['Data'][-1][-1]['Padding'] = padding
-                    continue
+            prev_pos = float('-inf')
+            while True:
+                x = cursors[direction].s16(offset + 0x0)
+                y = cursors[direction].s16(offset + 0x2)
+                entity_type_id = cursors[direction].u16(offset + 0x4)
+                entity_room_index = cursors[direction].u16(offset + 0x6)
+                params = cursors[direction].u16(offset + 0x8)
+                offset += 10
                 data = {
                     'X': x,
                     'Y': y,
                     'Entity Type ID': entity_type_id,
                     'Entity Room Index': entity_room_index,
                     'Params': params,
-                    'Horizontal Sort': offset,
-                    'Vertical Sort': -1,
                 }
-                stage_entity_layout['Data'][-1].append(data)
-                stage_entity_layout['Metadata']['Non-Sentinel Entity Count'] += 1
-            # The next 2D-array must start at the next 4-byte alignment
-            entity_cursor.seek(offset % 4)
-            # Verify that the vertical entity layout starts immediately after
-            stage_entity_layout['Metadata']['End'] = entity_cursor.cursor.address
-            x = entity_cursor.s16(0x0)
-            y = entity_cursor.s16(0x2)
-            entity_type_id = entity_cursor.u16(0x4)
-            entity_room_index = entity_cursor.u16(0x6)
-            params = entity_cursor.u16(0x8)
-            assert (x,  y, entity_type_id, entity_room_index, params) in ((-2, -2, 0, 0, 0), (-2, -2, 0, 0, 1))
-            if contiguous_ind:
-                entity_layouts[stage_name] = stage_entity_layout
-            # Find and update the vertical sorts
-            search_indexes = set(range(len(stage_entity_layout['Flattened Vertical Data'])))
-            for (row_id, row_data) in enumerate(stage_entity_layout['Data']):
-                for (col_id, entity_data) in enumerate(row_data):
-                    matching_index = None
-                    for search_index in search_indexes:
-                        for property in (
-                            'X',
-                            'Y',
-                            'Entity Type ID',
-                            'Entity Room Index',
-                            'Params',
-                        ):
-                            if stage_entity_layout['Flattened Vertical Data'][search_index][property] != entity_data[property]:
-                                break
-                        else:
-                            matching_index = search_index
-                            break
-                    if matching_index is not None:
-                        entity_data['Vertical Sort'] = stage_entity_layout['Flattened Vertical Data'][search_index]['Sort']
-                        search_indexes.remove(matching_index)
-            # Base Drop Rates
-            if stages[stage_name].get('Offsets', {}).get('Base Drop Rate', None) is not None:
-                base_drop_rate_cursor = cursors['Stage'].clone(stages[stage_name]['Offsets']['Base Drop Rate'])
-                base_drop_rates[stage_name] = {
-                    'Metadata': {
-                        'Start': base_drop_rate_cursor.cursor.address,
-                        'Count': 4,
-                        'Size': 0x01,
-                        'Type': 'u8',
-                    },
-                    'Data': [],
-                }
-                for index in range(base_drop_rates[stage_name]['Metadata']['Count']):
-                    value = base_drop_rate_cursor.u8(index)
-                    base_drop_rates[stage_name]['Data'].append(value)
-            # Room data
-            stages[stage_name]['Rooms'] = {}
-            for room_id in range(256):
-                cursors['Current Room'] = cursors['Rooms'].clone(0x08 * room_id)
-                if cursors['Current Room'].u8() == 0x40:
+                objects['Data'].append(data)
+                if x == -1:
                     break
-                room_data = {
-                    'Left': cursors['Current Room'].u8(0x00, True),
-                    'Top': cursors['Current Room'].u8(0x01, True),
-                    'Right': cursors['Current Room'].u8(0x02, True),
-                    'Bottom': cursors['Current Room'].u8(0x03, True),
-                    'Tile Layout ID': cursors['Current Room'].u8(0x04, True),
-                    'Tileset ID': cursors['Current Room'].s8(0x05, True),
-                    'Object Graphics ID': cursors['Current Room'].u8(0x06, True),
-                    'Object Layout ID': cursors['Current Room'].u8(0x07, True),
-                }
-                stages[stage_name]['Rooms'][room_id] = room_data
-                # Tile layout for the current room
-                if stages[stage_name]['Rooms'][room_id]['Tileset ID']['Value'] == -1:
-                    continue
-                tile_layout_id = stages[stage_name]['Rooms'][room_id]['Tile Layout ID']['Value']
-                tile_layout_offset = cursors['Layouts'].u32(0x08 * tile_layout_id) - OFFSET
-                cursors['Current Tile Layout'] = cursors['Stage'].clone(tile_layout_offset)
-                tile_layout = {
-                    'Tiles': cursors['Current Tile Layout'].u32(0x0, True),
-                    'Defs': cursors['Current Tile Layout'].u32(0x4, True),
-                    'Layout Rect': cursors['Current Tile Layout'].u32(0x8, True),
-                    'Z Priority': cursors['Current Tile Layout'].u16(0xC, True),
-                    'Flags': cursors['Current Tile Layout'].u16(0xE, True),
-                }
-                stages[stage_name]['Rooms'][room_id]['Tile Layout'] = tile_layout
-                # Tile map for the current room
-                stage_offset = tile_layout['Tiles']['Value'] - OFFSET
-                cursors['Tilemap'] = cursors['Stage'].clone(stage_offset)
-                rows = 16 * (1 + room_data['Bottom']['Value'] - room_data['Top']['Value'])
-                cols = 16 * (1 + room_data['Right']['Value'] - room_data['Left']['Value'])
-                for (plane_id, plane) in enumerate((
-                    'Foreground',
-                    'Background',
-                )):
-                    plane_cursor = cursors['Tilemap'].clone(2 * (plane_id * rows * cols))
-                    tilemap_data = []
-                    for row in range(rows):
-                        row_data = []
-                        for col in range(cols):
-                            offset = 2 * ((plane_id * rows * cols) + (row * cols) + col)
-                            value = cursors['Tilemap'].u16(offset)
-                            row_data.append(sotn_address._hex(value, 4))
-                        tilemap_data.append(' '.join(row_data))
-                    stages[stage_name]['Rooms'][room_id]['Tilemap ' + plane] = {
-                        'Metadata': {
-                            'Start': plane_cursor.cursor.address,
-                            'Rows': rows,
-                            'Columns': cols,
-                            'Type': 'tile-array',
-                        },
-                        'Data': tilemap_data,
-                    }
-                # Object layouts for the current room
-                object_layout_id = stages[stage_name]['Rooms'][room_id]['Object Layout ID']['Value']
-                for direction in (
-                    'Horizontal',
-                    'Vertical',
-                ):
-                    # Object list
-                    object_layout_offset = cursors[direction + ' Entity Layout'].u32(4 * object_layout_id) - OFFSET
-                    cursors[direction] = cursors['Stage'].clone(object_layout_offset)
-                    objects = {
-                        'Metadata': {
-                            'Start': cursors[direction].cursor.address,
-                            'Size': 0x0A,
-                            'Count': 0,
-                            'Fields': {
-                                'X': {
-                                    'Offset': 0x00,
-                                    'Type': 's16',
-                                },
-                                'Y': {
-                                    'Offset': 0x02,
-                                    'Type': 's16',
-                                },
-                                'Entity Type ID': {
-                                    'Offset': 0x04,
-                                    'Type': 'u16',
-                                },
-                                'Entity Room Index': {
-                                    'Offset': 0x06,
-                                    'Type': 'u16',
-                                },
-                                'Params': {
-                                    'Offset': 0x08,
-                                    'Type': 'u16',
-                                },
-                            },
-                        },
-                        'Data': [],
-                    }
-                    offset = 0
-                    prev_pos = float('-inf')
-                    while True:
-                        x = cursors[direction].s16(offset + 0x0)
-                        y = cursors[direction].s16(offset + 0x2)
-                        entity_type_id = cursors[direction].u16(offset + 0x4)
-                        entity_room_index = cursors[direction].u16(offset + 0x6)
-                        params = cursors[direction].u16(offset + 0x8)
-                        offset += 10
-                        data = {
-                            'X': x,
-                            'Y': y,
-                            'Entity Type ID': entity_type_id,
-                            'Entity Room Index': entity_room_index,
-                            'Params': params,
-                        }
-                        objects['Data'].append(data)
-                        if x == -1:
-                            break
-                        # Assume that the lists are ordered
-                        curr_pos = x if direction == 'Horizontal' else y
-                        assert curr_pos >= prev_pos
-                        prev_pos = curr_pos
-                    objects['Metadata']['Count'] = len(objects['Data'])
-                    stages[stage_name]['Rooms'][room_id]['Object Layout - ' + direction] = objects
-        # Extract teleporter data
-        cursor = BIN(binary_file, 0x00097C5C)
-        teleporters = {
-            'Metadata': {
-                'Start': cursor.cursor.address,
-                'Size': 0x0A,
-                'Count': 131,
-                'Fields': {
-                    'Player X': {
-                        'Offset': 0x00,
-                        'Type': 'u16',
-                    },
-                    'Player Y': {
-                        'Offset': 0x02,
-                        'Type': 'u16',
-                    },
-                    'Room': {
-                        'Offset': 0x04,
-                        'Type': 'u16',
-                    },
-                    'Source Stage ID': {
-                        'Offset': 0x06,
-                        'Type': 'u16',
-                    },
-                    'Target Stage ID': {
-                        'Offset': 0x08,
-                        'Type': 'u16',
-                    },
+                # Assume that the lists are ordered
+                curr_pos = x if direction == 'Horizontal' else y
+                assert curr_pos >= prev_pos
+                prev_pos = curr_pos
+            objects['Metadata']['Count'] = len(objects['Data'])
+            result['Rooms'][room_id]['Object Layout - ' + direction] = objects
+    result['Entity Layout Constants'] = entity_layout_constants
+    return result
+
+def extract_stage_from_file(binary_filepath: str, mmap_ind: bool, stage: dict) -> dict:
+    # Each worker process reads the BIN through its own file handle
+    with open(binary_filepath, 'br') as binary_file:
+        if mmap_ind:
+            with DiscImage(binary_file) as disc_image:
+                result = extract_stage(disc_image, stage)
+        else:
+            result = extract_stage(binary_file, stage)
+    return result
+
+STAGES = {
+    'Abandoned Mine': {
+        'Stage': {
+            'Start': 0x03CDF800,
+            'Size': 193576,
+        },
+        'Offsets': {
+            'Base Drop Rate': 0x0D6C,
+        },
+    },
+    'Alchemy Laboratory': {
+        'Stage': {
+            'Start': 0x049BE800,
+            'Size': 309120,
+        },
+        'Offsets': {
+            'Base Drop Rate': 0x18C0,
+        },
+    },
+    'Anti-Chapel': {
+        'Stage': {
+            'Start': 0x04416000,
+            'Size': 295736,
+        },
+        'Offsets': {
+            'Base Drop Rate': 0x10E4,
+        },
+    },
+    'Black Marble Gallery': {
+        'Stage': {
+            'Start': 0x0453D800,
+            'Size': 347020,
+        },
+        'Offsets': {
+            'Base Drop Rate': 0x13B4,
+        },
+    },
+    'Boss - Olrox': {
+        'Stage': {
+            'Start': 0x0534C800,
+            'Size': 320948,
+        },
+        'Offsets': {
+            'Base Drop Rate': 0x17C4,
+        },
+    },
+    'Boss - Granfaloon': {
+        'Stage': {
+            'Start': 0x053F7000,
+            'Size': 205756,
+        },
+        'Offsets': {
+            'Base Drop Rate': 0x138C,
+        },
+    },
+    'Boss - Minotaur and Werewolf': {
+        'Stage': {
+            'Start': 0x05473800,
+            'Size': 223540,
+        },
+        'Offsets': {
+            'Base Drop Rate': 0x1010,
+        },
+    },
+    'Boss - Scylla': {
+        'Stage': {
+            'Start': 0x05507000,
+            'Size': 210224,
+        },
+        'Offsets': {
+            'Base Drop Rate': 0x1444,
+        },
+    },
+    'Boss - Doppelganger 10': {
+        'Stage': {
+            'Start': 0x05593000,
+            'Size': 347704,
+        },
+        'Offsets': {
+            'Base Drop Rate': 0x09FC,
+        },
+    },
+    'Boss - Hippogryph': {
+        'Stage': {
+            'Start': 0x05638800,
+            'Size': 218672,
+        },
+        'Offsets': {
+            'Base Drop Rate': 0x10AC,
+        },
+    },
+    'Boss - Richter': {
+        'Stage': {
+            'Start': 0x056C8800,
+            'Size': 333544,
+        },
+        'Offsets': {
+            'Base Drop Rate': 0x0A34,
+        },
+    },
+    'Boss - Cerberus': {
+        'Stage': {
+            'Start': 0x0596D000,
+            'Size': 144480,
+        },
+        'Offsets': {
+            'Base Drop Rate': 0x0C34,
+        },
+    },
+    'Boss - Trio': {
+        'Stage': {
+            'Start': 0x05775000,
+            'Size': 160988,
+        },
+        'Offsets': {
+            'Base Drop Rate': 0x117C,
+        },
+    },
+    'Boss - Beelzebub': {
+        'Stage': {
+            'Start': 0x05870000,
+            'Size': 139104,
+        },
+        'Offsets': {
+            'Base Drop Rate': 0x0D3C,
+        },
+    },
+    'Boss - Death': {
+        'Stage': {
+            'Start': 0x058ED800,
+            'Size': 190792,
+        },
+        'Offsets': {
+            'Base Drop Rate': 0x0F7C,
+        },
+    },
+    'Boss - Medusa': {
+        'Stage': {
+            'Start': 0x059E9800,
+            'Size': 132656,
+        },
+        'Offsets': {
+            'Base Drop Rate': 0x0A9C,
+        },
+    },
+    'Boss - Creature': {
+        'Stage': {
+            'Start': 0x05A65000,
+            'Size': 154660,
+        },
+        'Offsets': {
+            'Base Drop Rate': 0x0BA8,
+        },
+    },
+    'Boss - Doppelganger 40': {
+        'Stage': {
+            'Start': 0x05AE3800,
+            'Size': 345096,
+        },
+        'Offsets': {
+            'Base Drop Rate': 0x0A88,
+        },
+    },
+    'Boss - Shaft and Dracula': {
+        'Stage': {
+            'Start': 0x05B93800,
+            'Size': 213060,
+        },
+        'Offsets': {
+            'Base Drop Rate': 0x0C90,
+        },
+    },
+    'Boss - Succubus': {
+        'Stage': {
+            'Start': 0x04F31000,
+            'Size': 147456,
+        },
+        'Offsets': {
+            'Base Drop Rate': 0x0CC8,
+        },
+    },
+    'Boss - Akmodan II': {
+        'Stage': {
+            'Start': 0x05C24000,
+            'Size': 142572,
+        },
+        'Offsets': {
+            'Base Drop Rate': 0x0AF4,
+        },
+    },
+    'Boss - Galamoth': {
+        'Stage': {
+            'Start': 0x05C9F800,
+            'Size': 161212,
+        },
+        'Offsets': {
+            'Base Drop Rate': 0x1B28,
+        },
+    },
+    'Castle Center': {
+        'Stage': {
+            'Start': 0x03C65000,
+            'Size': 119916,
+        },
+        'Offsets': {
+            'Base Drop Rate': 0x0B04,
+        },
+    },
+    'Castle Entrance': {
+        'Stage': {
+            'Start': 0x041A7800,
+            'Size': 0,
+        },
+        'Offsets': {
+            'Base Drop Rate': 0x200C,
+        },
+    },
+    'Castle Entrance Revisited': {
+        'Stage': {
+            'Start': 0x0491A800,
+            'Size': 0,
+        },
+        'Offsets': {
+            'Base Drop Rate': 0x1998,
+        },
+    },
+    'Castle Keep': {
+        'Stage': {
+            'Start': 0x04AEF000,
+            'Size': 247132,
+        },
+        'Offsets': {
+            'Base Drop Rate': 0x1194,
+        },
+    },
+    'Catacombs': {
+        'Stage': {
+            'Start': 0x03BB3000,
+            'Size': 361920,
+        },
+        'Offsets': {
+            'Base Drop Rate': 0x1AE4,
+        },
+    },
+    'Cave': {
+        'Stage': {
+            'Start': 0x0439B800,
+            'Size': 174880,
+        },
+        'Offsets': {
+            'Base Drop Rate': 0x0C68,
+        },
+    },
+    'Clock Tower': {
+        'Stage': {
+            'Start': 0x04A67000,
+            'Size': 271168,
+        },
+        'Offsets': {
+            'Base Drop Rate': 0x1664,
+        },
+    },
+    'Colosseum': {
+        'Stage': {
+            'Start': 0x03B00000,
+            'Size': 352636,
+        },
+        'Offsets': {
+            'Base Drop Rate': 0x1364,
+        },
+    },
+    'Cutscene - Meeting Maria in Clock Room': {
+        'Stage': {
+            'Start': 0x057F9800,
+            'Size': 0,
+        },
+        'Offsets': {
+            'Base Drop Rate': 0x0AB0,
+        },
+    },
+    'Death Wing\'s Lair': {
+        'Stage': {
+            'Start': 0x04680800,
+            'Size': 313816,
+        },
+        'Offsets': {
+            'Base Drop Rate': 0x1294,
+        },
+    },
+    'Floating Catacombs': {
+        'Stage': {
+            'Start': 0x04307000,
+            'Size': 278188,
+        },
+        'Offsets': {
+            'Base Drop Rate': 0x18B0,
+        },
+    },
+    'Forbidden Library': {
+        'Stage': {
+            'Start': 0x044B0000,
+            'Size': 201776,
+        },
+        'Offsets': {
+            'Base Drop Rate': 0x0F80,
+        },
+    },
+    'Long Library': {
+        'Stage': {
+            'Start': 0x03E5F800,
+            'Size': 348876,
+        },
+        'Offsets': {
+            'Base Drop Rate': 0x1FC8,
+        },
+    },
+    'Marble Gallery': {
+        'Stage': {
+            'Start': 0x03F8B000,
+            'Size': 390540,
+        },
+        'Offsets': {
+            'Base Drop Rate': 0x1488,
+        },
+    },
+    'Necromancy Laboratory': {
+        'Stage': {
+            'Start': 0x04D81000,
+            'Size': 281512,
+        },
+        'Offsets': {
+            'Base Drop Rate': 0x110C,
+        },
+    },
+    'Olrox\'s Quarters': {
+        'Stage': {
+            'Start': 0x040FB000,
+            'Size': 327100,
+        },
+        'Offsets': {
+            'Base Drop Rate': 0x1374,
+        },
+    },
+    'Outer Wall': {
+        'Stage': {
+            'Start': 0x04047000,
+            'Size': 356452,
+        },
+        'Offsets': {
+            'Base Drop Rate': 0x1DA8,
+        },
+    },
+    'Prologue': {
+        'Stage': {
+            'Start': 0x0487C800,
+            'Size': 271812,
+        },
+        'Offsets': {
+            'Base Drop Rate': 0x1934,
+        },
+    },
+    'Reverse Caverns': {
+        'Stage': {
+            'Start': 0x047C3800,
+            'Size': 384020,
+        },
+        'Offsets': {
+            'Base Drop Rate': 0x1AF4,
+        },
+    },
+    'Reverse Castle Center': {
+        'Stage': {
+            'Start': 0x04B87800,
+            'Size': 186368,
+        },
+        'Offsets': {
+            'Base Drop Rate': 0x0DD8,
+        },
+    },
+    'Reverse Clock Tower': {
+        'Stage': {
+            'Start': 0x04E22000,
+            'Size': 260960,
+        },
+        'Offsets': {
+            'Base Drop Rate': 0x1698,
+        },
+    },
+    'Reverse Colosseum': {
+        'Stage': {
+            'Start': 0x04C07800,
+            'Size': 234384,
+        },
+        'Offsets': {
+            'Base Drop Rate': 0x0E2C,
+        },
+    },
+    'Reverse Entrance': {
+        'Stage': {
+            'Start': 0x0471E000,
+            'Size': 304428,
+        },
+        'Offsets': {
+            'Base Drop Rate': 0x1498,
+        },
+    },
+    'Reverse Keep': {
+        'Stage': {
+            'Start': 0x04C84000,
+            'Size': 200988,
+        },
+        'Offsets': {
+            'Base Drop Rate': 0x0C7C,
+        },
+    },
+    'Reverse Outer Wall': {
+        'Stage': {
+            'Start': 0x045EE000,
+            'Size': 357020,
+        },
+        'Offsets': {
+            'Base Drop Rate': 0x1158,
+        },
+    },
+    'Reverse Warp Rooms': {
+        'Stage': {
+            'Start': 0x04EBE000,
+            'Size': 92160,
+        },
+        'Offsets': {
+            'Base Drop Rate': 0x09DC,
+        },
+    },
+    'Royal Chapel': {
+        'Stage': {
+            'Start': 0x03D5A800,
+            'Size': 373764,
+        },
+        'Offsets': {
+            'Base Drop Rate': 0x13BC,
+        },
+    },
+    'Underground Caverns': {
+        'Stage': {
+            'Start': 0x04257800,
+            'Size': 391260,
+        },
+        'Offsets': {
+            'Base Drop Rate': 0x1D40,
+        },
+    },
+    'Warp Rooms': {
+        'Stage': {
+            'Start': 0x04D12800,
+            'Size': 83968,
+        },
+        'Offsets': {
+            'Base Drop Rate': 0x09DC,
+        },
+    },
+}
+
+def extract_stages(binary_file, args) -> dict:
+    # Stages are extracted in parallel when more than one worker is requested
+    stages = copy.deepcopy(STAGES)
+    if args.workers > 1:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=args.workers) as executor:
+            stage_extractions = list(executor.map(
+                extract_stage_from_file,
+                itertools.repeat(args.binary_filepath),
+                itertools.repeat(args.mmap),
+                stages.values(),
+            ))
+    else:
+        stage_extractions = list(extract_stage(binary_file, stage) for stage in stages.values())
+    entity_layouts = {}
+    entity_layout_constants = {}
+    base_drop_rates = {}
+    # Results are merged in stage order, so the extraction is the same regardless of how it was run
+    for (stage_name, stage_extraction) in zip(stages.keys(), stage_extractions):
+        if stage_extraction['Entity Layout'] is not None:
+            entity_layouts[stage_name] = stage_extraction['Entity Layout']
+        entity_layout_constants[stage_name] = stage_extraction['Entity Layout Constants']
+        if stage_extraction['Base Drop Rate'] is not None:
+            base_drop_rates[stage_name] = stage_extraction['Base Drop Rate']
+        stages[stage_name]['Rooms'] = stage_extraction['Rooms']
+    result = {
+        'Base Drop Rates': base_drop_rates,
+        'Constants': {
+            'Entity Layout': entity_layout_constants,
+        },
+        'Entity Layouts': entity_layouts,
+        'Stages': stages,
+    }
+    return result
+
+def extract_teleporters(binary_file, args) -> dict:
+    # Extract teleporter data
+    cursor = BIN(binary_file, 0x00097C5C)
+    teleporters = {
+        'Metadata': {
+            'Start': cursor.cursor.address,
+            'Size': 0x0A,
+            'Count': 131,
+            'Fields': {
+                'Player X': {
+                    'Offset': 0x00,
+                    'Type': 'u16',
+                },
+                'Player Y': {
+                    'Offset': 0x02,
+                    'Type': 'u16',
+                },
+                'Room': {
+                    'Offset': 0x04,
+                    'Type': 'u16',
+                },
+                'Source Stage ID': {
+                    'Offset': 0x06,
+                    'Type': 'u16',
+                },
+                'Target Stage ID': {
+                    'Offset': 0x08,
+                    'Type': 'u16',
                 },
             },
-            'Data': [],
-        }
-        for teleporter_id in range(131):
-            data = {
-                'Player X': cursor.u16(0x0A * teleporter_id + 0x00),
-                'Player Y': cursor.u16(0x0A * teleporter_id + 0x02),
-                'Room': cursor.u16(0x0A * teleporter_id + 0x04),
-                'Source Stage ID': cursor.u16(0x0A * teleporter_id + 0x06),
-                'Target Stage ID': cursor.u16(0x0A * teleporter_id + 0x08),
-            }
-            teleporters['Data'].append(data)
-        # Extract boss teleporter data
-        cursor = BIN(binary_file, 0x0009817C)
-        boss_teleporters = {
-            'Metadata': {
-                'Start': cursor.cursor.address,
-                'Size': 0x14,
-                'Count': 28,
-                'Fields': {
-                    'Room X': {
-                        'Offset': 0x00,
-                        'Type': 'u8',
-                    },
-                    'Room Y': {
-                        'Offset': 0x04,
-                        'Type': 'u8',
-                    },
-                    'Stage ID': {
-                        'Offset': 0x08,
-                        'Type': 'u32',
-                    },
-                    'Event ID': {
-                        'Offset': 0x0C,
-                        'Type': 's8',
-                    },
-                    'Teleporter Index': {
-                        'Offset': 0x10,
-                        'Type': 's32',
-                    },
+        },
+        'Data': [],
+    }
+    teleporters['Data'] = cursor.table(teleporters['Metadata'])
+    result = {
+        'Teleporters': teleporters,
+    }
+    return result
+
+def extract_boss_teleporters(binary_file, args) -> dict:
+    # Extract boss teleporter data
+    cursor = BIN(binary_file, 0x0009817C)
+    boss_teleporters = {
+        'Metadata': {
+            'Start': cursor.cursor.address,
+            'Size': 0x14,
+            'Count': 28,
+            'Fields': {
+                'Room X': {
+                    'Offset': 0x00,
+                    'Type': 'u8',
+                },
+                'Room Y': {
+                    'Offset': 0x04,
+                    'Type': 'u8',
+                },
+                'Stage ID': {
+                    'Offset': 0x08,
+                    'Type': 'u32',
+                },
+                'Event ID': {
+                    'Offset': 0x0C,
+                    'Type': 's8',
+                },
+                'Teleporter Index': {
+                    'Offset': 0x10,
+                    'Type': 's32',
                 },
             },
-            'Data': [],
-        }
-        for boss_teleporter_id in range(28):
-            data = {
-                'Room X': cursor.u8(0x14 * boss_teleporter_id + 0x00),
-                'Room Y': cursor.u8(0x14 * boss_teleporter_id + 0x04),
-                'Stage ID': cursor.u32(0x14 * boss_teleporter_id + 0x08),
-                'Event ID': cursor.s8(0x14 * boss_teleporter_id + 0x0C),
-                'Teleporter Index': cursor.s32(0x14 * boss_teleporter_id + 0x10),
-            }
-            boss_teleporters['Data'].append(data)
-        # Extract constant data stored as arrays
-        for (starting_address, data_type, array_count, array_name) in (
-            # Unique item drops in First Castle
-            (0x03CE01E4, 'u16', 13, 'Unique Item Drops (Abandoned Mine)'),
-            (0x049BFBB0, 'u16', 11, 'Unique Item Drops (Alchemy Laboratory)'),
-            (0x0550808C, 'u16', 37, 'Unique Item Drops (Boss - Scylla)'),
-            (0x041A948C, 'u16', 10, 'Unique Item Drops (Castle Entrance)'),
-            (0x0491BE18, 'u16', 10, 'Unique Item Drops (Castle Entrance Revisited)'),
-            (0x04AEFD10, 'u16', 19, 'Unique Item Drops (Castle Keep)'),
-            (0x03BB474C, 'u16', 21, 'Unique Item Drops (Catacombs)'),
-            (0x04A6811C, 'u16', 12, 'Unique Item Drops (Clock Tower)'),
-            (0x03B00FE8, 'u16', 8, 'Unique Item Drops (Colosseum)'),
-            (0x03E61290, 'u16', 11, 'Unique Item Drops (Long Library)'),
-            (0x03F8C100, 'u16', 14, 'Unique Item Drops (Marble Gallery)'),
-            (0x040FBFEC, 'u16', 13, "Unique Item Drops (Olrox's Quarters)"),
-            (0x04048A2C, 'u16', 7, 'Unique Item Drops (Outer Wall)'),
-            (0x03D5B6C0, 'u16', 16, 'Unique Item Drops (Royal Chapel)'),
-            (0x04259128, 'u16', 37, 'Unique Item Drops (Underground Caverns)'),
-            # Unique item drops in Inverted Castle
-            (0x0439BFCC, 'u16', 8, 'Unique Item Drops (Cave)'),
-            (0x04D81CC8, 'u16', 10, 'Unique Item Drops (Necromancy Laboratory)'),
-            (0x0471EF10, 'u16', 10, 'Unique Item Drops (Reverse Entrance)'),
-            (0x04C847C8, 'u16', 25, 'Unique Item Drops (Reverse Keep)'),
-            (0x043083C8, 'u16', 18, 'Unique Item Drops (Floating Catacombs)'),
-            (0x04E22EC8, 'u16', 12, 'Unique Item Drops (Reverse Clock Tower)'),
-            (0x04C0823C, 'u16', 8, 'Unique Item Drops (Reverse Colosseum)'),
-            (0x044B0BC8, 'u16', 9, 'Unique Item Drops (Forbidden Library)'),
-            (0x0453E78C, 'u16', 12, 'Unique Item Drops (Black Marble Gallery)'),
-            (0x04681540, 'u16', 12, "Unique Item Drops (Death Wing's Lair)"),
-            (0x045EEAE4, 'u16', 8, 'Unique Item Drops (Reverse Outer Wall)'),
-            (0x04416D2C, 'u16', 18, 'Unique Item Drops (Anti-Chapel)'),
-            (0x047C4E20, 'u16', 27, 'Unique Item Drops (Reverse Caverns)'),
-            # Breakable Container Drops
-            (0x049BF79C, 'u16', 4, 'Breakable Container Drops'),
-            # Marble Gallery
-            (0x03F8BFF0, 'u16', 4, 'Trapdoor Offsets (Marble Gallery)'), # D_us_80180FF0 in the decomp
-            (0x03F8BFF8, 'u16', 24, 'Trapdoor Tiles (Marble Gallery)'), # D_us_80180FF8 in the decomp
-            # Breakable Wall Tiles
-            (0x03CE009C, 'u16', 24, 'Demon Switch Wall Tiles (Abandoned Mine)'),
-            (0x0439BFEC, 'u16', 24, 'Demon Switch Wall Tiles (Cave)'),
-            (0x03CE00CC, 'u16', 24, 'Snake Column Wall Tiles (Abandoned Mine)'),
-            (0x0439C01C, 'u16', 24, 'Snake Column Wall Tiles (Cave)'),
-            (0x04259080, 'u16', 24, 'Crystal Floor Tiles (Underground Caverns)'),
-            (0x047C4EBC, 'u16', 24, 'Crystal Floor Tiles (Reverse Caverns)'),
-            (0x049BF694, 'u16', 16, 'Laboratory Floor Tiles (Alchemy Laboratory)'),
-            (0x04D81CA8, 'u16', 16, 'Laboratory Floor Tiles (Necromancy Laboratory)'),
-            (0x040FBE24, 'u16', 16, "Breakable Ceiling Tiles (Olrox's Quarters)"),
-            (0x04681634, 'u16', 16, "Breakable Ceiling Tiles (Death Wing's Lair)"),
-            (0x041A8AAC, 'u16', 45, 'Breakable Wall in Merman Room (Castle Entrance)'),
-            (0x0491B974, 'u16', 45, 'Breakable Wall in Merman Room (Castle Entrance Revisited)'),
-            # (0xFFFFFFFF, 'u16', 45, 'Breakable Wall in Merman Room (Reverse Entrance)'),
-            # NOTE(sestren): Snake Column Wall C Tile ID was found at 0x0596D620, maybe that's for Boss - Death?
-            (0x049BF654, 'u16', 32, 'Tall Zig Zag Room Wall Tiles (Alchemy Laboratory)'),
-            (0x04D81C68, 'u16', 32, 'Tall Zig Zag Room Wall Tiles (Necromancy Laboratory)'),
-            (0x042590B0, 'u16', 32, 'Plaque Room With Breakable Wall Tiles (Underground Caverns)'),
-            (0x047C4EEC, 'u16', 32, 'Plaque Room With Breakable Wall Tiles (Reverse Caverns)'),
-            (0x04A68038, 'u16', 32, 'Left Gear Room Wall Tiles (Clock Tower)'),
-            (0x04E22FC8, 'u16', 32, 'Left Gear Room Wall Tiles (Reverse Clock Tower)'),
-            (0x04A67FF8, 'u16', 32, 'Pendulum Room Wall Tiles (Clock Tower)'),
-            (0x04E22F88, 'u16', 32, 'Pendulum Room Wall Tiles (Reverse Clock Tower)'),
-            # Waterfall Sound Parameters
-            (0x04258D9C, 's16', 16, 'Waterfall Sound Parameters (Underground Caverns)'),
-            (0x047C4CE8, 's16', 16, 'Waterfall Sound Parameters (Reverse Caverns)'),
-            # Castle Map Color Palette
-            (0x03128800, 'rgba32', 16, 'Castle Map Color Palette (DRA)'),
-            (0x0316A800, 'rgba32', 16, 'Castle Map Color Palette (RIC)'),
-            # Shop Relic IDs
-            (0x03E60CD4, 'u16', 2, 'Shop Relic IDs'),
-            # Secret Map Tile Reveals
-            (0x000983C0, 'u8', 75, 'Secret Map Tile Reveals'),
-            # Death Stolen Items
-            # NOTE(sestren): Unused for now, using direct writes instead
-            # (0x041A92D4, 'u16', 6, 'Death Stolen Items'),
-        ):
-            # NOTE(sestren): Only handling specific formats for now
-            assert data_type in ('u8', 'u16', 's16', 'rgba32')
-            cursor = BIN(binary_file, starting_address)
-            data = []
-            for index in range(array_count):
-                if data_type == 'u8':
-                    value = cursor.u8(index)
-                elif data_type == 'u16':
-                    value = cursor.u16(2 * index)
-                elif data_type == 's16':
-                    value = cursor.s16(2 * index)
-                elif data_type == 'rgba32':
-                    value = cursor.u16(2 * index)
-                    (value, red) = divmod(value, 32)
-                    (value, green) = divmod(value, 32)
-                    (value, blue) = divmod(value, 32)
-                    (value, alpha) = divmod(value, 32)
-                    # NOTE(sestren): Multiplying by 8 will cause 0 to map to 0x00 and 31 to map to 0xF8
-                    rr = ('{:02X}').format(int(8 * red))
-                    gg = ('{:02X}').format(int(8 * green))
-                    bb = ('{:02X}').format(int(8 * blue))
-                    aa = 'FF' if alpha == 1 else '7F'
-                    value = '#' + rr + gg + bb + aa
-                data.append(value)
-            constants[array_name] = {
-                'Metadata': {
-                    'Start': cursor.cursor.address,
-                    'Count': array_count,
-                    'Size': 0x01 if data_type == 'u8' else 0x02,
-                    'Type': data_type,
+        },
+        'Data': [],
+    }
+    boss_teleporters['Data'] = cursor.table(boss_teleporters['Metadata'])
+    result = {
+        'Boss Teleporters': boss_teleporters,
+    }
+    return result
+
+def extract_constants(binary_file, args) -> dict:
+    constants = {}
+    # Extract constant data stored as arrays
+    for (starting_address, data_type, array_count, array_name) in (
+        # Unique item drops in First Castle
+        (0x03CE01E4, 'u16', 13, 'Unique Item Drops (Abandoned Mine)'),
+        (0x049BFBB0, 'u16', 11, 'Unique Item Drops (Alchemy Laboratory)'),
+        (0x0550808C, 'u16', 37, 'Unique Item Drops (Boss - Scylla)'),
+        (0x041A948C, 'u16', 10, 'Unique Item Drops (Castle Entrance)'),
+        (0x0491BE18, 'u16', 10, 'Unique Item Drops (Castle Entrance Revisited)'),
+        (0x04AEFD10, 'u16', 19, 'Unique Item Drops (Castle Keep)'),
+        (0x03BB474C, 'u16', 21, 'Unique Item Drops (Catacombs)'),
+        (0x04A6811C, 'u16', 12, 'Unique Item Drops (Clock Tower)'),
+        (0x03B00FE8, 'u16', 8, 'Unique Item Drops (Colosseum)'),
+        (0x03E61290, 'u16', 11, 'Unique Item Drops (Long Library)'),
+        (0x03F8C100, 'u16', 14, 'Unique Item Drops (Marble Gallery)'),
+        (0x040FBFEC, 'u16', 13, "Unique Item Drops (Olrox's Quarters)"),
+        (0x04048A2C, 'u16', 7, 'Unique Item Drops (Outer Wall)'),
+        (0x03D5B6C0, 'u16', 16, 'Unique Item Drops (Royal Chapel)'),
+        (0x04259128, 'u16', 37, 'Unique Item Drops (Underground Caverns)'),
+        # Unique item drops in Inverted Castle
+        (0x0439BFCC, 'u16', 8, 'Unique Item Drops (Cave)'),
+        (0x04D81CC8, 'u16', 10, 'Unique Item Drops (Necromancy Laboratory)'),
+        (0x0471EF10, 'u16', 10, 'Unique Item Drops (Reverse Entrance)'),
+        (0x04C847C8, 'u16', 25, 'Unique Item Drops (Reverse Keep)'),
+        (0x043083C8, 'u16', 18, 'Unique Item Drops (Floating Catacombs)'),
+        (0x04E22EC8, 'u16', 12, 'Unique Item Drops (Reverse Clock Tower)'),
+        (0x04C0823C, 'u16', 8, 'Unique Item Drops (Reverse Colosseum)'),
+        (0x044B0BC8, 'u16', 9, 'Unique Item Drops (Forbidden Library)'),
+        (0x0453E78C, 'u16', 12, 'Unique Item Drops (Black Marble Gallery)'),
+        (0x04681540, 'u16', 12, "Unique Item Drops (Death Wing's Lair)"),
+        (0x045EEAE4, 'u16', 8, 'Unique Item Drops (Reverse Outer Wall)'),
+        (0x04416D2C, 'u16', 18, 'Unique Item Drops (Anti-Chapel)'),
+        (0x047C4E20, 'u16', 27, 'Unique Item Drops (Reverse Caverns)'),
+        # Breakable Container Drops
+        (0x049BF79C, 'u16', 4, 'Breakable Container Drops'),
+        # Marble Gallery
+        (0x03F8BFF0, 'u16', 4, 'Trapdoor Offsets (Marble Gallery)'), # D_us_80180FF0 in the decomp
+        (0x03F8BFF8, 'u16', 24, 'Trapdoor Tiles (Marble Gallery)'), # D_us_80180FF8 in the decomp
+        # Breakable Wall Tiles
+        (0x03CE009C, 'u16', 24, 'Demon Switch Wall Tiles (Abandoned Mine)'),
+        (0x0439BFEC, 'u16', 24, 'Demon Switch Wall Tiles (Cave)'),
+        (0x03CE00CC, 'u16', 24, 'Snake Column Wall Tiles (Abandoned Mine)'),
+        (0x0439C01C, 'u16', 24, 'Snake Column Wall Tiles (Cave)'),
+        (0x04259080, 'u16', 24, 'Crystal Floor Tiles (Underground Caverns)'),
+        (0x047C4EBC, 'u16', 24, 'Crystal Floor Tiles (Reverse Caverns)'),
+        (0x049BF694, 'u16', 16, 'Laboratory Floor Tiles (Alchemy Laboratory)'),
+        (0x04D81CA8, 'u16', 16, 'Laboratory Floor Tiles (Necromancy Laboratory)'),
+        (0x040FBE24, 'u16', 16, "Breakable Ceiling Tiles (Olrox's Quarters)"),
+        (0x04681634, 'u16', 16, "Breakable Ceiling Tiles (Death Wing's Lair)"),
+        (0x041A8AAC, 'u16', 45, 'Breakable Wall in Merman Room (Castle Entrance)'),
+        (0x0491B974, 'u16', 45, 'Breakable Wall in Merman Room (Castle Entrance Revisited)'),
+        # (0xFFFFFFFF, 'u16', 45, 'Breakable Wall in Merman Room (Reverse Entrance)'),
+        # NOTE(sestren): Snake Column Wall C Tile ID was found at 0x0596D620, maybe that's for Boss - Death?
+        (0x049BF654, 'u16', 32, 'Tall Zig Zag Room Wall Tiles (Alchemy Laboratory)'),
+        (0x04D81C68, 'u16', 32, 'Tall Zig Zag Room Wall Tiles (Necromancy Laboratory)'),
+        (0x042590B0, 'u16', 32, 'Plaque Room With Breakable Wall Tiles (Underground Caverns)'),
+        (0x047C4EEC, 'u16', 32, 'Plaque Room With Breakable Wall Tiles (Reverse Caverns)'),
+        (0x04A68038, 'u16', 32, 'Left Gear Room Wall Tiles (Clock Tower)'),
+        (0x04E22FC8, 'u16', 32, 'Left Gear Room Wall Tiles (Reverse Clock Tower)'),
+        (0x04A67FF8, 'u16', 32, 'Pendulum Room Wall Tiles (Clock Tower)'),
+        (0x04E22F88, 'u16', 32, 'Pendulum Room Wall Tiles (Reverse Clock Tower)'),
+        # Waterfall Sound Parameters
+        (0x04258D9C, 's16', 16, 'Waterfall Sound Parameters (Underground Caverns)'),
+        (0x047C4CE8, 's16', 16, 'Waterfall Sound Parameters (Reverse Caverns)'),
+        # Castle Map Color Palette
+        (0x03128800, 'rgba32', 16, 'Castle Map Color Palette (DRA)'),
+        (0x0316A800, 'rgba32', 16, 'Castle Map Color Palette (RIC)'),
+        # Shop Relic IDs
+        (0x03E60CD4, 'u16', 2, 'Shop Relic IDs'),
+        # Secret Map Tile Reveals
+        (0x000983C0, 'u8', 75, 'Secret Map Tile Reveals'),
+        # Death Stolen Items
+        # NOTE(sestren): Unused for now, using direct writes instead
+        # (0x041A92D4, 'u16', 6, 'Death Stolen Items'),
+    ):
+        # NOTE(sestren): Only handling specific formats for now
+        assert data_type in ('u8', 'u16', 's16', 'rgba32')
+        cursor = BIN(binary_file, starting_address)
+        # NOTE(sestren): Colors are stored as packed 16-bit values and unpacked below
+        array_metadata = {
+            'Fields': {
+                'Value': {
+                    'Offset': 0x00,
+                    'Type': 'u16' if data_type == 'rgba32' else data_type,
                 },
-                'Data': data,
-            }
-        # Extract other constant data
-        for (constant_address, constant_name, constant_data_type) in (
-            # Must be updated so that False Save Room still sends you to Nightmare (Solved by @MottZilla)
-            (0x000E7DC8, 'False Save Room, Room X', 'u16'), # 0x2D00 --> 45
-            (0x000E7DD0, 'False Save Room, Room Y', 'u16'), # 0x2100 --> 33
-            (0x000E7DA4, 'Reverse False Save Room, Room X', 'u16'), # 0x1200 --> 18
-            (0x000E7DAC, 'Reverse False Save Room, Room Y', 'u16'), # 0x1E00 --> 30
-            # (0x0009840C, 'Castle map reveal boundary', 'u32') # 0x06082600 --> {0, 26, 8, 6} # Change to 0x40400000???
-            # (0x049F761C, 'Stun player when meeting Maria in Alchemy Lab', 'u32'), # 0x34100001 --> ori s0,0,$1 # Change to 0x36100000 --> ori s0,$0
-            # Strings
-            (0x03ACF0B4, 'Message - Richter Mode Instructions 1', 'string'), # 'Input "RICHTER" to play'
-            (0x03ACF0D4, 'Message - Richter Mode Instructions 2', 'string'), # 'as Richter Belmont.'
-            (0x03E8C888, 'Message - Shop Item Name 1', 'shifted-string'), # 'Jewel of Open'
-        ):
-            cursor = BIN(binary_file, constant_address)
-            constants[constant_name] = cursor.indirect(0, constant_data_type, True)
-        # Extract castle map data
-        cursor = BIN(binary_file, 0x001AF800)
-        castle_map = {
-            'Metadata': {
-                'Start': cursor.cursor.address,
-                'Rows': 256,
-                'Columns': 128,
-                'Type': 'indexed-bitmap',
             },
-            'Data': [],
+            'Size': 0x01 if data_type == 'u8' else 0x02,
+            'Count': array_count,
         }
-        for row in range(castle_map['Metadata']['Rows']):
-            row_cursor = cursor.clone(row * castle_map['Metadata']['Columns'])
-            row_data = ''
-            for col in range(castle_map['Metadata']['Columns']):
-                data = row_cursor.u8(col)
-                row_data += ''.join(reversed('{:02X}'.format(data)))
-            castle_map['Data'].append(row_data)
-        # Extract Castle Map reveal data (when purchased in the Shop)
-        cursor = BIN(binary_file, 0x0009840C)
-        castle_map_reveals = {
+        data = []
+        for element in cursor.table(array_metadata):
+            value = element['Value']
+            if data_type == 'rgba32':
+                (value, red) = divmod(value, 32)
+                (value, green) = divmod(value, 32)
+                (value, blue) = divmod(value, 32)
+                (value, alpha) = divmod(value, 32)
+                # NOTE(sestren): Multiplying by 8 will cause 0 to map to 0x00 and 31 to map to 0xF8
+                rr = ('{:02X}').format(int(8 * red))
+                gg = ('{:02X}').format(int(8 * green))
+                bb = ('{:02X}').format(int(8 * blue))
+                aa = 'FF' if alpha == 1 else '7F'
+                value = '#' + rr + gg + bb + aa
+            data.append(value)
+        constants[array_name] = {
             'Metadata': {
                 'Start': cursor.cursor.address,
-                'Count': 0,
-                'Type': 'binary-string-array',
-                'Footprint': 0,
+                'Count': array_count,
+                'Size': 0x01 if data_type == 'u8' else 0x02,
+                'Type': data_type,
             },
-            'Data': [],
+            'Data': data,
         }
-        while True:
-            castle_map_reveal = {
-                'Left': cursor.u8(0x00),
-                'Top': cursor.u8(0x01),
-                'Bytes Per Row': cursor.u8(0x02),
-                'Rows': cursor.u8(0x03),
-                'Grid': [],
-            }
-            castle_map_reveals['Metadata']['Footprint'] += 4
-            grid_cursor = cursor.clone(0x04)
-            for row in range(castle_map_reveal['Rows']):
-                grid_row_cursor = grid_cursor.clone(row * castle_map_reveal['Bytes Per Row'])
-                row_data = ''
-                for col in range(castle_map_reveal['Bytes Per Row']):
-                    data = grid_row_cursor.u8(col)
-                    castle_map_reveals['Metadata']['Footprint'] += 1
-                    byte_data = ''.join(reversed('{:08b}'.format(data)))
-                    row_data += byte_data.replace('0', ' ').replace('1', '#')
-                castle_map_reveal['Grid'].append(row_data)
-            castle_map_reveals['Data'].append(castle_map_reveal)
-            castle_map_reveals['Metadata']['Count'] += 1
-            grid_cursor = grid_cursor.clone(castle_map_reveal['Rows'] * castle_map_reveal['Bytes Per Row'])
-            if grid_cursor.u8(0) == 0xFF:
-                castle_map_reveals['Metadata']['Footprint'] += 4 - (castle_map_reveals['Metadata']['Footprint'] % 4)
-                break
-        # Enemy Definitions
-        cursor = BIN(binary_file, 0x0009E100)
-        size = 0x28
-        enemy_definitions = {
-            'Metadata': {
-                'Start': cursor.cursor.address,
-                'Size': size,
-                'Count': 400,
-                'Fields': {
-                    'Name': {
-                        'Offset': 0x00,
-                        'Type': 'u32',
-                        'Secondary Offset': -0x8000A800,
-                        'Secondary Type': 'shifted-string',
-                    },
-                    # 'Hit Points': {
-                    #     'Offset': 0x04,
-                    #     'Type': 's16',
-                    # },
-                    # 'Attack': {
-                    #     'Offset': 0x06,
-                    #     'Type': 's16',
-                    # },
-                    # 'Attack Element': {
-                    #     'Offset': 0x08,
-                    #     'Type': 'u16',
-                    # },
-                    # 'Defense': {
-                    #     'Offset': 0x0A,
-                    #     'Type': 's16',
-                    # },
-                    # 'Hitbox State': {
-                    #     'Offset': 0x0C,
-                    #     'Type': 'u16',
-                    # },
-                    # 'Weaknesses': {
-                    #     'Offset': 0x0E,
-                    #     'Type': 'u16',
-                    # },
-                    # 'Strengths': {
-                    #     'Offset': 0x10,
-                    #     'Type': 'u16',
-                    # },
-                    # 'Immunities': {
-                    #     'Offset': 0x12,
-                    #     'Type': 'u16',
-                    # },
-                    # 'Absorbs': {
-                    #     'Offset': 0x14,
-                    #     'Type': 'u16',
-                    # },
-                    'Level': {
-                        'Offset': 0x16,
-                        'Type': 'u16',
-                    },
-                    # 'Experience': {
-                    #     'Offset': 0x18,
-                    #     'Type': 'u16',
-                    # },
-                    'Rare Item ID': {
-                        'Offset': 0x1A,
-                        'Type': 'u16',
-                    },
-                    'Uncommon Item ID': {
-                        'Offset': 0x1C,
-                        'Type': 'u16',
-                    },
-                    'Rare Item Drop Rate': {
-                        'Offset': 0x1E,
-                        'Type': 'u16',
-                    },
-                    'Uncommon Item Drop Rate': {
-                        'Offset': 0x20,
-                        'Type': 'u16',
-                    },
-                    # 'Hitbox Width': {
-                    #     'Offset': 0x22,
-                    #     'Type': 'u8',
-                    # },
-                    # 'Hitbox Height': {
-                    #     'Offset': 0x23,
-                    #     'Type': 'u8',
-                    # },
-                    'Base Drop Rate Index': {
-                        # This value is actually part of the Flags field below, but it comprises a 2-bit index value
-                        'Offset': 0x24,
-                        'Type': 'u32',
-                        'Shift': 10,
-                        'Mask': 0b11,
-                    },
-                    'Flags': {
-                        'Offset': 0x24,
-                        'Type': 'u32',
-                        'Masks': {
-                            'Flag 00': 0x00000001,
-                            'Flag 01': 0x00000002,
-                            'Flag 02': 0x00000004,
-                            'Flag 03': 0x00000008,
-                            'Flag 04': 0x00000010, # Involves weapon-related sound effects?
-                                # Dragon Rider and Discus Lord are one of the few enemies that do NOT have Flag 04
-                            'Flag 05': 0x00000020,
-                            'Flag 06': 0x00000040,
-                            'Flag 07': 0x00000080,
-                            'Flag 08': 0x00000100, # Dead indicator?
-                            'Flag 09': 0x00000200,
-                                # Lesser Demon, White Dragon, Discus Lord, Stone Rose, Bone Musket, Grave Keeper, Spectral Sword, Poltergeist, ...
-                            # 'Flag 10': 0x00000400, # Base Drop Rate 1
-                            # 'Flag 11': 0x00000800, # Base Drop Rate Index 2
-                            'Kill Count': 0x00001000,
-                            'Flag 13': 0x00002000,
-                            'Flag 14': 0x00004000,
-                            'Flag 15': 0x00008000,
-                            'Flag 16': 0x00010000,
-                            'Flag 17': 0x00020000,
-                            'Flag 18': 0x00040000, # Position Player-Locked?
-                            'Flag 19': 0x00080000,
-                            'Flag 20': 0x00100000, # Involves another entity somehow?
-                            'Flag 21': 0x00200000,
-                                # Dragon Rider, Discus Lord, Gorgon, Oruburos, Olrox, Dracula, and Greater Demon have Flag 21
-                            'Flag 22': 0x00400000, # Involves stun frames somehow?
-                                # A lot of bosses have Flag 22 set
-                            'Flag 23': 0x00800000, # Has Primitives?
-                            'Hide Nameplate': 0x01000000,
-                            'Flag 25': 0x02000000,
-                                # Axe Knight, Flying Zombie, Merman, Dark Octopus, Flea Man, Flea Armor, Wereskeleton, etc., have Flag 25
-                            'Flag 26': 0x04000000, # Keep Alive When Off-Camera?
-                            'Flag 27': 0x08000000, # Position Camera-Locked?
-                            'Flag 28': 0x10000000,
-                            'Flag 29': 0x20000000,
-                            'Flag 30': 0x40000000, # Destroy If Barely Off-Camera?
-                            'Flag 31': 0x80000000, # Destroy If Off-Camera?
-                        },
-                    },
-                },
+    # Extract other constant data
+    for (constant_address, constant_name, constant_data_type) in (
+        # Must be updated so that False Save Room still sends you to Nightmare (Solved by @MottZilla)
+        (0x000E7DC8, 'False Save Room, Room X', 'u16'), # 0x2D00 --> 45
+        (0x000E7DD0, 'False Save Room, Room Y', 'u16'), # 0x2100 --> 33
+        (0x000E7DA4, 'Reverse False Save Room, Room X', 'u16'), # 0x1200 --> 18
+        (0x000E7DAC, 'Reverse False Save Room, Room Y', 'u16'), # 0x1E00 --> 30
+        # (0x0009840C, 'Castle map reveal boundary', 'u32') # 0x06082600 --> {0, 26, 8, 6} # Change to 0x40400000???
+        # (0x049F761C, 'Stun player when meeting Maria in Alchemy Lab', 'u32'), # 0x34100001 --> ori s0,0,$1 # Change to 0x36100000 --> ori s0,$0
+        # Strings
+        (0x03ACF0B4, 'Message - Richter Mode Instructions 1', 'string'), # 'Input "RICHTER" to play'
+        (0x03ACF0D4, 'Message - Richter Mode Instructions 2', 'string'), # 'as Richter Belmont.'
+        (0x03E8C888, 'Message - Shop Item Name 1', 'shifted-string'), # 'Jewel of Open'
+    ):
+        cursor = BIN(binary_file, constant_address)
+        constants[constant_name] = cursor.indirect(0, constant_data_type, True)
+    result = {
+        'Constants': constants,
+    }
+    return result
+
+def extract_castle_map(binary_file, args) -> dict:
+    # Extract castle map data
+    cursor = BIN(binary_file, 0x001AF800)
+    castle_map = {
+        'Metadata': {
+            'Start': cursor.cursor.address,
+            'Rows': 256,
+            'Columns': 128,
+            'Type': 'indexed-bitmap',
+        },
+        'Data': [],
+    }
+    # Each row is read as a single table of bytes, with every byte holding two pixels, low nibble first
+    row_metadata = {
+        'Fields': {
+            'Pixels': {
+                'Offset': 0x00,
+                'Type': 'u8',
             },
-            'Data': [],
+        },
+        'Size': 0x01,
+        'Count': castle_map['Metadata']['Columns'],
+    }
+    for row in range(castle_map['Metadata']['Rows']):
+        row_data = ''.join(
+            ''.join(reversed('{:02X}'.format(element['Pixels']))) for
+            element in cursor.table(row_metadata, row * castle_map['Metadata']['Columns'])
+        )
+        castle_map['Data'].append(row_data)
+    result = {
+        'Castle Map': castle_map,
+    }
+    return result
+
+def extract_castle_map_reveals(binary_file, args) -> dict:
+    # Extract Castle Map reveal data (when purchased in the Shop)
+    cursor = BIN(binary_file, 0x0009840C)
+    castle_map_reveals = {
+        'Metadata': {
+            'Start': cursor.cursor.address,
+            'Count': 0,
+            'Type': 'binary-string-array',
+            'Footprint': 0,
+        },
+        'Data': [],
+    }
+    while True:
+        castle_map_reveal = {
+            'Left': cursor.u8(0x00),
+            'Top': cursor.u8(0x01),
+            'Bytes Per Row': cursor.u8(0x02),
+            'Rows': cursor.u8(0x03),
+            'Grid': [],
         }
-        for enemy_definition_id in range(enemy_definitions['Metadata']['Count']):
-            enemy_def_cursor = cursor.clone(size * enemy_definition_id)
-            data = {}
-            for (field_name, field) in enemy_definitions['Metadata']['Fields'].items():
-                data[field_name] = enemy_def_cursor.indirect(field['Offset'], field['Type'], False)
-                if 'Shift' in field or 'Mask' in field:
-                    data[field_name] = field['Mask'] & (data[field_name] >> field['Shift'])
-                elif 'Secondary Type' in field and 'Secondary Offset' in field:
-                    secondary_offset = data[field_name] + field.get('Secondary Offset', 0)
-                    secondary_cursor = BIN(binary_file, secondary_offset)
-                    data[field_name] = secondary_cursor.indirect(0, field['Secondary Type'], False)
-                elif 'Masks' in field:
-                    value = data[field_name]
-                    data[field_name] = []
-                    for (mask_name, mask) in field['Masks'].items():
-                        if (mask & value) > 0:
-                            data[field_name].append(mask_name)
-                    pass
-            enemy_definitions['Data'].append(data)
-        # Extract Warp Room coordinates list
-        cursor = BIN(binary_file, 0x04D12E5C)
-        warp_room_coordinates = {
-            'Metadata': {
-                'Start': cursor.cursor.address,
-                'Size': 0x04,
-                'Count': 5,
-                'Fields': {
-                    'Room X': {
-                        'Offset': 0x00,
-                        'Type': 'u16',
-                    },
-                    'Room Y': {
-                        'Offset': 0x02,
-                        'Type': 'u16',
+        castle_map_reveals['Metadata']['Footprint'] += 4
+        grid_cursor = cursor.clone(0x04)
+        for row in range(castle_map_reveal['Rows']):
+            grid_row_cursor = grid_cursor.clone(row * castle_map_reveal['Bytes Per Row'])
+            row_data = ''
+            for col in range(castle_map_reveal['Bytes Per Row']):
+                data = grid_row_cursor.u8(col)
+                castle_map_reveals['Metadata']['Footprint'] += 1
+                byte_data = ''.join(reversed('{:08b}'.format(data)))
+                row_data += byte_data.replace('0', ' ').replace('1', '#')
+            castle_map_reveal['Grid'].append(row_data)
+        castle_map_reveals['Data'].append(castle_map_reveal)
+        castle_map_reveals['Metadata']['Count'] += 1
+        grid_cursor = grid_cursor.clone(castle_map_reveal['Rows'] * castle_map_reveal['Bytes Per Row'])
+        if grid_cursor.u8(0) == 0xFF:
+            castle_map_reveals['Metadata']['Footprint'] += 4 - (castle_map_reveals['Metadata']['Footprint'] % 4)
+            break
+    result = {
+        'Castle Map Reveals': castle_map_reveals,
+    }
+    return result
+
+def extract_enemy_definitions(binary_file, args) -> dict:
+    # Enemy Definitions
+    cursor = BIN(binary_file, 0x0009E100)
+    size = 0x28
+    enemy_definitions = {
+        'Metadata': {
+            'Start': cursor.cursor.address,
+            'Size': size,
+            'Count': 400,
+            'Fields': {
+                'Name': {
+                    'Offset': 0x00,
+                    'Type': 'u32',
+                    'Secondary Offset': -0x8000A800,
+                    'Secondary Type': 'shifted-string',
+                },
+                # 'Hit Points': {
+                #     'Offset': 0x04,
+                #     'Type': 's16',
+                # },
+                # 'Attack': {
+                #     'Offset': 0x06,
+                #     'Type': 's16',
+                # },
+                # 'Attack Element': {
+                #     'Offset': 0x08,
+                #     'Type': 'u16',
+                # },
+                # 'Defense': {
+                #     'Offset': 0x0A,
+                #     'Type': 's16',
+                # },
+                # 'Hitbox State': {
+                #     'Offset': 0x0C,
+                #     'Type': 'u16',
+                # },
+                # 'Weaknesses': {
+                #     'Offset': 0x0E,
+                #     'Type': 'u16',
+                # },
+                # 'Strengths': {
+                #     'Offset': 0x10,
+                #     'Type': 'u16',
+                # },
+                # 'Immunities': {
+                #     'Offset': 0x12,
+                #     'Type': 'u16',
+                # },
+                # 'Absorbs': {
+                #     'Offset': 0x14,
+                #     'Type': 'u16',
+                # },
+                'Level': {
+                    'Offset': 0x16,
+                    'Type': 'u16',
+                },
+                # 'Experience': {
+                #     'Offset': 0x18,
+                #     'Type': 'u16',
+                # },
+                'Rare Item ID': {
+                    'Offset': 0x1A,
+                    'Type': 'u16',
+                },
+                'Uncommon Item ID': {
+                    'Offset': 0x1C,
+                    'Type': 'u16',
+                },
+                'Rare Item Drop Rate': {
+                    'Offset': 0x1E,
+                    'Type': 'u16',
+                },
+                'Uncommon Item Drop Rate': {
+                    'Offset': 0x20,
+                    'Type': 'u16',
+                },
+                # 'Hitbox Width': {
+                #     'Offset': 0x22,
+                #     'Type': 'u8',
+                # },
+                # 'Hitbox Height': {
+                #     'Offset': 0x23,
+                #     'Type': 'u8',
+                # },
+                'Base Drop Rate Index': {
+                    # This value is actually part of the Flags field below, but it comprises a 2-bit index value
+                    'Offset': 0x24,
+                    'Type': 'u32',
+                    'Shift': 10,
+                    'Mask': 0b11,
+                },
+                'Flags': {
+                    'Offset': 0x24,
+                    'Type': 'u32',
+                    'Masks': {
+                        'Flag 00': 0x00000001,
+                        'Flag 01': 0x00000002,
+                        'Flag 02': 0x00000004,
+                        'Flag 03': 0x00000008,
+                        'Flag 04': 0x00000010, # Involves weapon-related sound effects?
+                            # Dragon Rider and Discus Lord are one of the few enemies that do NOT have Flag 04
+                        'Flag 05': 0x00000020,
+                        'Flag 06': 0x00000040,
+                        'Flag 07': 0x00000080,
+                        'Flag 08': 0x00000100, # Dead indicator?
+                        'Flag 09': 0x00000200,
+                            # Lesser Demon, White Dragon, Discus Lord, Stone Rose, Bone Musket, Grave Keeper, Spectral Sword, Poltergeist, ...
+                        # 'Flag 10': 0x00000400, # Base Drop Rate 1
+                        # 'Flag 11': 0x00000800, # Base Drop Rate Index 2
+                        'Kill Count': 0x00001000,
+                        'Flag 13': 0x00002000,
+                        'Flag 14': 0x00004000,
+                        'Flag 15': 0x00008000,
+                        'Flag 16': 0x00010000,
+                        'Flag 17': 0x00020000,
+                        'Flag 18': 0x00040000, # Position Player-Locked?
+                        'Flag 19': 0x00080000,
+                        'Flag 20': 0x00100000, # Involves another entity somehow?
+                        'Flag 21': 0x00200000,
+                            # Dragon Rider, Discus Lord, Gorgon, Oruburos, Olrox, Dracula, and Greater Demon have Flag 21
+                        'Flag 22': 0x00400000, # Involves stun frames somehow?
+                            # A lot of bosses have Flag 22 set
+                        'Flag 23': 0x00800000, # Has Primitives?
+                        'Hide Nameplate': 0x01000000,
+                        'Flag 25': 0x02000000,
+                            # Axe Knight, Flying Zombie, Merman, Dark Octopus, Flea Man, Flea Armor, Wereskeleton, etc., have Flag 25
+                        'Flag 26': 0x04000000, # Keep Alive When Off-Camera?
+                        'Flag 27': 0x08000000, # Position Camera-Locked?
+                        'Flag 28': 0x10000000,
+                        'Flag 29': 0x20000000,
+                        'Flag 30': 0x40000000, # Destroy If Barely Off-Camera?
+                        'Flag 31': 0x80000000, # Destroy If Off-Camera?
                     },
                 },
             },
-            'Data': [],
-        }
-        for warp_room_coordinate_id in range(warp_room_coordinates['Metadata']['Count']):
-            data = {
-                'Room X': cursor.u16(0x04 * warp_room_coordinate_id + 0x00),
-                'Room Y': cursor.u16(0x04 * warp_room_coordinate_id + 0x02),
-            }
-            warp_room_coordinates['Data'].append(data)
-        # Extract Reverse Warp Room coordinates list
-        cursor = BIN(binary_file, 0x04EBE65C)
-        reverse_warp_room_coordinates = {
-            'Metadata': {
-                'Start': cursor.cursor.address,
-                'Size': 0x04,
-                'Count': 5,
-                'Fields': {
-                    'Room X': {
-                        'Offset': 0x00,
-                        'Type': 'u16',
-                    },
-                    'Room Y': {
-                        'Offset': 0x02,
-                        'Type': 'u16',
-                    },
+        },
+        'Data': [],
+    }
+    for data in cursor.table(enemy_definitions['Metadata']):
+        for (field_name, field) in enemy_definitions['Metadata']['Fields'].items():
+            if 'Shift' in field or 'Mask' in field:
+                data[field_name] = field['Mask'] & (data[field_name] >> field['Shift'])
+            elif 'Secondary Type' in field and 'Secondary Offset' in field:
+                secondary_offset = data[field_name] + field.get('Secondary Offset', 0)
+                secondary_cursor = BIN(binary_file, secondary_offset)
+                data[field_name] = secondary_cursor.indirect(0, field['Secondary Type'], False)
+            elif 'Masks' in field:
+                value = data[field_name]
+                data[field_name] = []
+                for (mask_name, mask) in field['Masks'].items():
+                    if (mask & value) > 0:
+                        data[field_name].append(mask_name)
+                pass
+        enemy_definitions['Data'].append(data)
+    result = {
+        'Enemy Definitions': enemy_definitions,
+    }
+    return result
+
+def extract_warp_room_coordinates(binary_file, args) -> dict:
+    # Extract Warp Room coordinates list
+    cursor = BIN(binary_file, 0x04D12E5C)
+    warp_room_coordinates = {
+        'Metadata': {
+            'Start': cursor.cursor.address,
+            'Size': 0x04,
+            'Count': 5,
+            'Fields': {
+                'Room X': {
+                    'Offset': 0x00,
+                    'Type': 'u16',
+                },
+                'Room Y': {
+                    'Offset': 0x02,
+                    'Type': 'u16',
                 },
             },
-            'Data': [],
-        }
-        for reverse_warp_room_coordinate_id in range(reverse_warp_room_coordinates['Metadata']['Count']):
-            data = {
-                'Room X': cursor.u16(0x04 * reverse_warp_room_coordinate_id + 0x00),
-                'Room Y': cursor.u16(0x04 * reverse_warp_room_coordinate_id + 0x02),
-            }
-            reverse_warp_room_coordinates['Data'].append(data)
-        # Extract familiar events
-        cursor = BIN(binary_file, 0x0392A760)
-        familiar_events = {
-            'Metadata': {
-                'Start': cursor.cursor.address,
-                'Size': 0x30,
-                'Count': 49,
-                'Fields': {
-                    'Unknown 00': {
-                        'Offset': 0x00,
-                        'Type': 'u32',
-                    },
-                    'Unknown 04': {
-                        'Offset': 0x04,
-                        'Type': 'u32',
-                    },
-                    'Servant ID': {
-                        'Offset': 0x08,
-                        'Type': 's32',
-                    },
-                    'Room X': {
-                        'Offset': 0x0C,
-                        'Type': 's32',
-                    },
-                    'Room Y': {
-                        'Offset': 0x10,
-                        'Type': 's32',
-                    },
-                    'Camera X': {
-                        'Offset': 0x14,
-                        'Type': 's32',
-                    },
-                    'Camera Y': {
-                        'Offset': 0x18,
-                        'Type': 's32',
-                    },
-                    'Condition': {
-                        'Offset': 0x1C,
-                        'Type': 's32',
-                    },
-                    'Delay': {
-                        'Offset': 0x20,
-                        'Type': 's32',
-                    },
-                    'Entity ID': {
-                        'Offset': 0x24,
-                        'Type': 's32',
-                    },
-                    'Params': {
-                        'Offset': 0x28,
-                        'Type': 's32',
-                    },
-                    'Unknown 2C': {
-                        'Offset': 0x2C,
-                        'Type': 'u32',
-                    },
+        },
+        'Data': [],
+    }
+    warp_room_coordinates['Data'] = cursor.table(warp_room_coordinates['Metadata'])
+    # Extract Reverse Warp Room coordinates list
+    cursor = BIN(binary_file, 0x04EBE65C)
+    reverse_warp_room_coordinates = {
+        'Metadata': {
+            'Start': cursor.cursor.address,
+            'Size': 0x04,
+            'Count': 5,
+            'Fields': {
+                'Room X': {
+                    'Offset': 0x00,
+                    'Type': 'u16',
+                },
+                'Room Y': {
+                    'Offset': 0x02,
+                    'Type': 'u16',
                 },
             },
-            'Data': [],
-        }
-        for familiar_event_id in range(familiar_events['Metadata']['Count']):
-            data = {}
-            for (field_name, field) in familiar_events['Metadata']['Fields'].items():
-                offset = familiar_event_id * familiar_events['Metadata']['Size'] + field['Offset']
-                data[field_name] = cursor.indirect(offset, field['Type'])
-            familiar_events['Data'].append(data)
-        # Store extracted data
-        extraction = {
-            'Base Drop Rates': base_drop_rates,
-            'Boss Teleporters': boss_teleporters,
-            'Castle Map': castle_map,
-            'Castle Map Reveals': castle_map_reveals,
-            'Constants': constants,
-            'Enemy Definitions': enemy_definitions,
-            'Entity Layouts': entity_layouts,
-            'Familiar Events': familiar_events,
-            'Reverse Warp Room Coordinates': reverse_warp_room_coordinates,
-            'Stages': stages,
-            'Teleporters': teleporters,
-            'Warp Room Coordinates': warp_room_coordinates,
+        },
+        'Data': [],
+    }
+    reverse_warp_room_coordinates['Data'] = cursor.table(reverse_warp_room_coordinates['Metadata'])
+    result = {
+        'Reverse Warp Room Coordinates': reverse_warp_room_coordinates,
+        'Warp Room Coordinates': warp_room_coordinates,
+    }
+    return result
+
+def extract_familiar_events(binary_file, args) -> dict:
+    # Extract familiar events
+    cursor = BIN(binary_file, 0x0392A760)
+    familiar_events = {
+        'Metadata': {
+            'Start': cursor.cursor.address,
+            'Size': 0x30,
+            'Count': 49,
+            'Fields': {
+                'Unknown 00': {
+                    'Offset': 0x00,
+                    'Type': 'u32',
+                },
+                'Unknown 04': {
+                    'Offset': 0x04,
+                    'Type': 'u32',
+                },
+                'Servant ID': {
+                    'Offset': 0x08,
+                    'Type': 's32',
+                },
+                'Room X': {
+                    'Offset': 0x0C,
+                    'Type': 's32',
+                },
+                'Room Y': {
+                    'Offset': 0x10,
+                    'Type': 's32',
+                },
+                'Camera X': {
+                    'Offset': 0x14,
+                    'Type': 's32',
+                },
+                'Camera Y': {
+                    'Offset': 0x18,
+                    'Type': 's32',
+                },
+                'Condition': {
+                    'Offset': 0x1C,
+                    'Type': 's32',
+                },
+                'Delay': {
+                    'Offset': 0x20,
+                    'Type': 's32',
+                },
+                'Entity ID': {
+                    'Offset': 0x24,
+                    'Type': 's32',
+                },
+                'Params': {
+                    'Offset': 0x28,
+                    'Type': 's32',
+                },
+                'Unknown 2C': {
+                    'Offset': 0x2C,
+                    'Type': 'u32',
+                },
+            },
+        },
+        'Data': [],
+    }
+    familiar_events['Data'] = cursor.table(familiar_events['Metadata'])
+    result = {
+        'Familiar Events': familiar_events,
+    }
+    return result
+
+EXTRACTION_STEPS = (
+    ('Stages', extract_stages),
+    ('Teleporters', extract_teleporters),
+    ('Boss Teleporters', extract_boss_teleporters),
+    ('Constants', extract_constants),
+    ('Castle Map', extract_castle_map),
+    ('Castle Map Reveals', extract_castle_map_reveals),
+    ('Enemy Definitions', extract_enemy_definitions),
+    ('Warp Room Coordinates', extract_warp_room_coordinates),
+    ('Familiar Events', extract_familiar_events),
+)
+# The steps share the readers in BIN and sotn_address, so a change to any of the code doing the extracting makes every step stale
+EXTRACTOR_SOURCES = (
+    __file__,
+    sotn_address.__file__,
+)
+
+def get_extractor_version() -> str:
+    result = ''.join(sotn_extraction.get_sha1(source_filepath) for source_filepath in EXTRACTOR_SOURCES)
+    return result
+
+class GameData(collections.abc.Mapping):
+    '''
+    Read-only view of the game data in a BIN, laid out the same way as the extraction
+
+    Each section is only extracted the first time it is accessed, and stages are extracted one at
+    a time as they are accessed; extracted data is normalized the same way the extraction cache is.
+    The view owns the BIN file it is given, which is closed by close() or on leaving a with block
+    '''
+    SECTION_STEPS = {
+        'Boss Teleporters': extract_boss_teleporters,
+        'Castle Map': extract_castle_map,
+        'Castle Map Reveals': extract_castle_map_reveals,
+        'Enemy Definitions': extract_enemy_definitions,
+        'Familiar Events': extract_familiar_events,
+        'Reverse Warp Room Coordinates': extract_warp_room_coordinates,
+        'Teleporters': extract_teleporters,
+        'Warp Room Coordinates': extract_warp_room_coordinates,
+    }
+    STAGE_SECTIONS = {
+        'Base Drop Rates': 'Base Drop Rate',
+        'Entity Layouts': 'Entity Layout',
+        'Stages': 'Stage',
+    }
+    def __init__(self, binary_file):
+        self.binary_file = binary_file
+        self.sections = {}
+        self.stages = {}
+
+    def __getitem__(self, section_name):
+        if section_name not in self.sections:
+            if section_name in self.STAGE_SECTIONS:
+                self.sections[section_name] = LazyStageSection(self, self.STAGE_SECTIONS[section_name])
+            elif section_name == 'Constants':
+                constants = sotn_extraction.normalized(extract_constants(self.binary_file, None)['Constants'])
+                constants['Entity Layout'] = LazyStageSection(self, 'Entity Layout Constants')
+                self.sections[section_name] = constants
+            else:
+                step_extraction = self.SECTION_STEPS[section_name](self.binary_file, None)
+                self.sections[section_name] = sotn_extraction.normalized(step_extraction[section_name])
+        result = self.sections[section_name]
+        return result
+
+    def __iter__(self):
+        return iter(sorted(list(self.SECTION_STEPS) + list(self.STAGE_SECTIONS) + ['Constants']))
+
+    def __len__(self):
+        return len(self.SECTION_STEPS) + len(self.STAGE_SECTIONS) + 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        self.binary_file.close()
+
+    def get_stage(self, stage_name: str) -> dict:
+        if stage_name not in self.stages:
+            stage_extraction = extract_stage(self.binary_file, STAGES[stage_name])
+            stage_extraction['Stage'] = copy.deepcopy(STAGES[stage_name])
+            stage_extraction['Stage']['Rooms'] = stage_extraction['Rooms']
+            self.stages[stage_name] = {}
+            for (key, value) in stage_extraction.items():
+                self.stages[stage_name][key] = None if value is None else sotn_extraction.normalized(value)
+        result = self.stages[stage_name]
+        return result
+
+class LazyStageSection(collections.abc.Mapping):
+    def __init__(self, game_data: GameData, key: str):
+        self.game_data = game_data
+        self.key = key
+
+    def __getitem__(self, stage_name):
+        if stage_name not in STAGES:
+            raise KeyError(stage_name)
+        result = self.game_data.get_stage(stage_name)[self.key]
+        if result is None:
+            raise KeyError(stage_name)
+        return result
+
+    def __iter__(self):
+        # NOTE(sestren): Stages without this key (e.g., a non-contiguous entity layout) are skipped, just as __getitem__ rejects them
+        for stage_name in STAGES:
+            if self.game_data.get_stage(stage_name)[self.key] is None:
+                continue
+            yield stage_name
+
+    def __len__(self):
+        return len(list(iter(self)))
+
+def get_stale_steps(previous_steps: dict) -> list:
+    version = get_extractor_version()
+    result = []
+    for (step_name, _) in EXTRACTION_STEPS:
+        if previous_steps.get(step_name, {}).get('Version', None) != version:
+            result.append(step_name)
+    return result
+
+def extract(binary_file, args, previous_extraction=None, previous_steps: dict=None) -> tuple:
+    '''
+    Run every extraction step, reusing the previous extraction for steps whose version is unchanged
+
+    The version of a step is the SHA-1 of the extractor source it ran with; returns the extraction along
+    with the version of each step and the section keys it filled in, which are needed to reuse that step's
+    output on a later run
+    '''
+    if previous_steps is None:
+        previous_steps = {}
+    stale_steps = get_stale_steps(previous_steps)
+    version = get_extractor_version()
+    extraction = {}
+    steps = {}
+    for (step_name, step_function) in EXTRACTION_STEPS:
+        if step_name in stale_steps:
+            step_extraction = step_function(binary_file, args)
+        else:
+            step_extraction = {}
+            for (section_name, keys) in previous_steps[step_name]['Keys'].items():
+                step_extraction[section_name] = {}
+                for key in keys:
+                    step_extraction[section_name][key] = previous_extraction[section_name][key]
+        steps[step_name] = {
+            'Version': version,
+            'Keys': {},
         }
-        with open(os.path.join(os.path.normpath(args.build_dir), 'extraction.json'), 'w') as extraction_json:
-            json.dump(extraction, extraction_json, indent='  ', sort_keys=True)
+        for (section_name, section) in step_extraction.items():
+            if section_name not in extraction:
+                extraction[section_name] = {}
+            extraction[section_name].update(section)
+            steps[step_name]['Keys'][section_name] = list(str(key) for key in section.keys())
+    return (extraction, steps)
+
+if __name__ == '__main__':
+    '''
+    Extract game data from a binary file and output it to a JSON file
+
+    Usage
+    python src/sotn_extractor.py INPUT_BIN OUTPUT_JSON
+    '''
+    parser = argparse.ArgumentParser()
+    parser.add_argument('binary_filepath', help='Input a filepath to the input BIN file', type=str)
+    parser.add_argument('build_dir', help='Input a filepath to the folder that will contain all the build files', type=str)
+    parser.add_argument('--mmap', help='Read the BIN through a memory-mapped view of its gamedata', action='store_true')
+    parser.add_argument('--workers', help='Input an optional number of processes to extract stages with (default: 1)', type=int, default=1)
+    parser.add_argument('--force', help='Re-extract everything, even if a previous extraction of the same BIN is up to date', action='store_true')
+    args = parser.parse_args()
+    bin_sha1 = sotn_extraction.get_sha1(args.binary_filepath)
+    extraction_filepath = os.path.join(os.path.normpath(args.build_dir), 'extraction.json')
+    cache_filepath = os.path.join(os.path.normpath(args.build_dir), 'extraction.cache')
+    # Only the steps whose extractor source has changed need to be re-extracted from the same BIN
+    previous_extraction = None
+    previous_steps = {}
+    if not args.force and os.path.exists(cache_filepath):
+        previous_extraction = sotn_extraction.ExtractionCache(open(cache_filepath, 'br'))
+        if previous_extraction.index.get('BIN SHA-1', None) == bin_sha1:
+            previous_steps = previous_extraction.index.get('Steps', None) or {}
+    # NOTE(sestren): An extraction.json that was rewritten or edited since the cache is rewritten from the reused sections
+    if (
+        len(get_stale_steps(previous_steps)) < 1 and
+        os.path.exists(extraction_filepath) and
+        previous_extraction.index.get('Source', None) == sotn_extraction.get_source_stamp(extraction_filepath)
+    ):
+        print('Extraction is already up to date')
+        previous_extraction.close()
+        sys.exit(0)
+    with (
+        open(args.binary_filepath, 'br') as binary_file,
+    ):
+        if args.mmap:
+            with DiscImage(binary_file) as disc_image:
+                (extraction, steps) = extract(disc_image, args, previous_extraction, previous_steps)
+        else:
+            (extraction, steps) = extract(binary_file, args, previous_extraction, previous_steps)
+    if previous_extraction is not None:
+        previous_extraction.close()
+    # Store extracted data
+    with open(extraction_filepath, 'w') as extraction_json:
+        json.dump(sotn_extraction.exported(extraction), extraction_json, indent='  ', sort_keys=True)
+    # Store a compact, indexed copy of the extracted data for faster loading
+    with open(cache_filepath, 'wb') as extraction_cache:
+        sotn_extraction.write_cache(
+            extraction_cache,
+            extraction,
+            bin_sha1,
+            sotn_extraction.get_source_stamp(extraction_filepath),
+            steps,
+        )
@@ -0,0 +1,139 @@
+# External libraries
+import argparse
+import hashlib
+import os
+import pickle
+import struct
+
+# Local libraries
+import sotn_address
+import sotn_extraction
+import sotn_patcher
+
+PATCH_LIBRARY_MAGIC = b'SOTNPL02'
+PATCH_LIBRARY_HEADER = struct.Struct('<8s20s20s')
+
+def get_tile_ids(rows: list) -> list:
+    # Parse the space-separated hex tiles of each tilemap row, with None for tiles that are left alone
+    result = list(
+        list(sotn_address.get_value(tile) for tile in row_data.split(' ')) for
+        row_data in rows
+    )
+    return result
+
+def get_extents(pokes: list) -> list:
+    # Resolve a list of pokes into sorted, non-overlapping (gamedata address, bytes) runs, with later pokes taking precedence
+    written = {}
+    for poke in pokes:
+        game_address = sotn_address.get_value(poke['Gamedata Address'])
+        data = sotn_address.pack_value(sotn_address.get_value(poke['Value']), poke['Data Type'])
+        for (offset, byte) in enumerate(data):
+            written[game_address + offset] = byte
+    result = []
+    for game_address in sorted(written.keys()):
+        if len(result) > 0 and result[-1][0] + len(result[-1][1]) == game_address:
+            result[-1][1].append(written[game_address])
+        else:
+            result.append((game_address, bytearray((written[game_address], ))))
+    result = list((game_address, bytes(data)) for (game_address, data) in result)
+    return result
+
+def compile_patch(patch: dict) -> dict:
+    '''
+    Compile a common patch into the form assemble_patch merges
+
+    Pokes become pre-resolved byte extents; every other section is kept in its native form, except that tilemap rows are pre-parsed
+    '''
+    changes = patch.get('Changes', {})
+    compiled_changes = {}
+    for (section_name, section) in changes.items():
+        if section_name == 'Pokes':
+            continue
+        elif section_name == 'Tilemaps':
+            compiled_tilemaps = []
+            for tilemap in section:
+                compiled_tilemap = dict(tilemap)
+                compiled_tilemap['Tile IDs'] = get_tile_ids(compiled_tilemap.pop('Tiles'))
+                compiled_tilemaps.append(compiled_tilemap)
+            section = compiled_tilemaps
+        compiled_changes[section_name] = section
+    result = {
+        'Extents': get_extents(changes.get('Pokes', [])),
+        'Changes': compiled_changes,
+    }
+    return result
+
+def compile_library(patch_names: list) -> dict:
+    # Generate and compile the named patches from the patch registry in sotn_patcher
+    result = {
+        'Patches': dict(
+            (patch_name, compile_patch(sotn_patcher.get_patch(patch_name))) for
+            patch_name in patch_names
+        ),
+    }
+    return result
+
+def get_source_sha1() -> str:
+    # The library is only as current as the module that generates the patches
+    result = sotn_extraction.get_sha1(sotn_patcher.__file__)
+    return result
+
+def write_library(library_file, library: dict, source_sha1: str):
+    payload = pickle.dumps(library, protocol=pickle.HIGHEST_PROTOCOL)
+    library_file.write(PATCH_LIBRARY_HEADER.pack(PATCH_LIBRARY_MAGIC, bytes.fromhex(source_sha1), hashlib.sha1(payload).digest()))
+    library_file.write(payload)
+
+def read_library(library_file, source_sha1: str) -> dict:
+    # Returns None if the library is in an unrecognized format, was compiled from a different sotn_patcher, or its contents do not match its hash
+    header = library_file.read(PATCH_LIBRARY_HEADER.size)
+    if len(header) < PATCH_LIBRARY_HEADER.size:
+        return None
+    (magic, cached_sha1, content_sha1) = PATCH_LIBRARY_HEADER.unpack(header)
+    if magic != PATCH_LIBRARY_MAGIC or cached_sha1 != bytes.fromhex(source_sha1):
+        return None
+    payload = library_file.read()
+    if hashlib.sha1(payload).digest() != content_sha1:
+        return None
+    result = pickle.loads(payload)
+    return result
+
+def get_library_filepath(build_dir: str) -> str:
+    result = os.path.join(os.path.normpath(build_dir), 'patches.lib')
+    return result
+
+def load_library(build_dir: str=None) -> dict:
+    '''
+    Load the compiled common patch library from the build folder, when it is up to date
+
+    A stale or missing library is not compiled here; an empty library is returned instead, so that
+    each common patch is only generated and compiled the first time a changes file needs it
+    '''
+    result = {
+        'Patches': {},
+    }
+    if build_dir is not None:
+        library_filepath = get_library_filepath(build_dir)
+        if os.path.exists(library_filepath):
+            with open(library_filepath, 'br') as library_file:
+                library = read_library(library_file, get_source_sha1())
+            if library is not None:
+                result = library
+    return result
+
+def build_library(build_dir: str) -> dict:
+    # Compile every common patch in the patch registry in sotn_patcher and write the library to the build folder
+    source_sha1 = get_source_sha1()
+    result = compile_library(sorted(sotn_patcher.PATCHES.keys()))
+    with open(get_library_filepath(build_dir), 'wb') as library_file:
+        write_library(library_file, result, source_sha1)
+    return result
+
+if __name__ == '__main__':
+    '''
+    Usage
+    python sotn_patch_library.py BUILD_DIR
+    '''
+    parser = argparse.ArgumentParser()
+    parser.add_argument('build_dir', help='Input a filepath to the folder that will contain the compiled patch library', type=str)
+    args = parser.parse_args()
+    build_library(args.build_dir)
@@ -3071,6 +3071,146 @@ def get_prevent_palette_glitches_related_to_zombie_hallway():
     result = patch
     return result
 
+def get_enable_debug_mode_patch():
+    result = get_simple_patch("Enables the game's hidden debug mode", [
+        (0x000D9364, 'u32', 0xAC258850, 'sw a1, -$77B0(at)'), # Original instruction was sw 0, -$77B0(at)
+    ])
+    return result
+
+def get_normalize_ferryman_gate_patch():
+    result = get_simple_patch('Normalize Ferryman Gate', [
+        # 0x801C5C7C - EntityFerrymanController
+        # ------------------------------------------
+        # Equivalent to the following C code
+        # ------------------------------------------
+        # offset = self->posX.i.hi + g_Tilemap.scrollX.i.hi;
+        # if (self->facingLeft) {
+        #     if (offset > 3040) {
+        #         self->step++;
+        #     }
+        #     else if (offset > 2720) {
+        #         g_CastleFlags[0xC2] = true;
+        #     }
+        # } else {
+        #     if (offset < 288) {
+        #         self->step++;
+        #     }
+        #     else if (offset < 3104) {
+        #         g_CastleFlags[0xC2] = true;
+        #     }
+        # }
+        (0x0429D47C + 0x3F8, 'u32', 0x96040014, 'lhu     a0,0x14(s0)'),   # 801C6074
+        (0x0429D47C + 0x3FC, 'u32', 0x00000000, 'nop'),                   # 801C6078
+        (0x0429D47C + 0x400, 'u32', 0x1080000E, 'beqz    a0,$801C60B8'),  # 801C607C
+        (0x0429D47C + 0x404, 'u32', 0x00431021, 'addu    v0,v0,v1'),      # 801C6080
+        (0x0429D47C + 0x408, 'u32', 0x00021400, 'sll     v0,v0,0x10'),    # 801C6084
+        (0x0429D47C + 0x40C, 'u32', 0x00021C03, 'sra     v1,v0,0x10'),    # 801C6088
+        (0x0429D47C + 0x410, 'u32', 0x28620BE1, 'slti    v0,v1,0xBE1'),   # 801C608C
+        (0x0429D47C + 0x414, 'u32', 0x14400004, 'bnez    v0,$801C60A4'),  # 801C6090
+        (0x0429D47C + 0x418, 'u32', 0x00000000, 'nop'),                   # 801C6094
+        (0x0429D47C + 0x41C, 'u32', 0x9602002C, 'lhu     v0,0x2c(s0)'),   # 801C6098
+        (0x0429D47C + 0x420, 'u32', 0x0807185A, 'j       $801C6168'),     # 801C609C
+        (0x0429D47C + 0x424, 'u32', 0x24420001, 'addiu   v0,v0,1'),       # 801C60A0
+        (0x0429D47C + 0x428, 'u32', 0x28620AA1, 'slti    v0,v1,0xaa1'),   # 801C60A4
+        (0x0429D47C + 0x42C, 'u32', 0x14400030, 'bnez    v0,$801C616C'),  # 801C60A8
+        (0x0429D47C + 0x430, 'u32', 0x34020001, 'li      v0,0x1'),        # 801C60AC
+        (0x0429D47C + 0x434, 'u32', 0x08071839, 'j       $801C60E4'),     # 801C60B0
+        (0x0429D47C + 0x438, 'u32', 0x00000000, 'nop'),                   # 801C60B4
+        (0x0429D47C + 0x43C, 'u32', 0x00021400, 'sll     v0,v0,0x10'),    # 801C60B8
+        (0x0429D47C + 0x440, 'u32', 0x00021C03, 'sra     v1,v0,0x10'),    # 801C60BC
+        (0x0429D47C + 0x444, 'u32', 0x28620120, 'slti    v0,v1,0x120'),   # 801C60C0
+        (0x0429D47C + 0x448, 'u32', 0x10400004, 'beqz    v0,$801C60D8'),  # 801C60C4
+        (0x0429D47C + 0x44C, 'u32', 0x00000000, 'nop'),                   # 801C60C8
+        (0x0429D47C + 0x450, 'u32', 0x9602002C, 'lhu     v0,0x2c(s0)'),   # 801C60CC
+        (0x0429D47C + 0x454, 'u32', 0x0807185A, 'j       $801C6168'),     # 801C60D0
+        (0x0429D47C + 0x458, 'u32', 0x24420001, 'addiu   v0,v0,1'),       # 801C60D4
+        (0x0429D47C + 0x45C, 'u32', 0x28620C20, 'slti    v0,v1,0xc20'),   # 801C60D8
+        (0x0429D47C + 0x460, 'u32', 0x10400023, 'beqz    v0,$801C616C'),  # 801C60DC
+        (0x0429D47C + 0x464, 'u32', 0x34020001, 'li      v0,0x1'),        # 801C60E0
+        (0x0429D47C + 0x468, 'u32', 0x3C018004, 'lui     at,$8004'),      # 801C60E4
+        (0x0429D47C + 0x46C, 'u32', 0xA022BEAE, 'sb      v0,-$4152(at)'), # 801C60E8
+        (0x0429D47C + 0x470, 'u32', 0x0807185B, 'j       $801C616C'),     # 801C60EC
+        (0x0429D47C + 0x474, 'u32', 0x00000000, 'nop'),                   # 801C60F0
+        (0x0429D47C + 0x478, 'u32', 0x00000000, 'nop'),                   # 801C60F4
+        (0x0429D47C + 0x47C, 'u32', 0x00000000, 'nop'),                   # 801C60F8
+        (0x0429D47C + 0x480, 'u32', 0x00000000, 'nop'),                   # 801C60FC
+    ])
+    return result
+
+def get_skip_maria_cutscene_in_alchemy_laboratory_patch():
+    result = get_simple_patch('Skip Maria cutscene in Alchemy Laboratory', [
+        (0x049F66EC, 'u32', 0x0806E296, 'bne v0,0,$801B8A58'), # Original instruction was bne v0,0,$801B8A58
+    ])
+    return result
+
+# Every common patch by name, each generated only when it is first asked for through get_patch
+PATCHES = {
+    'assign-power-of-wolf-relic-a-unique-id': get_assign_power_of_wolf_relic_a_unique_id,
+    'clock-hands-display-minutes-and-seconds': get_clock_hands_patch,
+    'enable-debug-mode': get_enable_debug_mode_patch,
+    'normalize-confessional-chime-sound': get_normalize_confessional_chime_sound,
+    'normalize-dk-bridge-bottom-passage': get_normalize_dk_bridge_bottom_passage,
+    'normalize-ferryman-gate': get_normalize_ferryman_gate_patch,
+    'normalize-alchemy-laboratory-entryway-top-passage': get_normalize_alchemy_laboratory_entryway_top_passage,
+    'normalize-alchemy-laboratory-glass-vats-bottom-passage': get_normalize_alchemy_laboratory_glass_vats_bottom_passage,
+    'normalize-alchemy-laboratory-red-skeleton-lift-room-bottom-passage': get_normalize_alchemy_laboratory_red_skeleton_lift_room_bottom_passage,
+    'normalize-alchemy-laboratory-red-skeleton-lift-room-top-passage': get_normalize_alchemy_laboratory_red_skeleton_lift_room_top_passage,
+    'normalize-alchemy-laboratory-secret-life-max-up-room-top-passage': get_normalize_alchemy_laboratory_secret_life_max_up_room_top_passage,
+    'normalize-alchemy-laboratory-tall-zig-zag-room-bottom-passage': get_normalize_alchemy_laboratory_tall_zig_zag_room_bottom_passage,
+    'normalize-castle-entrance-after-drawbridge-bottom-passage': get_normalize_castle_entrance_after_drawbridge_bottom_passage,
+    'normalize-castle-entrance-attic-entrance-bottom-passage': get_normalize_castle_entrance_attic_entrance_bottom_passage,
+    'normalize-castle-entrance-drop-under-portcullis-top-passage': get_normalize_castle_entrance_drop_under_portcullis_top_passage,
+    'normalize-castle-entrance-merman-room-top-passage': get_normalize_castle_entrance_merman_room_top_passage,
+    'normalize-hidden-crystal-entrance-top-passage': get_normalize_hidden_crystal_entrance_top_passage,
+    'normalize-ice-floe-room-top-passage': get_normalize_ice_floe_room_top_passage,
+    'normalize-jewel-sword-passageway': get_normalize_jewel_sword_passageway_patch,
+    'normalize-long-drop-bottom-passage': get_normalize_long_drop_bottom_passage,
+    'normalize-marble-gallery-beneath-left-trapdoor-top-passage': get_normalize_marble_gallery_beneath_left_trapdoor_top_passage,
+    'normalize-marble-gallery-beneath-right-trapdoor-top-passage': get_normalize_marble_gallery_beneath_right_trapdoor_top_passage,
+    'normalize-marble-gallery-gravity-boots-room-bottom-passage': get_normalize_marble_gallery_gravity_boots_room_bottom_passage,
+    'normalize-marble-gallery-slinger-staircase-right-bottom-passage': get_normalize_marble_gallery_slinger_staircase_right_bottom_passage,
+    'normalize-marble-gallery-stopwatch-room-bottom-passage': get_normalize_marble_gallery_stopwatch_room_bottom_passage,
+    'normalize-marble-gallery-three-paths-top-passage': get_normalize_marble_gallery_three_paths_top_passage,
+    'normalize-olroxs-quarters-catwalk-crypt-left-top-passage': get_normalize_olroxs_quarters_catwalk_crypt_left_top_passage,
+    'normalize-olroxs-quarters-open-courtyard-top-passage': get_normalize_olroxs_quarters_open_courtyard_top_passage,
+    'normalize-olroxs-quarters-prison-left-bottom-passage': get_normalize_olroxs_quarters_prison_left_bottom_passage,
+    'normalize-olroxs-quarters-prison-right-bottom-passage': get_normalize_olroxs_quarters_prison_right_bottom_passage,
+    'normalize-olroxs-quarters-secret-onyx-room-rubble': get_normalize_olroxs_quarters_secret_onyx_room_rubble,
+    'normalize-olroxs-quarters-sword-card-room-bottom-passage': get_normalize_olroxs_quarters_sword_card_room_bottom_passage,
+    'normalize-olroxs-quarters-tall-shaft-top-passage': get_normalize_olroxs_quarters_tall_shaft_top_passage,
+    'normalize-secret-bookcase-rooms': get_normalize_secret_bookcase_rooms,
+    'normalize-tall-stairwell-bottom-passage': get_normalize_tall_stairwell_bottom_passage,
+    'normalize-underground-caverns-crystal-bend-top-passage': get_normalize_underground_caverns_crystal_bend_top_passage,
+    'normalize-underground-caverns-exit-to-abandoned-mine-top-passage': get_normalize_underground_caverns_exit_to_abandoned_mine_top_passage,
+    'normalize-underground-caverns-exit-to-castle-entrance': get_normalize_underground_caverns_exit_to_castle_entrance,
+    'normalize-underground-caverns-hidden-crystal-entrance-bottom-passage': get_normalize_underground_caverns_hidden_crystal_entrance_bottom_passage,
+    'normalize-underground-caverns-left-ferryman-route-top-passage': get_normalize_underground_caverns_left_ferryman_route_top_passage,
+    'normalize-underground-caverns-plaque-room-bottom-passage': get_normalize_underground_caverns_plaque_room_bottom_passage,
+    'normalize-underground-caverns-room-id-09-bottom-passage': get_normalize_underground_caverns_room_id_09_bottom_passage,
+    'normalize-underground-caverns-room-id-10-top-passage': get_normalize_underground_caverns_room_id_10_top_passage,
+    'normalize-underground-caverns-small-stairwell-top-passage': get_normalize_underground_caverns_small_stairwell_top_passage,
+    'normalize-waterfall-roar-sound': get_normalize_waterfall_roar_sound,
+    'prevent-palette-glitches-related-to-zombie-hallway': get_prevent_palette_glitches_related_to_zombie_hallway,
+    'prevent-softlocks-after-defeating-scylla': get_prevent_softlocks_after_defeating_scylla,
+    'prevent-softlocks-at-demon-switch-wall': get_prevent_softlocks_at_demon_switch_wall_patch,
+    'prevent-softlocks-at-left-gear-room-wall': get_prevent_softlocks_at_left_gear_room_wall_patch,
+    'prevent-softlocks-at-pendulum-room-wall': get_prevent_softlocks_at_pendulum_room_wall_patch,
+    'prevent-softlocks-at-plaque-room-wall': get_prevent_softlocks_at_plaque_room_wall_patch,
+    'prevent-softlocks-at-snake-column-wall': get_prevent_softlocks_at_snake_column_wall_patch,
+    'prevent-softlocks-at-tall-zig-zag-room-wall': get_prevent_softlocks_at_tall_zig_zag_room_wall_patch,
+    'prevent-softlocks-when-meeting-death': get_prevent_softlocks_when_meeting_death_patch,
+    'skip-maria-cutscene-in-alchemy-laboratory': get_skip_maria_cutscene_in_alchemy_laboratory_patch,
+}
+
+# Patches already generated by get_patch, normalized as they would be read back from their JSON files
+patch_cache = {}
+
+def get_patch(patch_name: str) -> dict:
+    if patch_name not in patch_cache:
+        patch_cache[patch_name] = json.loads(json.dumps(PATCHES[patch_name](), sort_keys=True))
+    result = patch_cache[patch_name]
+    return result
+
 if __name__ == '__main__':
     '''
     Some patches play nice with other patches, some don't.
@@ -3082,125 +3222,9 @@ if __name__ == '__main__':
     parser = argparse.ArgumentParser()
     parser.add_argument('build_dir', help='Input a filepath to a folder that will contain the build files', type=str)
     args = parser.parse_args()
-    for (file_name, patch) in (
-        ('assign-power-of-wolf-relic-a-unique-id', get_assign_power_of_wolf_relic_a_unique_id()),
-        ('clock-hands-display-minutes-and-seconds', get_clock_hands_patch()),
-        ('enable-debug-mode', get_simple_patch("Enables the game's hidden debug mode", [
-            (0x000D9364, 'u32', 0xAC258850, 'sw a1, -$77B0(at)'), # Original instruction was sw 0, -$77B0(at)
-        ])),
-        ('normalize-confessional-chime-sound', get_normalize_confessional_chime_sound()),
-        ('normalize-dk-bridge-bottom-passage', get_normalize_dk_bridge_bottom_passage()),
-        ('normalize-ferryman-gate', get_simple_patch('Normalize Ferryman Gate', [
-            # 0x801C5C7C - EntityFerrymanController
-            # ------------------------------------------
-            # Equivalent to the following C code
-            # ------------------------------------------
-            # offset = self->posX.i.hi + g_Tilemap.scrollX.i.hi;
-            # if (self->facingLeft) {
-            #     if (offset > 3040) {
-            #         self->step++;
-            #     }
-            #     else if (offset > 2720) {
-            #         g_CastleFlags[0xC2] = true;
-            #     }
-            # } else {
-            #     if (offset < 288) {
-            #         self->step++;
-            #     }
-            #     else if (offset < 3104) {
-            #         g_CastleFlags[0xC2] = true;
-            #     }
-            # }
-            (0x0429D47C + 0x3F8, 'u32', 0x96040014, 'lhu     a0,0x14(s0)'),   # 801C6074
-            (0x0429D47C + 0x3FC, 'u32', 0x00000000, 'nop'),                   # 801C6078
-            (0x0429D47C + 0x400, 'u32', 0x1080000E, 'beqz    a0,$801C60B8'),  # 801C607C
-            (0x0429D47C + 0x404, 'u32', 0x00431021, 'addu    v0,v0,v1'),      # 801C6080
-            (0x0429D47C + 0x408, 'u32', 0x00021400, 'sll     v0,v0,0x10'),    # 801C6084
-            (0x0429D47C + 0x40C, 'u32', 0x00021C03, 'sra     v1,v0,0x10'),    # 801C6088
-            (0x0429D47C + 0x410, 'u32', 0x28620BE1, 'slti    v0,v1,0xBE1'),   # 801C608C
-            (0x0429D47C + 0x414, 'u32', 0x14400004, 'bnez    v0,$801C60A4'),  # 801C6090
-            (0x0429D47C + 0x418, 'u32', 0x00000000, 'nop'),                   # 801C6094
-            (0x0429D47C + 0x41C, 'u32', 0x9602002C, 'lhu     v0,0x2c(s0)'),   # 801C6098
-            (0x0429D47C + 0x420, 'u32', 0x0807185A, 'j       $801C6168'),     # 801C609C
-            (0x0429D47C + 0x424, 'u32', 0x24420001, 'addiu   v0,v0,1'),       # 801C60A0
-            (0x0429D47C + 0x428, 'u32', 0x28620AA1, 'slti    v0,v1,0xaa1'),   # 801C60A4
-            (0x0429D47C + 0x42C, 'u32', 0x14400030, 'bnez    v0,$801C616C'),  # 801C60A8
-            (0x0429D47C + 0x430, 'u32', 0x34020001, 'li      v0,0x1'),        # 801C60AC
-            (0x0429D47C + 0x434, 'u32', 0x08071839, 'j       $801C60E4'),     # 801C60B0
-            (0x0429D47C + 0x438, 'u32', 0x00000000, 'nop'),                   # 801C60B4
-            (0x0429D47C + 0x43C, 'u32', 0x00021400, 'sll     v0,v0,0x10'),    # 801C60B8
-            (0x0429D47C + 0x440, 'u32', 0x00021C03, 'sra     v1,v0,0x10'),    # 801C60BC
-            (0x0429D47C + 0x444, 'u32', 0x28620120, 'slti    v0,v1,0x120'),   # 801C60C0
-            (0x0429D47C + 0x448, 'u32', 0x10400004, 'beqz    v0,$801C60D8'),  # 801C60C4
-            (0x0429D47C + 0x44C, 'u32', 0x00000000, 'nop'),                   # 801C60C8
-            (0x0429D47C + 0x450, 'u32', 0x9602002C, 'lhu     v0,0x2c(s0)'),   # 801C60CC
-            (0x0429D47C + 0x454, 'u32', 0x0807185A, 'j       $801C6168'),     # 801C60D0
-            (0x0429D47C + 0x458, 'u32', 0x24420001, 'addiu   v0,v0,1'),       # 801C60D4
-            (0x0429D47C + 0x45C, 'u32', 0x28620C20, 'slti    v0,v1,0xc20'),   # 801C60D8
-            (0x0429D47C + 0x460, 'u32', 0x10400023, 'beqz    v0,$801C616C'),  # 801C60DC
-            (0x0429D47C + 0x464, 'u32', 0x34020001, 'li      v0,0x1'),        # 801C60E0
-            (0x0429D47C + 0x468, 'u32', 0x3C018004, 'lui     at,$8004'),      # 801C60E4
-            (0x0429D47C + 0x46C, 'u32', 0xA022BEAE, 'sb      v0,-$4152(at)'), # 801C60E8
-            (0x0429D47C + 0x470, 'u32', 0x0807185B, 'j       $801C616C'),     # 801C60EC
-            (0x0429D47C + 0x474, 'u32', 0x00000000, 'nop'),                   # 801C60F0
-            (0x0429D47C + 0x478, 'u32', 0x00000000, 'nop'),                   # 801C60F4
-            (0x0429D47C + 0x47C, 'u32', 0x00000000, 'nop'),                   # 801C60F8
-            (0x0429D47C + 0x480, 'u32', 0x00000000, 'nop'),                   # 801C60FC
-        ])),
-        ('normalize-alchemy-laboratory-entryway-top-passage', get_normalize_alchemy_laboratory_entryway_top_passage()),
-        ('normalize-alchemy-laboratory-glass-vats-bottom-passage', get_normalize_alchemy_laboratory_glass_vats_bottom_passage()),
-        ('normalize-alchemy-laboratory-red-skeleton-lift-room-bottom-passage', get_normalize_alchemy_laboratory_red_skeleton_lift_room_bottom_passage()),
-        ('normalize-alchemy-laboratory-red-skeleton-lift-room-top-passage', get_normalize_alchemy_laboratory_red_skeleton_lift_room_top_passage()),
-        ('normalize-alchemy-laboratory-secret-life-max-up-room-top-passage', get_normalize_alchemy_laboratory_secret_life_max_up_room_top_passage()),
-        ('normalize-alchemy-laboratory-tall-zig-zag-room-bottom-passage', get_normalize_alchemy_laboratory_tall_zig_zag_room_bottom_passage()),
-        ('normalize-castle-entrance-after-drawbridge-bottom-passage', get_normalize_castle_entrance_after_drawbridge_bottom_passage()),
-        ('normalize-castle-entrance-attic-entrance-bottom-passage', get_normalize_castle_entrance_attic_entrance_bottom_passage()),
-        ('normalize-castle-entrance-drop-under-portcullis-top-passage', get_normalize_castle_entrance_drop_under_portcullis_top_passage()),
-        ('normalize-castle-entrance-merman-room-top-passage', get_normalize_castle_entrance_merman_room_top_passage()),
-        ('normalize-hidden-crystal-entrance-top-passage', get_normalize_hidden_crystal_entrance_top_passage()),
-        ('normalize-ice-floe-room-top-passage', get_normalize_ice_floe_room_top_passage()),
-        ('normalize-jewel-sword-passageway', get_normalize_jewel_sword_passageway_patch()),
-        ('normalize-long-drop-bottom-passage', get_normalize_long_drop_bottom_passage()),
-        ('normalize-marble-gallery-beneath-left-trapdoor-top-passage', get_normalize_marble_gallery_beneath_left_trapdoor_top_passage()),
-        ('normalize-marble-gallery-beneath-right-trapdoor-top-passage', get_normalize_marble_gallery_beneath_right_trapdoor_top_passage()),
-        ('normalize-marble-gallery-gravity-boots-room-bottom-passage', get_normalize_marble_gallery_gravity_boots_room_bottom_passage()),
-        ('normalize-marble-gallery-slinger-staircase-right-bottom-passage', get_normalize_marble_gallery_slinger_staircase_right_bottom_passage()),
-        ('normalize-marble-gallery-stopwatch-room-bottom-passage', get_normalize_marble_gallery_stopwatch_room_bottom_passage()),
-        ('normalize-marble-gallery-three-paths-top-passage', get_normalize_marble_gallery_three_paths_top_passage()),
-        ('normalize-olroxs-quarters-catwalk-crypt-left-top-passage', get_normalize_olroxs_quarters_catwalk_crypt_left_top_passage()),
-        ('normalize-olroxs-quarters-open-courtyard-top-passage', get_normalize_olroxs_quarters_open_courtyard_top_passage()),
-        ('normalize-olroxs-quarters-prison-left-bottom-passage', get_normalize_olroxs_quarters_prison_left_bottom_passage()),
-        ('normalize-olroxs-quarters-prison-right-bottom-passage', get_normalize_olroxs_quarters_prison_right_bottom_passage()),
-        ('normalize-olroxs-quarters-secret-onyx-room-rubble', get_normalize_olroxs_quarters_secret_onyx_room_rubble()),
-        ('normalize-olroxs-quarters-sword-card-room-bottom-passage', get_normalize_olroxs_quarters_sword_card_room_bottom_passage()),
-        ('normalize-olroxs-quarters-tall-shaft-top-passage', get_normalize_olroxs_quarters_tall_shaft_top_passage()),
-        ('normalize-secret-bookcase-rooms', get_normalize_secret_bookcase_rooms()),
-        ('normalize-tall-stairwell-bottom-passage', get_normalize_tall_stairwell_bottom_passage()),
-        ('normalize-underground-caverns-crystal-bend-top-passage', get_normalize_underground_caverns_crystal_bend_top_passage()),
-        ('normalize-underground-caverns-exit-to-abandoned-mine-top-passage', get_normalize_underground_caverns_exit_to_abandoned_mine_top_passage()),
-        ('normalize-underground-caverns-exit-to-castle-entrance', get_normalize_underground_caverns_exit_to_castle_entrance()),
-        ('normalize-underground-caverns-hidden-crystal-entrance-bottom-passage', get_normalize_underground_caverns_hidden_crystal_entrance_bottom_passage()),
-        ('normalize-underground-caverns-left-ferryman-route-top-passage', get_normalize_underground_caverns_left_ferryman_route_top_passage()),
-        ('normalize-underground-caverns-plaque-room-bottom-passage', get_normalize_underground_caverns_plaque_room_bottom_passage()),
-        ('normalize-underground-caverns-room-id-09-bottom-passage', get_normalize_underground_caverns_room_id_09_bottom_passage()),
-        ('normalize-underground-caverns-room-id-10-top-passage', get_normalize_underground_caverns_room_id_10_top_passage()),
-        ('normalize-underground-caverns-small-stairwell-top-passage', get_normalize_underground_caverns_small_stairwell_top_passage()),
-        ('normalize-waterfall-roar-sound', get_normalize_waterfall_roar_sound()),
-        ('prevent-palette-glitches-related-to-zombie-hallway', get_prevent_palette_glitches_related_to_zombie_hallway()),
-        ('prevent-softlocks-after-defeating-scylla', get_prevent_softlocks_after_defeating_scylla()),
-        ('prevent-softlocks-at-demon-switch-wall', get_prevent_softlocks_at_demon_switch_wall_patch()),
-        ('prevent-softlocks-at-left-gear-room-wall', get_prevent_softlocks_at_left_gear_room_wall_patch()),
-        ('prevent-softlocks-at-pendulum-room-wall', get_prevent_softlocks_at_pendulum_room_wall_patch()),
-        ('prevent-softlocks-at-plaque-room-wall', get_prevent_softlocks_at_plaque_room_wall_patch()),
-        ('prevent-softlocks-at-snake-column-wall', get_prevent_softlocks_at_snake_column_wall_patch()),
-        ('prevent-softlocks-at-tall-zig-zag-room-wall', get_prevent_softlocks_at_tall_zig_zag_room_wall_patch()),
-        ('prevent-softlocks-when-meeting-death', get_prevent_softlocks_when_meeting_death_patch()),
-        ('skip-maria-cutscene-in-alchemy-laboratory', get_simple_patch('Skip Maria cutscene in Alchemy Laboratory', [
-            (0x049F66EC, 'u32', 0x0806E296, 'bne v0,0,$801B8A58'), # Original instruction was bne v0,0,$801B8A58
-        ])),
-    ):
-        with open(os.path.join(os.path.normpath(args.build_dir), 'patches', file_name + '.json'), 'w') as patch_file:
-            json.dump(patch, patch_file, indent='    ', sort_keys=True)
+    for patch_name in sorted(PATCHES.keys()):
+        with open(os.path.join(os.path.normpath(args.build_dir), 'patches', patch_name + '.json'), 'w') as patch_file:
+            json.dump(get_patch(patch_name), patch_file, indent='    ', sort_keys=True)
     # # Option - Preserve unsaved map data
     # if changes.get('Options', {}).get('Preserve unsaved map data', 'None') != 'None':
     #     preservation_method = changes['Options']['Preserve unsaved map data']
@@ -1,134 +1,323 @@
 # External libraries
 import argparse
+import bisect
 import collections
+import concurrent.futures
 import copy
+import glob
+import http.server
 import json
+import operator
 import os
-import yaml
+import sys
 
 # Local libraries
 import sotn_address
+import sotn_aliases
+import sotn_disc
+import sotn_extraction
+import sotn_extractor
+import sotn_patch_library
+import sotn_patcher
 
 class PPF:
-    def __init__(self, description, patch, debug: bool=False):
+    '''
+    Encodes a Patch as a PPF3 file
+    
+    Records are streamed straight from the patch's write extents, and by default never cross a 0x80-byte
+    partition of the disc, which keeps the output byte-identical to earlier versions; with long_records,
+    each record instead covers as many contiguous disc bytes as possible, up to the PPF3 limit of 255 bytes
+    '''
+    PARTITION_SIZE = 0x80
+    MAX_RECORD_SIZE = 0xFF
+    def __init__(self, description, patch, debug: bool=False, long_records: bool=False):
         self.debug = debug
         self.description = (description + 50 * ' ')[:50]
-        self.bytes = bytearray()
-        self.write_string('PPF30')
-        self.write_byte(2) # Encoding method = PPF3.0
-        self.write_string(self.description)
-        self.write_byte(0) # Imagetype = BIN
-        self.write_byte(0) # Blockcheck = Disabled
-        self.write_byte(0) # Undo data = Not available
-        self.write_byte(0) # Dummy
-        assert len(self.bytes) == 60 # 0x3C
-        for high in sorted(patch.writes.keys()):
-            left = 0
-            right = 0
-            lows = list(reversed(sorted(patch.writes[high].keys())))
-            while len(lows) > 0:
-                right = left = lows.pop()
-                while (len(lows) > 0) and (lows[-1] == (right + 1)):
-                    right = lows.pop()
-                disc_address = patch.partition_size * high + left
-                size = 1 + (right - left)
-                self.write_u64(disc_address)
-                self.write_byte(size)
-                values = []
-                for low in range(left, right + 1):
-                    value = patch.writes[high][low]
-                    self.write_byte(value)
-                    values.append(value)
-                if self.debug:
-                    print(disc_address, size, values)
+        self.patch = patch
+        self.long_records = long_records
+    
+    def get_header(self) -> bytes:
+        result = bytearray()
+        result.extend(b'PPF30')
+        result.append(2) # Encoding method = PPF3.0
+        result.extend(self.description.encode('latin-1'))
+        result.append(0) # Imagetype = BIN
+        result.append(0) # Blockcheck = Disabled
+        result.append(0) # Undo data = Not available
+        result.append(0) # Dummy
+        assert len(result) == 60 # 0x3C
+        return bytes(result)
+    
+    def get_partitioned_writes(self):
+        # Contiguous runs of disc bytes, split wherever they cross into the next partition
+        for (disc_address, data) in self.patch.get_disc_writes(sotn_address.Address.SECTOR_DATA_SIZE):
+            offset = 0
+            while offset < len(data):
+                size = min(len(data) - offset, self.PARTITION_SIZE - (disc_address + offset) % self.PARTITION_SIZE)
+                yield (disc_address + offset, data[offset:offset + size])
+                offset += size
     
-    def write_byte(self, byte):
-        assert 0x00 <= byte < 0x100
-        self.bytes.append(byte)
+    def get_records(self):
+        disc_writes = self.get_partitioned_writes()
+        if self.long_records:
+            disc_writes = self.patch.get_disc_writes(self.MAX_RECORD_SIZE)
+        for (disc_address, data) in disc_writes:
+            if self.debug:
+                print(disc_address, len(data), list(data))
+            yield disc_address.to_bytes(8, 'little') + bytes((len(data), )) + data
     
-    def write_u64(self, value):
-        write_value = value
-        for _ in range(8):
-            write_value, byte = divmod(write_value, 0x100)
-            self.write_byte(byte)
+    def write(self, file):
+        file.write(self.get_header())
+        for record in self.get_records():
+            file.write(record)
     
-    def write_string(self, string):
-        for char in string:
-            self.write_byte(ord(char))
+    @property
+    def bytes(self) -> bytes:
+        result = self.get_header() + b''.join(self.get_records())
+        return result
 
 class Patch:
+    '''
+    Bytes to be written to the disc, stored as sorted, non-overlapping runs keyed by gamedata address
+
+    Runs that overlap or touch are merged together as they are written, with later writes
+    taking precedence over earlier ones
+    '''
     def __init__(self):
-        self.writes = {}
-        self.cursor = sotn_address.Address(0)
-        self.partition_size = 0x80
+        self.starts = []
+        self.runs = {}
     
-    def write_byte(self, byte):
-        assert 0x00 <= byte < 0x100
-        (high, low) = divmod(self.cursor.to_disc_address(), self.partition_size)
-        if high not in self.writes:
-            self.writes[high] = {}
-        self.writes[high][low] = byte
+    def get_run_end(self, start: int) -> int:
+        result = start + len(self.runs[start])
+        return result
     
-    def write_u8(self, value):
-        write_value = value
-        for _ in range(1):
-            write_value, byte = divmod(write_value, 0x100)
-            self.write_byte(byte)
-            self.cursor.address += 1
+    def write_bytes(self, game_address: int, data: bytes):
+        end = game_address + len(data)
+        # Find all runs that overlap or touch the new data
+        first = bisect.bisect_left(self.starts, game_address)
+        if first > 0 and self.get_run_end(self.starts[first - 1]) >= game_address:
+            first -= 1
+        last = bisect.bisect_right(self.starts, end, first)
+        if first == last:
+            self.starts.insert(first, game_address)
+            self.runs[game_address] = bytearray(data)
+        elif last - first == 1 and self.starts[first] <= game_address:
+            # Overwrite and/or extend a single run in place
+            start = self.starts[first]
+            self.runs[start][game_address - start:end - start] = data
+        else:
+            merged_start = min(self.starts[first], game_address)
+            merged_end = max(self.get_run_end(self.starts[last - 1]), end)
+            merged = bytearray(merged_end - merged_start)
+            for start in self.starts[first:last]:
+                run = self.runs.pop(start)
+                merged[start - merged_start:start - merged_start + len(run)] = run
+            merged[game_address - merged_start:end - merged_start] = data
+            self.starts[first:last] = [merged_start]
+            self.runs[merged_start] = merged
     
-    def write_s8(self, value):
-        write_value = (value & 0x7F) + (0x80 if value < 0 else 0x00)
-        for _ in range(1):
-            write_value, byte = divmod(write_value, 0x100)
-            self.write_byte(byte)
-            self.cursor.address += 1
+    def get_writes(self):
+        # Contiguous runs of bytes, in gamedata address order
+        for start in self.starts:
+            yield (start, bytes(self.runs[start]))
     
-    def write_u16(self, value):
-        write_value = value
-        for _ in range(2):
-            write_value, byte = divmod(write_value, 0x100)
-            self.write_byte(byte)
-            self.cursor.address += 1
+    def get_disc_writes(self, max_size: int):
+        # Contiguous runs of bytes on the disc, in disc address order, each at most max_size bytes long
+        DAT = sotn_address.Address.SECTOR_DATA_SIZE
+        for (start, data) in self.get_writes():
+            offset = 0
+            while offset < len(data):
+                disc_address = sotn_address.Address.get_disc_address(start + offset)
+                size = min(
+                    len(data) - offset,
+                    DAT - (start + offset) % DAT,
+                    max_size,
+                )
+                yield (disc_address, data[offset:offset + size])
+                offset += size
     
-    def write_s16(self, value):
-        write_value = (value & 0x7FFF) + (0x8000 if value < 0 else 0x0000)
-        for _ in range(2):
-            write_value, byte = divmod(write_value, 0x100)
-            self.write_byte(byte)
-            self.cursor.address += 1
+    def patch_value(self, value: int, data_type: str, game_address: int):
+        if data_type not in sotn_address.DATA_TYPE_SIZES:
+            raise Exception('Incorrect type for patch_value:', (value, data_type, game_address))
+        self.write_bytes(game_address, sotn_address.pack_value(value, data_type))
+
+class TilemapStampMatcher:
+    '''
+    Finds where a stamp-sized window of a target layout first appears in a source layout
+
+    Source windows are indexed by their contents once per stamp size, so each lookup is a
+    single dictionary access instead of a scan of every source location; the first source
+    location in row-major order wins when the same window appears more than once
+    '''
+    def __init__(self, source: list[str], rows: int, cols: int):
+        self.source = source
+        self.rows = rows
+        self.cols = cols
+        self.strips = {}
+        self.indexes = {}
     
-    def write_u32(self, value):
-        write_value = value
-        for _ in range(4):
-            write_value, byte = divmod(write_value, 0x100)
-            self.write_byte(byte)
-            self.cursor.address += 1
+    def get_strips(self, stamp_width: int) -> list:
+        # Every stamp-wide slice of every row of the source, indexed by row and then by left edge
+        if stamp_width not in self.strips:
+            self.strips[stamp_width] = list(
+                list(row_data[left:left + stamp_width] for left in range(self.cols - (stamp_width - 1))) for
+                row_data in self.source[:self.rows]
+            )
+        result = self.strips[stamp_width]
+        return result
     
-    def write_s32(self, value):
-        write_value = (value & 0x7FFFFFFF) + (0x80000000 if value < 0 else 0x00000000)
-        for _ in range(4):
-            write_value, byte = divmod(write_value, 0x100)
-            self.write_byte(byte)
-            self.cursor.address += 1
+    def get_index(self, stamp_height: int, stamp_width: int) -> dict:
+        if (stamp_height, stamp_width) not in self.indexes:
+            index = {}
+            strips = self.get_strips(stamp_width)
+            for source_top in range(self.rows - (stamp_height - 1)):
+                for (source_left, window) in enumerate(zip(*strips[source_top:source_top + stamp_height])):
+                    index.setdefault(window, (source_top, source_left))
+            self.indexes[(stamp_height, stamp_width)] = index
+        result = self.indexes[(stamp_height, stamp_width)]
+        return result
     
-    def patch_value(self, value: int, data_type: str, game_address: int):
-        self.cursor.address = game_address
-        if data_type == 'u8':
-            self.write_u8(value)
-        elif data_type == 's8':
-            self.write_s8(value)
-        elif data_type == 'u16':
-            self.write_u16(value)
-        elif data_type == 's16':
-            self.write_s16(value)
-        elif data_type == 'u32':
-            self.write_u32(value)
-        elif data_type == 's32':
-            self.write_s32(value)
+    def find(self, target: list[str], target_top: int, target_left: int, stamp_height: int, stamp_width: int) -> tuple:
+        window = tuple(
+            target[target_top + row][target_left:target_left + stamp_width] for row in range(stamp_height)
+        )
+        result = self.get_index(stamp_height, stamp_width).get(window, None)
+        return result
+
+STAMP_SIZES = (
+    (5, 5), (5, 4), (4, 5), (4, 4), (5, 3), (3, 5),
+    (4, 3), (3, 4), (5, 2), (2, 5), (3, 3), (4, 2),
+    (2, 4), (3, 2), (2, 3), (5, 1), (1, 5), (2, 2),
+    (3, 1), (1, 3), (2, 1), (1, 2), (1, 1),
+)
+
+class EntityLayoutOverlay:
+    '''
+    Changes to the entity layout rows of a stage, recorded over the extracted rows without copying them
+
+    Only updated, added, and deleted entities are stored; a row is materialized as a list of
+    entities when it is read, sharing the extracted entities that were left alone
+    '''
+    def __init__(self, rows: list):
+        self.rows = rows
+        self.updates = {}
+        self.additions = {}
+        self.deletions = {}
+    
+    def check_row(self, row: int):
+        if not (0 <= row < len(self.rows)):
+            raise IndexError('Entity layout row out of range: ' + str(row))
+    
+    def get_entity_count(self, row: int) -> int:
+        # Includes entities that are marked for deletion, so entity IDs stay stable until the row is materialized
+        result = len(self.rows[row]) + len(self.additions.get(row, []))
+        return result
+    
+    def get_entity(self, row: int, entity_id: int) -> dict:
+        extracted_count = len(self.rows[row])
+        if entity_id >= extracted_count:
+            result = self.additions.get(row, [])[entity_id - extracted_count]
+        elif entity_id in self.updates.get(row, {}):
+            result = dict(self.rows[row][entity_id])
+            result.update(self.updates[row][entity_id])
         else:
-            raise Exception('Incorrect type for patch_value:', (value, data_type, game_address))
+            result = self.rows[row][entity_id]
+        return result
+    
+    def update_entity(self, row: int, entity_id: int, properties: dict):
+        extracted_count = len(self.rows[row])
+        if entity_id >= extracted_count:
+            self.additions.get(row, [])[entity_id - extracted_count].update(properties)
+            return
+        if row not in self.updates:
+            self.updates[row] = {}
+        if entity_id not in self.updates[row]:
+            self.updates[row][entity_id] = {}
+        self.updates[row][entity_id].update(properties)
+    
+    def add_entity(self, row: int, entity: dict):
+        self.check_row(row)
+        if row not in self.additions:
+            self.additions[row] = []
+        self.additions[row].append(entity)
+    
+    def delete_entity(self, row: int, entity_id: int):
+        if not (0 <= entity_id < self.get_entity_count(row)):
+            raise IndexError('Entity ID out of range: ' + str((row, entity_id)))
+        if row not in self.deletions:
+            self.deletions[row] = set()
+        self.deletions[row].add(entity_id)
+    
+    def get_row(self, row: int) -> list:
+        if row not in self.updates and row not in self.additions and row not in self.deletions:
+            return self.rows[row]
+        deletions = self.deletions.get(row, set())
+        result = list(
+            self.get_entity(row, entity_id) for
+            entity_id in range(self.get_entity_count(row)) if
+            entity_id not in deletions
+        )
+        return result
+    
+    def get_rows(self):
+        for row in range(len(self.rows)):
+            yield self.get_row(row)
+
+def stamp_tilemap_edit(edit: dict, tilemaps: dict, cols: int):
+    layers = edit['Layer'].split(' and ')
+    source = edit['Source']
+    target = edit['Target']
+    target_rows = len(target)
+    target_cols = len(target[0])
+    # Copy source data to target directly if a space in the target is specified
+    # If target already has source data copied to it, preserve that data
+    for layer in layers:
+        for row in range(target_rows):
+            for col in range(target_cols):
+                if target[row][col] == ' ' and tilemaps['Target ' + layer][row * cols + col] is None:
+                    tilemaps['Target ' + layer][row * cols + col] = tilemaps['Source ' + layer][row * cols + col]
+    # Fill the remaining empty space in the target with stamps, largest stamps first
+    # NOTE(sestren): Only empty cells can be the top-left corner of a stamp, and cells never become empty again
+    matcher = TilemapStampMatcher(source, target_rows, target_cols)
+    empty_cells = {}
+    for layer in layers:
+        empty_cells[layer] = list(
+            (row, col) for row in range(target_rows) for col in range(target_cols) if
+            tilemaps['Target ' + layer][row * cols + col] is None
+        )
+    for (stamp_height, stamp_width) in STAMP_SIZES:
+        for layer in layers:
+            source_tiles = tilemaps['Source ' + layer]
+            target_tiles = tilemaps['Target ' + layer]
+            for (target_top, target_left) in empty_cells[layer]:
+                if target_top > target_rows - stamp_height or target_left > target_cols - stamp_width:
+                    continue
+                # Confirm target location has empty space for the stamp
+                valid_target_ind = True
+                for row in range(stamp_height):
+                    row_start = (target_top + row) * cols + target_left
+                    if target_tiles[row_start:row_start + stamp_width].count(None) != stamp_width:
+                        valid_target_ind = False
+                        break
+                if not valid_target_ind:
+                    continue
+                # Stamp if a valid source location can be found
+                source_location = matcher.find(target, target_top, target_left, stamp_height, stamp_width)
+                if source_location is None:
+                    continue
+                (source_top, source_left) = source_location
+                for row in range(stamp_height):
+                    target_start = (target_top + row) * cols + target_left
+                    source_start = (source_top + row) * cols + source_left
+                    target_tiles[target_start:target_start + stamp_width] = source_tiles[source_start:source_start + stamp_width]
+            empty_cells[layer] = list(
+                (row, col) for (row, col) in empty_cells[layer] if
+                target_tiles[row * cols + col] is None
+            )
 
-def get_changes_template_file(extract, aliases):
+def get_changes_template_file(extract, aliases, room_names: dict=None):
+    if room_names is None:
+        room_names = sotn_aliases.get_room_names(aliases)
     result = {
         'Boss Teleporters': {},
         'Castle Map': [],
@@ -151,11 +340,7 @@ def get_changes_template_file(extract, aliases):
         result['Stages'][stage_id] = {}
         result['Stages'][stage_id]['Rooms'] = {}
         for (room_id, room_data) in stage_data['Rooms'].items():
-            room_name = room_id
-            for (alias_room_name, alias_room) in aliases['Rooms'].items():
-                if alias_room_name.startswith(stage_id + ', ') and alias_room['Room Index'] == int(room_id):
-                    room_name = alias_room_name
-                    break
+            room_name = room_names.get((stage_id, int(room_id)), room_id)
             relic_found_ind = False
             object_layout_h = None
             object_layout_v = None
@@ -259,14 +444,68 @@ def transformed_value(value, transformations):
             result += int(operand)
     return result
 
+def get_layout_ids_by_row(layout_extract: dict) -> dict:
+    # Map each entity layout row to the IDs of the layouts that point at it, in layout ID order
+    row_ids = {}
+    for (row_id, row_index) in enumerate(layout_extract['Row Indexes']):
+        # NOTE(sestren): When several rows start at the same index, layouts pointing there belong to the first of them
+        if row_index not in row_ids:
+            row_ids[row_index] = row_id
+    result = {}
+    for (layout_id, layout_index) in enumerate(layout_extract['Layout Indexes']):
+        row_id = row_ids[layout_index]
+        if row_id not in result:
+            result[row_id] = []
+        result[row_id].append(layout_id)
+    return result
+
+ENTITY_FIELD_NAMES = (
+    'Entity Room Index',
+    'Entity Type ID',
+    'Params',
+    'X',
+    'Y',
+)
+get_entity_record = operator.itemgetter(*ENTITY_FIELD_NAMES)
+HORIZONTAL_ENTITY_SORT_KEY = operator.itemgetter('X', 'Horizontal Sort', 'Y', 'Entity Room Index', 'Entity Type ID', 'Params')
+VERTICAL_ENTITY_SORT_KEY = operator.itemgetter('Y', 'Vertical Sort', 'X', 'Entity Room Index', 'Entity Type ID', 'Params')
+
+def get_entity_table_changes(entities: list, original_entities: list):
+    '''
+    Yield (entity offset, field name, value) for every field of an entity table that differs from the original table
+
+    Each entity is compared against the original as a single record, so only the entities that changed are compared field by field
+    '''
+    for (entity_offset, entity) in enumerate(entities):
+        record = get_entity_record(entity)
+        original_record = get_entity_record(original_entities[entity_offset])
+        if record == original_record:
+            continue
+        for (field_name, value, original_value) in zip(ENTITY_FIELD_NAMES, record, original_record):
+            if value != original_value:
+                yield (entity_offset, field_name, value)
+
+def load_common_patch(patch_name: str, data: dict) -> dict:
+    # Common patches come from the compiled library when one is loaded, otherwise each is generated in-process and compiled the first time it is needed
+    if 'Common Patch Library' not in data:
+        data['Common Patch Library'] = {
+            'Patches': {},
+        }
+    library_patches = data['Common Patch Library']['Patches']
+    if patch_name not in library_patches:
+        library_patches[patch_name] = sotn_patch_library.compile_patch(sotn_patcher.get_patch(patch_name))
+    result = library_patches[patch_name]
+    return result
+
 def assemble_patch(args, extract, main_patch, data):
     changes = main_patch.get('Changes', {})
     if 'Changes' not in main_patch:
         changes = main_patch
     aliases = data['Aliases']
     result = Patch()
+    common_extents = []
     # Apply common patches
-    for (option_name, patch_file_names) in (
+    for (option_name, patch_names) in (
         ('Assign Power of Wolf relic a unique ID', (
             'assign-power-of-wolf-relic-a-unique-id',
         )),
@@ -357,41 +596,37 @@ def assemble_patch(args, extract, main_patch, data):
     ):
         if not changes.get('Options', {}).get(option_name, False):
             continue
-        for patch_file_name in patch_file_names:
-            with open(os.path.join(os.path.normpath(args.build_dir), 'patches', patch_file_name + '.json')) as patch_file:
-                common_patch = json.load(patch_file)
-                patch_changes = common_patch.get('Changes', {})
-                # New pokes are added to the end of the poke list
-                for poke in patch_changes.get('Pokes', []):
-                    if 'Pokes' not in changes:
-                        changes['Pokes'] = []
-                    changes['Pokes'].append(poke)
-                # New tilemaps are added to the end of the tilemaps list
-                for tilemap in patch_changes.get('Tilemaps', []):
-                    if 'Tilemaps' not in changes:
-                        changes['Tilemaps'] = []
-                    changes['Tilemaps'].append(tilemap)
-                # New object layouts are added to the end of the object layouts list
-                for object_layout in patch_changes.get('Object Layouts', []):
-                    if 'Object Layouts' not in changes:
-                        changes['Object Layouts'] = []
-                    changes['Object Layouts'].append(object_layout)
-                # New entity layouts are added to the end of the object layouts list
-                for entity_layout in patch_changes.get('Entity Layouts', []):
-                    if 'Entity Layouts' not in changes:
-                        changes['Entity Layouts'] = []
-                    changes['Entity Layouts'].append(entity_layout)
-                # New familiar events are added to the end of the familiar events list
-                for familiar_event in patch_changes.get('Familiar Events', []):
-                    if 'Familiar Events' not in changes:
-                        changes['Familiar Events'] = []
-                    changes['Familiar Events'].append(familiar_event)
-                # New constants overwrite previous constants
-                for (constant_key, constant_value) in patch_changes.get('Constants', {}).items():
-                    if 'Constants' not in changes:
-                        changes['Constants'] = {}
-                    changes['Constants'][constant_key] = constant_value
-                # NOTE(sestren): For the moment, only 'Pokes', 'Tilemaps', 'Object Layouts', and 'Constants' in the patch file's changes are being handled
+        for patch_name in patch_names:
+            common_patch = load_common_patch(patch_name, data)
+            patch_changes = copy.deepcopy(common_patch['Changes'])
+            # New pokes are pre-resolved into extents, which are written after the poke list
+            common_extents.extend(common_patch['Extents'])
+            # New tilemaps are added to the end of the tilemaps list
+            for tilemap in patch_changes.get('Tilemaps', []):
+                if 'Tilemaps' not in changes:
+                    changes['Tilemaps'] = []
+                changes['Tilemaps'].append(tilemap)
+            # New object layouts are added to the end of the object layouts list
+            for object_layout in patch_changes.get('Object Layouts', []):
+                if 'Object Layouts' not in changes:
+                    changes['Object Layouts'] = []
+                changes['Object Layouts'].append(object_layout)
+            # New entity layouts are added to the end of the object layouts list
+            for entity_layout in patch_changes.get('Entity Layouts', []):
+                if 'Entity Layouts' not in changes:
+                    changes['Entity Layouts'] = []
+                changes['Entity Layouts'].append(entity_layout)
+            # New familiar events are added to the end of the familiar events list
+            for familiar_event in patch_changes.get('Familiar Events', []):
+                if 'Familiar Events' not in changes:
+                    changes['Familiar Events'] = []
+                changes['Familiar Events'].append(familiar_event)
+            # New constants overwrite previous constants
+            for (constant_key, constant_value) in patch_changes.get('Constants', {}).items():
+                if 'Constants' not in changes:
+                    changes['Constants'] = {}
+                changes['Constants'][constant_key] = constant_value
+            # NOTE(sestren): For the moment, only 'Pokes', 'Tilemaps', 'Object Layouts', and 'Constants' in the patch file's changes are being handled
     # Option - Preserve unsaved map data
     if changes.get('Options', {}).get('Preserve unsaved map data', 'None') != 'None':
         preservation_method = changes['Options']['Preserve unsaved map data']
@@ -631,101 +866,32 @@ def assemble_patch(args, extract, main_patch, data):
                 # Room: Patch tilemap foreground and background
                 if 'Tiles' in tile_layout_extract and 'Tilemap' in room_data:
                     # Fetch the source tilemap data and start with empty target tilemaps
-                    tilemaps = {
-                        'Source Background': [],
-                        'Source Foreground': [],
-                        'Target Background': [],
-                        'Target Foreground': [],
-                    }
-                    for row_data in room_extract['Tilemap Foreground']['Data']:
-                        tilemaps['Source Foreground'].append(list(map(lambda x: get_value(x), row_data.split(' '))))
-                        tilemaps['Target Foreground'].append([None] * len(tilemaps['Source Foreground'][-1]))
-                    for row_data in room_extract['Tilemap Background']['Data']:
-                        tilemaps['Source Background'].append(list(map(lambda x: get_value(x), row_data.split(' '))))
-                        tilemaps['Target Background'].append([None] * len(tilemaps['Source Background'][-1]))
+                    # NOTE(sestren): Tilemaps are flat, row-major arrays of tiles
+                    cols = room_extract['Tilemap Foreground']['Metadata']['Columns']
+                    tilemaps = {}
+                    for layer in ('Foreground', 'Background'):
+                        tilemaps['Source ' + layer] = sotn_extraction.get_tilemap_array(room_extract['Tilemap ' + layer])
+                        tilemaps['Target ' + layer] = [None] * len(tilemaps['Source ' + layer])
                     for edit in room_data['Tilemap']:
-                        layers = edit['Layer'].split(' and ')
-                        source = edit['Source']
-                        target = edit['Target']
-                        target_rows = len(target)
-                        target_cols = len(target[0])
-                        # Copy source data to target directly if a space in the target is specified
-                        # If target already has source data copied to it, preserve that data
-                        for layer in layers:
-                            for row in range(target_rows):
-                                for col in range(target_cols):
-                                    if target[row][col] == ' ' and tilemaps['Target ' + layer][row][col] is None:
-                                        tilemaps['Target ' + layer][row][col] = tilemaps['Source ' + layer][row][col]
-                        for (stamp_height, stamp_width) in (
-                            (5, 5), (5, 4), (4, 5), (4, 4), (5, 3), (3, 5),
-                            (4, 3), (3, 4), (5, 2), (2, 5), (3, 3), (4, 2),
-                            (2, 4), (3, 2), (2, 3), (5, 1), (1, 5), (2, 2),
-                            (3, 1), (1, 3), (2, 1), (1, 2), (1, 1),
-                        ):
-                            # Find valid target locations for the stamp
-                            for layer in layers:
-                                for target_top in range(target_rows - (stamp_height - 1)):
-                                    for target_left in range(target_cols - (stamp_width - 1)):
-                                        # Confirm target location has empty space for the stamp
-                                        valid_target_ind = True
-                                        for row in range(stamp_height):
-                                            if not valid_target_ind:
-                                                break
-                                            for col in range(stamp_width):
-                                                if not valid_target_ind:
-                                                    break
-                                                if tilemaps['Target ' + layer][target_top + row][target_left + col] is not None:
-                                                    valid_target_ind = False
-                                                    break
-                                        if not valid_target_ind:
-                                            continue
-                                        # Stamp if a valid source location can be found
-                                        valid_source_ind = False
-                                        for source_top in range(target_rows - (stamp_height - 1)):
-                                            if valid_source_ind:
-                                                break
-                                            for source_left in range(target_cols - (stamp_width - 1)):
-                                                # Find first source location that matches the target location for the stamp
-                                                valid_source_ind = True
-                                                for row in range(stamp_height):
-                                                    if not valid_source_ind:
-                                                        break
-                                                    for col in range(stamp_width):
-                                                        source_value = source[source_top + row][source_left + col]
-                                                        target_value = target[target_top + row][target_left + col]
-                                                        if source_value != target_value:
-                                                            valid_source_ind = False
-                                                            break
-                                                if not valid_source_ind:
-                                                    continue
-                                                # Apply the stamp
-                                                for row in range(stamp_height):
-                                                    for col in range(stamp_width):
-                                                        assert tilemaps['Target ' + layer][target_top + row][target_left + col] is None
-                                                        value = tilemaps['Source ' + layer][source_top + row][source_left + col]
-                                                        tilemaps['Target ' + layer][target_top + row][target_left + col] = value
-                                                break
+                        stamp_tilemap_edit(edit, tilemaps, cols)
                         for layer in edit['Layer'].split(' and '):
-                            extract_data = room_extract['Tilemap ' + layer]['Data']
+                            extract_data = tilemaps['Source ' + layer]
                             extract_metadata = room_extract['Tilemap ' + layer]['Metadata']
-                            offset = 0
-                            for (tile_row, tiles) in enumerate(tilemaps['Target ' + layer]):
-                                extract_row_data = list(map(lambda x: get_value(x), extract_data[tile_row].split(' ')))
-                                for (tile_col, tile) in enumerate(tiles):
-                                    extract_value = extract_row_data[tile_col]
-                                    if tile == extract_value:
-                                        offset += 2
-                                        continue
-                                    result.patch_value(tile, 'u16', extract_metadata['Start'] + offset)
-                                    offset += 2
+                            for (tile_index, tile) in enumerate(tilemaps['Target ' + layer]):
+                                if tile == extract_data[tile_index]:
+                                    continue
+                                result.patch_value(tile, 'u16', extract_metadata['Start'] + 2 * tile_index)
     # Patch tilemaps (newer method)
     for tilemap_changes in changes.get('Tilemaps', {}):
         assert tilemap_changes['Type'] == 'Tile ID-Based'
         extract_id = getID(aliases, ('Rooms', tilemap_changes['Room'], 'Room Index'))
         room_extract = extract['Stages'][tilemap_changes['Stage']]['Rooms'][str(extract_id)]
         extract_metadata = room_extract['Tilemap ' + tilemap_changes['Layer']]['Metadata']
-        for (row_offset, row_data) in enumerate(tilemap_changes['Tiles']):
-            tile_data = list(map(lambda x: get_value(x), row_data.split(' ')))
+        # NOTE(sestren): Tilemaps from common patches arrive with their rows already parsed into tile IDs
+        tile_ids = tilemap_changes.get('Tile IDs')
+        if tile_ids is None:
+            tile_ids = sotn_patch_library.get_tile_ids(tilemap_changes['Tiles'])
+        for (row_offset, tile_data) in enumerate(tile_ids):
             for (col_offset, tile) in enumerate(tile_data):
                 if tile is None:
                     continue
@@ -817,6 +983,7 @@ def assemble_patch(args, extract, main_patch, data):
         result.patch_value(0xFF, 'u8', extract_metadata['Start'] + offset)
         assert offset <= extract_metadata['Footprint']
     # Patch object layouts
+    # NOTE(sestren): Only the changed properties of each object layout are recorded, over the extracted object layouts
     object_layouts = {}
     for object_layout in changes.get('Object Layouts', {}):
         stage_name = object_layout['Stage']
@@ -824,17 +991,14 @@ def assemble_patch(args, extract, main_patch, data):
         if (stage_name, room_name) not in object_layouts:
             room_id = str(aliases['Rooms'].get(room_name, {}).get('Room Index', None))
             room_extract = extract['Stages'][stage_name]['Rooms'][room_id]
-            object_extract = room_extract['Object Layout - Horizontal']['Data'][1:-1]
-            object_layouts[(stage_name, room_name)] = copy.deepcopy(object_extract)
-        object_layout_id = object_layout['Object Layout ID']
-        for (property_key, property_value) in object_layout.get('Properties', {}).items():
-            object_layouts[(stage_name, room_name)][object_layout_id][property_key] = property_value
+            object_layouts[(stage_name, room_name)] = EntityLayoutOverlay([room_extract['Object Layout - Horizontal']['Data'][1:-1]])
+        object_layouts[(stage_name, room_name)].update_entity(0, object_layout['Object Layout ID'], object_layout.get('Properties', {}))
     # Color Palettes
     for (palette_index, rgba32) in enumerate(changes.get('Castle Map Color Palette', [])):
-        red = get_value(rgba32[1:3]) // 8
-        green = get_value(rgba32[3:5]) // 8
-        blue = get_value(rgba32[5:7]) // 8
-        alpha = get_value(rgba32[7:9]) // 128
+        red = sotn_address.get_value(rgba32[1:3]) // 8
+        green = sotn_address.get_value(rgba32[3:5]) // 8
+        blue = sotn_address.get_value(rgba32[5:7]) // 8
+        alpha = sotn_address.get_value(rgba32[7:9]) // 128
         value = (alpha << 15) + (blue << 10) + (green << 5) + red
         for overlay_name in (
             'DRA',
@@ -963,7 +1127,7 @@ def assemble_patch(args, extract, main_patch, data):
     for change in changes.get('Entity Layouts', []):
         stage_name = change['Stage']
         if stage_name not in entity_layouts:
-            entity_layouts[stage_name] = copy.deepcopy(extract['Entity Layouts'][stage_name]['Data'])
+            entity_layouts[stage_name] = EntityLayoutOverlay(extract['Entity Layouts'][stage_name]['Data'])
         target_entity = {}
         for (key, value) in change.get('Properties', {}).items():
             target_entity[key] = value
@@ -971,7 +1135,7 @@ def assemble_patch(args, extract, main_patch, data):
             source_room_name = change['Delete From']['Room']
             entity_layout_row = aliases['Rooms'][source_room_name]['Entity Layout Row']
             entity_layout_id = change['Delete From']['Entity Layout ID']
-            for (key, value) in entity_layouts[stage_name][entity_layout_row][entity_layout_id].items():
+            for (key, value) in entity_layouts[stage_name].get_entity(entity_layout_row, entity_layout_id).items():
                 if key not in target_entity:
                     target_entity[key] = value
             if (stage_name, entity_layout_row) not in deletes:
@@ -981,12 +1145,11 @@ def assemble_patch(args, extract, main_patch, data):
             target_room_name = change['Update']['Room']
             entity_layout_row = aliases['Rooms'][target_room_name]['Entity Layout Row']
             entity_layout_id = change['Update']['Entity Layout ID']
-            for (property_key, property_value) in target_entity.items():
-                entity_layouts[stage_name][entity_layout_row][entity_layout_id][property_key] = property_value
+            entity_layouts[stage_name].update_entity(entity_layout_row, entity_layout_id, target_entity)
         elif 'Add To' in change:
             target_room_name = change['Add To']['Room']
             entity_layout_row = aliases['Rooms'][target_room_name]['Entity Layout Row']
-            entity_layouts[stage_name][entity_layout_row].append(target_entity)
+            entity_layouts[stage_name].add_entity(entity_layout_row, target_entity)
         elif 'Add Relative To' in change:
             source_room_name = change['Add Relative To']['Room']
             source_node_name = change['Add Relative To']['Node']
@@ -997,11 +1160,11 @@ def assemble_patch(args, extract, main_patch, data):
             target_entity['Y'] = target_room.get('Y', 0) + change['Add Relative To'].get('Y Offset', 0)
             if 'Entity Room Index' in change['Add Relative To']:
                 target_entity['Entity Room Index'] = change['Add Relative To']['Entity Room Index']
-            entity_layouts[stage_name][entity_layout_row].append(target_entity)
+            entity_layouts[stage_name].add_entity(entity_layout_row, target_entity)
     # Entity Layouts - Perform deletes
     for (stage_name, entity_layout_row) in deletes:
         for entity_layout_id in reversed(sorted(deletes[(stage_name, entity_layout_row)])):
-            entity_layouts[stage_name][entity_layout_row].pop(entity_layout_id)
+            entity_layouts[stage_name].delete_entity(entity_layout_row, entity_layout_id)
     sentinel_start_template = {
         'Entity Room Index': 0,
         'Entity Type ID': 0,
@@ -1017,21 +1180,22 @@ def assemble_patch(args, extract, main_patch, data):
         'Y': -1,
     }
     # Entity Layouts - Resort horizontally and vertically, then patch
-    for (stage_name, entity_layout_table) in entity_layouts.items():
+    for (stage_name, entity_layout_overlay) in entity_layouts.items():
         stage_extract = extract['Entity Layouts'][stage_name]
         layout_extract = extract['Constants']['Entity Layout'][stage_name]
         horizontal_layout_start = layout_extract['Horizontal Layout']['Start']
         horizontal_layout_value = layout_extract['Horizontal Layout']['Value']
         vertical_layout_start = layout_extract['Vertical Layout']['Start']
         vertical_layout_value = layout_extract['Vertical Layout']['Value']
-        # NOTE(sestren): entity_row is the "row" of the entity layout table, entity_col is the "column" within that row
+        # NOTE(sestren): entity_row is the "row" of the entity layout table, entity_offset is the position of an entity in the flattened table
         entity_offset = 0
         entity_size = stage_extract['Metadata']['Size']
-        for (entity_row, entity_layout_row) in enumerate(entity_layout_table):
+        layout_ids_by_row = get_layout_ids_by_row(layout_extract)
+        horizontal_entities = []
+        vertical_entities = []
+        for (entity_row, entity_layout_row) in enumerate(entity_layout_overlay.get_rows()):
             # Adjust addresses pointing to start of row
-            for (layout_id, layout_index) in enumerate(layout_extract['Layout Indexes']):
-                if layout_extract['Row Indexes'].index(layout_index) != entity_row:
-                    continue
+            for layout_id in layout_ids_by_row.get(entity_row, []):
                 if layout_extract['Row Indexes'][entity_row] != entity_offset:
                     result.patch_value(horizontal_layout_value + 10 * entity_offset, 'u32', horizontal_layout_start + 4 * layout_id)
                     result.patch_value(vertical_layout_value + 10 * entity_offset, 'u32', vertical_layout_start + 4 * layout_id)
@@ -1039,35 +1203,24 @@ def assemble_patch(args, extract, main_patch, data):
             sentinel_start['Params'] = stage_extract['Metadata']['Row Params'][entity_row]
             sentinel_end = dict(sentinel_end_template)
             # Sort both horizontal and vertical layouts, bookending them with sentinel values
-            horizontal_entity_layout_row = [sentinel_start] + list(sorted(entity_layout_row,
-                key=lambda x: (x['X'], x['Horizontal Sort'], x['Y'], x['Entity Room Index'], x['Entity Type ID'], x['Params'])
-            )) + [sentinel_end]
-            vertical_entity_layout_row = [sentinel_start] + list(sorted(entity_layout_row,
-                key=lambda y: (y['Y'], y['Vertical Sort'], y['X'], y['Entity Room Index'], y['Entity Type ID'], y['Params'])
-            )) + [sentinel_end]
-            assert len(horizontal_entity_layout_row) == len(vertical_entity_layout_row)
-            # Adjust the entity layouts for the entire row
-            for entity_col in range(len(horizontal_entity_layout_row)):
-                for field_name in (
-                    'Entity Room Index',
-                    'Entity Type ID',
-                    'Params',
-                    'X',
-                    'Y',
-                ):
-                    if horizontal_entity_layout_row[entity_col][field_name] != stage_extract['Flattened Horizontal Data'][entity_offset][field_name]:
-                        result.patch_value(
-                            horizontal_entity_layout_row[entity_col][field_name],
-                            stage_extract['Metadata']['Fields'][field_name]['Type'],
-                            layout_extract['Horizontal Table Start'] + entity_offset * entity_size + stage_extract['Metadata']['Fields'][field_name]['Offset'],
-                        )
-                    if vertical_entity_layout_row[entity_col][field_name] != stage_extract['Flattened Vertical Data'][entity_offset][field_name]:
-                        result.patch_value(
-                            vertical_entity_layout_row[entity_col][field_name],
-                            stage_extract['Metadata']['Fields'][field_name]['Type'],
-                            layout_extract['Vertical Table Start'] + entity_offset * entity_size + stage_extract['Metadata']['Fields'][field_name]['Offset'],
-                        )
-                entity_offset += 1
+            horizontal_entities.append(sentinel_start)
+            horizontal_entities.extend(sorted(entity_layout_row, key=HORIZONTAL_ENTITY_SORT_KEY))
+            horizontal_entities.append(sentinel_end)
+            vertical_entities.append(sentinel_start)
+            vertical_entities.extend(sorted(entity_layout_row, key=VERTICAL_ENTITY_SORT_KEY))
+            vertical_entities.append(sentinel_end)
+            entity_offset = len(horizontal_entities)
+        # Adjust the entity layouts for the entire stage
+        for (entities, original_entities, table_start) in (
+            (horizontal_entities, stage_extract['Flattened Horizontal Data'], layout_extract['Horizontal Table Start']),
+            (vertical_entities, stage_extract['Flattened Vertical Data'], layout_extract['Vertical Table Start']),
+        ):
+            for (entity_offset, field_name, value) in get_entity_table_changes(entities, original_entities):
+                result.patch_value(
+                    value,
+                    stage_extract['Metadata']['Fields'][field_name]['Type'],
+                    table_start + entity_offset * entity_size + stage_extract['Metadata']['Fields'][field_name]['Offset'],
+                )
     # Familiar events
     for familiar_event in changes.get('Familiar Events', {}):
         # NOTE(sestren): Familiar events exist as a complete copy in 7 different locations, one for each familiar in the code
@@ -1124,7 +1277,7 @@ def assemble_patch(args, extract, main_patch, data):
                     property_name = data_element['Value Relative From']['Property']
                     value = target_room[property_name]
                 else:
-                    value = get_value(data_element['Value'])
+                    value = sotn_address.get_value(data_element['Value'])
                 result.patch_value(
                     value,
                     array_extract_meta['Type'],
@@ -1181,7 +1334,9 @@ def assemble_patch(args, extract, main_patch, data):
             raise Exception('Unhandled case when processing changes in Constants')
     # Patch pokes or direct writes
     for poke in changes.get('Pokes', []):
-        result.patch_value(get_value(poke['Value']), poke['Data Type'], get_value(poke['Gamedata Address']))
+        result.patch_value(sotn_address.get_value(poke['Value']), poke['Data Type'], sotn_address.get_value(poke['Gamedata Address']))
+    for (game_address, extent_data) in common_extents:
+        result.write_bytes(game_address, extent_data)
     # Patch base drop rates
     for current_change in changes.get('Base Drop Rates', []):
         stage_names = []
@@ -1199,23 +1354,159 @@ def assemble_patch(args, extract, main_patch, data):
     # TODO(sestren): Instead of checksums for tests, output the address writes for comparison
     return result
 
-# Intended for hex-strings or integers
-def get_value(value: (str | int)) -> int:
-    result = None
-    if type(value) == int:
-        result = value
-    elif type(value) == str:
-        # All dots indicates an intentional NULL value
-        if value == '.' * len(value):
-            return None
-        result = int(value, 16)
-    assert result is not None
+def get_batch_jobs(args) -> list:
+    # Pairs of (changes file, output PPF file), from either a JSONL manifest or a list of changes files and globs
+    result = []
+    if args.manifest is not None:
+        with open(args.manifest) as manifest_file:
+            for line in manifest_file:
+                if len(line.strip()) < 1:
+                    continue
+                job = json.loads(line)
+                ppf_dir = os.path.dirname(job['PPF'])
+                if len(ppf_dir) > 0:
+                    os.makedirs(ppf_dir, exist_ok=True)
+                result.append((job['Changes'], job['PPF']))
+    for pattern in (args.batch or []):
+        changes_file_paths = sorted(glob.glob(pattern))
+        if len(changes_file_paths) < 1:
+            raise FileNotFoundError('No changes files match: ' + pattern)
+        for changes_file_path in changes_file_paths:
+            ppf_file_name = os.path.splitext(os.path.basename(changes_file_path))[0] + '.ppf'
+            result.append((changes_file_path, os.path.join(os.path.normpath(args.ppf_dir), ppf_file_name)))
+    return result
+
+def assemble_changes_file(args, extract, data, changes_file_path: str) -> Patch:
+    with open(changes_file_path) as changes_file:
+        patch = json.load(changes_file)
+    validate_patch(patch)
+    result = assemble_patch(args, extract, patch, data)
     return result
 
+def write_ppf_file(args, extract, data, changes_file_path: str, ppf_file_path: str, description: str):
+    # The patch is assembled before the PPF file is opened, so a failed job doesn't leave an empty PPF file behind
+    ppf = PPF(description, assemble_changes_file(args, extract, data, changes_file_path), False, args.long_records)
+    with open(ppf_file_path, 'wb') as ppf_file:
+        ppf.write(ppf_file)
+
+def load_extract(args):
+    # Read the game data straight from the BIN when one is given, extracting only what the changes need
+    if getattr(args, 'bin', None) is not None:
+        result = sotn_extractor.GameData(open(args.bin, 'br'))
+        return result
+    result = sotn_extraction.load_extraction(args.build_dir)
+    if 'Extract' in result:
+        result = result['Extract']
+    return result
+
+def close_extract(extract):
+    # The extraction cache and the game data of a BIN each own an open file handle
+    if hasattr(extract, 'close'):
+        extract.close()
+
+# Per-process state of a PPF worker, set up once by init_ppf_worker
+ppf_worker = {}
+
+def init_ppf_worker(args, extract, data: dict, description: str):
+    # Workers open the extraction cache or BIN through their own file handle, as forked workers would otherwise share one file offset
+    if extract is None:
+        extract = load_extract(args)
+    ppf_worker['Args'] = args
+    ppf_worker['Extract'] = extract
+    ppf_worker['Data'] = data
+    ppf_worker['Description'] = description
+
+def run_ppf_job(changes_file_path: str, ppf_file_path: str) -> str:
+    write_ppf_file(
+        ppf_worker['Args'],
+        ppf_worker['Extract'],
+        ppf_worker['Data'],
+        changes_file_path,
+        ppf_file_path,
+        ppf_worker['Description'],
+    )
+    return ppf_file_path
+
+def run_batch(args, extract, data: dict, batch_jobs: list, description: str, worker_count: int=1) -> list:
+    '''
+    Write one PPF file per (changes file, PPF file) job, in parallel when worker_count is greater than 1
+
+    A failed job does not stop the rest of the batch; the failures are returned in job order as
+    (changes file, error) pairs
+    '''
+    result = []
+    if worker_count <= 1:
+        init_ppf_worker(args, extract, data, description)
+        for (changes_file_path, ppf_file_path) in batch_jobs:
+            try:
+                run_ppf_job(changes_file_path, ppf_file_path)
+            except Exception as error:
+                result.append((changes_file_path, error))
+        return result
+    shared_extract = extract if isinstance(extract, dict) else None
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=worker_count,
+        initializer=init_ppf_worker,
+        initargs=(args, shared_extract, data, description),
+    ) as executor:
+        futures = list(
+            executor.submit(run_ppf_job, changes_file_path, ppf_file_path) for
+            (changes_file_path, ppf_file_path) in batch_jobs
+        )
+        for ((changes_file_path, _), future) in zip(batch_jobs, futures):
+            try:
+                future.result()
+            except Exception as error:
+                result.append((changes_file_path, error))
+    return result
+
+def serve(args, extract, data: dict, description: str, host: str, port: int):
+    '''
+    Serve PPF files over HTTP, keeping the extraction, aliases and common patches loaded between requests
+
+    POST a changes JSON file as the request body to get the PPF file back in the response body.
+    Requests are handled one at a time, since the extraction cache shares a single file handle
+    '''
+    class PatchRequestHandler(http.server.BaseHTTPRequestHandler):
+        def do_POST(self):
+            try:
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                patch = json.loads(body)
+                validate_patch(patch)
+            except (ValueError, AssertionError, AttributeError) as error:
+                self.send_text(400, 'Invalid changes: ' + repr(error))
+                return
+            try:
+                ppf_bytes = PPF(description, assemble_patch(args, extract, patch, data), False, args.long_records).bytes
+            except Exception as error:
+                self.send_text(500, 'Failed to build PPF: ' + repr(error))
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/octet-stream')
+            self.send_header('Content-Length', str(len(ppf_bytes)))
+            self.end_headers()
+            self.wfile.write(ppf_bytes)
+        
+        def send_text(self, status: int, text: str):
+            text_bytes = text.encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'text/plain; charset=utf-8')
+            self.send_header('Content-Length', str(len(text_bytes)))
+            self.end_headers()
+            self.wfile.write(text_bytes)
+    
+    with http.server.HTTPServer((host, port), PatchRequestHandler) as server:
+        print('Serving PPF files on', host + ':' + str(port))
+        server.serve_forever()
+
 if __name__ == '__main__':
     '''
     Usage
     python sotn_ppf.py EXTRACTION_JSON --build_dir=BUILD_DIR --data=DATA_DIR --changes=CHANGES_JSON --ppf=OUTPUT_PPF
+    python sotn_ppf.py BUILD_DIR --data=DATA_DIR --batch CHANGES_JSON_OR_GLOB [...] --ppf_dir=OUTPUT_PPF_DIR
+    python sotn_ppf.py BUILD_DIR --data=DATA_DIR --manifest=MANIFEST_JSONL --workers=WORKER_COUNT
+    python sotn_ppf.py BUILD_DIR --data=DATA_DIR --serve=PORT --host=HOST
+    python sotn_ppf.py BUILD_DIR --data=DATA_DIR --changes=CHANGES_JSON --bin=INPUT_BIN --apply=OUTPUT_BIN
     '''
     DESCRIPTION = 'Designed to work with SOTN Shuffler'
     parser = argparse.ArgumentParser()
@@ -1224,29 +1515,54 @@ if __name__ == '__main__':
     parser.add_argument('--data', help='Input an optional (required if changes argument is given) filepath to a folder containing various data dependency files', type=str)
     parser.add_argument('--changes', help='Input an optional (required if data argument is given) filepath to the changes JSON file', type=str)
     parser.add_argument('--ppf', help='Input an optional filepath to the output PPF file', type=str)
+    parser.add_argument('--batch', help='Input an optional list of filepaths or glob patterns of changes JSON files, each of which will be output as a PPF file in the ppf_dir folder', type=str, nargs='+')
+    parser.add_argument('--ppf_dir', help='Input an optional filepath to the folder that will contain the output PPF files of a batch', type=str)
+    parser.add_argument('--manifest', help='Input an optional filepath to a JSONL file, where each line is an object with the "Changes" and "PPF" filepaths of one PPF file to output', type=str)
+    parser.add_argument('--workers', help='Input an optional number of processes to use for a batch (default: 1)', type=int, default=1)
+    parser.add_argument('--bin', help='Input an optional filepath to a BIN file to read game data from directly, instead of from the extraction in the build folder', type=str)
+    parser.add_argument('--apply', help='Input an optional filepath to write a patched copy of the BIN given by the bin argument to (the BIN is patched in place if both are the same file)', type=str)
+    parser.add_argument('--long_records', help='Input an optional flag to pack up to 255 contiguous bytes into each PPF record, instead of splitting records at every 0x80-byte partition of the disc', action='store_true')
+    parser.add_argument('--serve', help='Input an optional port number to serve PPF files on over HTTP, instead of writing them to files', type=int)
+    parser.add_argument('--host', help='Input an optional host name or address to serve PPF files on (default: 127.0.0.1)', type=str, default='127.0.0.1')
     args = parser.parse_args()
-    with open(os.path.join(os.path.normpath(args.build_dir), 'extraction.json')) as extract_file:
-        extract = json.load(extract_file)
-        if 'Extract' in extract:
-            extract = extract['Extract']
-        if args.changes is None:
-            with (
-                open(os.path.join(os.path.normpath(args.build_dir), 'vanilla-changes.json'), 'w') as changes_file,
-                open(os.path.join(os.path.normpath(args.data), 'aliases.yaml')) as aliases_file,
-            ):
-                aliases = yaml.safe_load(aliases_file)
-                changes = get_changes_template_file(extract, aliases)
+    if args.apply is not None and args.bin is None:
+        parser.error('the --apply argument requires the --bin argument')
+    if args.apply is not None and args.changes is None:
+        parser.error('the --apply argument requires the --changes argument')
+    if args.batch is not None and args.ppf_dir is None:
+        args.ppf_dir = os.path.join(os.path.normpath(args.build_dir), 'ppf')
+    if args.batch is not None:
+        os.makedirs(args.ppf_dir, exist_ok=True)
+    extract = load_extract(args)
+    disc_writes = None
+    failures = []
+    try:
+        if args.changes is None and args.batch is None and args.manifest is None and args.serve is None:
+            with open(os.path.join(os.path.normpath(args.build_dir), 'vanilla-changes.json'), 'w') as changes_file:
+                compiled_aliases = sotn_aliases.load_compiled_aliases(args.data, args.build_dir)
+                changes = get_changes_template_file(extract, compiled_aliases['Aliases'], compiled_aliases['Room Names'])
                 json.dump(changes, changes_file, indent='    ', sort_keys=True)
         else:
-            with (
-                open(os.path.join(os.path.normpath(args.data), 'aliases.yaml')) as aliases_file,
-                open(args.changes) as changes_file,
-                open(args.ppf, 'wb') as ppf_file,
-            ):
-                data = {
-                    'Aliases': yaml.safe_load(aliases_file),
-                }
-                patch = json.load(changes_file)
-                validate_patch(patch)
-                ppf = PPF(DESCRIPTION, assemble_patch(args, extract, patch, data), False)
-                ppf_file.write(ppf.bytes)
+            data = {
+                'Aliases': sotn_aliases.load_aliases(args.data, args.build_dir),
+                'Common Patch Library': sotn_patch_library.load_library(args.build_dir),
+            }
+            if args.serve is not None:
+                serve(args, extract, data, DESCRIPTION, args.host, args.serve)
+            if args.changes is not None:
+                patch = assemble_changes_file(args, extract, data, args.changes)
+                if args.ppf is not None:
+                    with open(args.ppf, 'wb') as ppf_file:
+                        PPF(DESCRIPTION, patch, False, args.long_records).write(ppf_file)
+                if args.apply is not None:
+                    disc_writes = list(patch.get_disc_writes(sotn_address.Address.SECTOR_DATA_SIZE))
+            failures = run_batch(args, extract, data, get_batch_jobs(args), DESCRIPTION, args.workers)
+    finally:
+        close_extract(extract)
+    # NOTE(sestren): The BIN is only patched once nothing is reading game data from it anymore, as it may be patched in place
+    if disc_writes is not None:
+        sotn_disc.apply_to_bin(args.bin, args.apply, disc_writes)
+    for (changes_file_path, error) in failures:
+        print('Failed to build PPF for', changes_file_path + ':', repr(error), file=sys.stderr)
+    if len(failures) > 0:
+        sys.exit(1)
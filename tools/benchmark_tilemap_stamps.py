@@ -0,0 +1,108 @@
+import argparse
+import array
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+import sotn_ppf
+
+def stamp_tilemap_edit_reference(edit: dict, tilemaps: dict, cols: int):
+    # Cell-by-cell scan of every source location, as assemble_patch originally did it
+    layers = edit['Layer'].split(' and ')
+    source = edit['Source']
+    target = edit['Target']
+    target_rows = len(target)
+    target_cols = len(target[0])
+    for layer in layers:
+        for row in range(target_rows):
+            for col in range(target_cols):
+                if target[row][col] == ' ' and tilemaps['Target ' + layer][row * cols + col] is None:
+                    tilemaps['Target ' + layer][row * cols + col] = tilemaps['Source ' + layer][row * cols + col]
+    for (stamp_height, stamp_width) in sotn_ppf.STAMP_SIZES:
+        for layer in layers:
+            for target_top in range(target_rows - (stamp_height - 1)):
+                for target_left in range(target_cols - (stamp_width - 1)):
+                    valid_target_ind = True
+                    for row in range(stamp_height):
+                        if not valid_target_ind:
+                            break
+                        for col in range(stamp_width):
+                            if tilemaps['Target ' + layer][(target_top + row) * cols + target_left + col] is not None:
+                                valid_target_ind = False
+                                break
+                    if not valid_target_ind:
+                        continue
+                    valid_source_ind = False
+                    for source_top in range(target_rows - (stamp_height - 1)):
+                        if valid_source_ind:
+                            break
+                        for source_left in range(target_cols - (stamp_width - 1)):
+                            valid_source_ind = True
+                            for row in range(stamp_height):
+                                if not valid_source_ind:
+                                    break
+                                for col in range(stamp_width):
+                                    if source[source_top + row][source_left + col] != target[target_top + row][target_left + col]:
+                                        valid_source_ind = False
+                                        break
+                            if not valid_source_ind:
+                                continue
+                            for row in range(stamp_height):
+                                for col in range(stamp_width):
+                                    value = tilemaps['Source ' + layer][(source_top + row) * cols + source_left + col]
+                                    tilemaps['Target ' + layer][(target_top + row) * cols + target_left + col] = value
+                            break
+
+def stamp_room(stamp_function, edits: list, rows: int, cols: int) -> dict:
+    tilemaps = {}
+    for (plane_id, layer) in enumerate(('Foreground', 'Background')):
+        # NOTE(sestren): Every source tile gets a distinct value so that any difference in stamp placement is detected
+        tilemaps['Source ' + layer] = array.array('H', ((plane_id * rows * cols + index) % 0x10000 for index in range(rows * cols)))
+        tilemaps['Target ' + layer] = [None] * (rows * cols)
+    for edit in edits:
+        stamp_function(edit, tilemaps, cols)
+    return tilemaps
+
+if __name__ == '__main__':
+    '''
+    Compare the tilemap stamp matcher in sotn_ppf against a cell-by-cell scan
+
+    Usage
+    python tools/benchmark_tilemap_stamps.py --changes=tests/sample-randomized-map.json
+    '''
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--changes', help='Input a filepath to a changes JSON file with room Tilemap edits', type=str, default=os.path.join('tests', 'sample-randomized-map.json'))
+    parser.add_argument('--repeat', help='Input the number of times to stamp each room', type=int, default=3)
+    args = parser.parse_args()
+    with open(args.changes) as changes_file:
+        changes = json.load(changes_file)
+        if 'Changes' in changes:
+            changes = changes['Changes']
+    timings = {
+        'Reference': 0.0,
+        'Matcher': 0.0,
+    }
+    room_count = 0
+    for (stage_name, stage_data) in sorted(changes.get('Stages', {}).items()):
+        for (room_name, room_data) in sorted(stage_data.get('Rooms', {}).items()):
+            if 'Tilemap' not in room_data:
+                continue
+            room_count += 1
+            edits = room_data['Tilemap']
+            rows = 16 * ((max(len(edit['Target']) for edit in edits) + 15) // 16)
+            cols = 16 * ((max(len(edit['Target'][0]) for edit in edits) + 15) // 16)
+            results = {}
+            for (timing_name, stamp_function) in (
+                ('Reference', stamp_tilemap_edit_reference),
+                ('Matcher', sotn_ppf.stamp_tilemap_edit),
+            ):
+                start_time = time.perf_counter()
+                for _ in range(args.repeat):
+                    results[timing_name] = stamp_room(stamp_function, edits, rows, cols)
+                timings[timing_name] += time.perf_counter() - start_time
+            assert results['Reference'] == results['Matcher'], room_name
+    print('Rooms:', room_count)
+    for (timing_name, timing) in timings.items():
+        print(timing_name + ':', '{:.3f}s'.format(timing / args.repeat))
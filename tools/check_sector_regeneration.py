@@ -0,0 +1,52 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+import sotn_address
+import sotn_disc
+
+SYNC_PATTERN = b'\x00' + 10 * b'\xFF' + b'\x00'
+
+def is_mode_2_form_1(sector: bytes) -> bool:
+    result = (
+        sector[:len(SYNC_PATTERN)] == SYNC_PATTERN and
+        sector[0x0F] == 2 and
+        (sector[sotn_disc.SUBMODE_OFFSET] & sotn_disc.FORM_2_SUBMODE_MASK) == 0
+    )
+    return result
+
+if __name__ == '__main__':
+    '''
+    Check that regenerating the EDC and ECC of every Mode 2 Form 1 sector of an unmodified BIN leaves it unchanged
+
+    Usage
+    python tools/check_sector_regeneration.py BIN [--stride=N]
+    '''
+    parser = argparse.ArgumentParser()
+    parser.add_argument('binary_filepath', help='Input a filepath to an unmodified BIN file', type=str)
+    parser.add_argument('--stride', help='Input an optional interval between checked sectors, to sample large BIN files (default: 1)', type=int, default=1)
+    args = parser.parse_args()
+    SEC = sotn_address.Address.SECTOR_SIZE
+    counts = {
+        'Checked': 0,
+        'Skipped': 0,
+    }
+    start_time = time.perf_counter()
+    with open(args.binary_filepath, 'br') as binary_file:
+        sector_count = os.fstat(binary_file.fileno()).st_size // SEC
+        for sector_id in range(0, sector_count, args.stride):
+            binary_file.seek(sector_id * SEC)
+            original_sector = binary_file.read(SEC)
+            if not is_mode_2_form_1(original_sector):
+                counts['Skipped'] += 1
+                continue
+            sector = bytearray(original_sector)
+            sotn_disc.regenerate_sector(sector)
+            assert sector == original_sector, (sector_id, sotn_address._hex(sector_id * SEC, 8))
+            counts['Checked'] += 1
+    print('Sectors:', sector_count)
+    for (count_name, count) in counts.items():
+        print(count_name + ':', count)
+    print('Time:', '{:.3f}s'.format(time.perf_counter() - start_time))
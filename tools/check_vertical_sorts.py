@@ -0,0 +1,81 @@
+import argparse
+import copy
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+import sotn_extraction
+import sotn_extractor
+
+def update_vertical_sorts_reference(stage_entity_layout: dict):
+    # Field-by-field scan of every remaining vertical entry, as the extractor originally did it
+    search_indexes = set(range(len(stage_entity_layout['Flattened Vertical Data'])))
+    for (row_id, row_data) in enumerate(stage_entity_layout['Data']):
+        for (col_id, entity_data) in enumerate(row_data):
+            matching_index = None
+            for search_index in search_indexes:
+                for property in (
+                    'X',
+                    'Y',
+                    'Entity Type ID',
+                    'Entity Room Index',
+                    'Params',
+                ):
+                    if stage_entity_layout['Flattened Vertical Data'][search_index][property] != entity_data[property]:
+                        break
+                else:
+                    matching_index = search_index
+                    break
+            if matching_index is not None:
+                entity_data['Vertical Sort'] = stage_entity_layout['Flattened Vertical Data'][search_index]['Sort']
+                search_indexes.remove(matching_index)
+
+# The sort the extractor leaves on entities with no matching entry in the vertical data
+UNMATCHED_VERTICAL_SORT = -1
+
+def get_vertical_sorts(stage_entity_layout: dict) -> dict:
+    # Only entities that were assigned a sort are compared, keyed by their (row, column) position
+    result = {}
+    for (row_id, row_data) in enumerate(stage_entity_layout['Data']):
+        for (col_id, entity_data) in enumerate(row_data):
+            vertical_sort = entity_data.get('Vertical Sort', UNMATCHED_VERTICAL_SORT)
+            if vertical_sort is not None and vertical_sort != UNMATCHED_VERTICAL_SORT:
+                result[(row_id, col_id)] = vertical_sort
+    return result
+
+if __name__ == '__main__':
+    '''
+    Check that the vertical sorts computed by sotn_extractor match the original scan for every stage
+
+    Usage
+    python tools/check_vertical_sorts.py BUILD_DIR
+    '''
+    parser = argparse.ArgumentParser()
+    parser.add_argument('build_dir', help='Input a filepath to the folder containing the extraction', type=str)
+    args = parser.parse_args()
+    extract = sotn_extraction.load_extraction(args.build_dir)
+    if 'Extract' in extract:
+        extract = extract['Extract']
+    timings = {
+        'Reference': 0.0,
+        'Indexed': 0.0,
+    }
+    for stage_name in sorted(extract['Entity Layouts']):
+        expected_sorts = get_vertical_sorts(extract['Entity Layouts'][stage_name])
+        for (timing_name, update_function) in (
+            ('Reference', update_vertical_sorts_reference),
+            ('Indexed', sotn_extractor.update_vertical_sorts),
+        ):
+            stage_entity_layout = copy.deepcopy(dict(extract['Entity Layouts'][stage_name]))
+            for row_data in stage_entity_layout['Data']:
+                for entity_data in row_data:
+                    # NOTE(sestren): Cleared to None rather than a sort, so only sorts the update assigns are compared
+                    entity_data['Vertical Sort'] = None
+            start_time = time.perf_counter()
+            update_function(stage_entity_layout)
+            timings[timing_name] += time.perf_counter() - start_time
+            assert get_vertical_sorts(stage_entity_layout) == expected_sorts, (stage_name, timing_name)
+    print('Stages:', len(extract['Entity Layouts']))
+    for (timing_name, timing) in timings.items():
+        print(timing_name + ':', '{:.3f}s'.format(timing))
@@ -1,8 +1,12 @@
 import copy
 import json
 import os
+import sys
 import yaml
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+import sotn_aliases
+
 if __name__ == '__main__':
     '''
     Usage
@@ -10,16 +14,14 @@ if __name__ == '__main__':
     '''
     with (
         open(os.path.join('build', 'extraction.json')) as extract_file,
-        open(os.path.join('data', 'aliases.yaml')) as aliases_file,
         open(os.path.join('build','aliases2.yaml'), 'w') as aliases2_file,
     ):
         # Marble Gallery is laid out weird, not contiguous 2D data
         extract = json.load(extract_file)
-        aliases = yaml.safe_load(aliases_file)
+        compiled_aliases = sotn_aliases.load_compiled_aliases('data', 'build')
+        aliases = compiled_aliases['Aliases']
         aliases2 = copy.deepcopy(aliases)
-        for (room_name, room) in aliases['Rooms'].items():
-            stage_name = room_name.split(', ')[0]
-            room_index = room['Room Index']
+        for ((stage_name, room_index), room_name) in compiled_aliases['Room Names'].items():
             extract_room = extract['Stages'][stage_name]['Rooms'][str(room_index)]
             objects = extract_room.get('Object Layout - Horizontal', {}).get('Data', [])
             if len(objects) < 1: